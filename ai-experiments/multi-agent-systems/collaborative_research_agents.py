@@ -13,6 +13,7 @@ azukiazusa1スタイルの実用的デモコード
 import asyncio
 import json
 import logging
+import sys
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +22,10 @@ import aiohttp
 import openai
 from enum import Enum
 
+# LLM 応答キャッシュは automation/ の記事生成と共通
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "automation"))
+from llm_cache import shared_cache
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -72,18 +77,23 @@ class BaseAgent:
     
     async def _call_llm(self, system_prompt: str, user_prompt: str, 
                        model: str = "gpt-4") -> str:
-        """LLM API呼び出し"""
+        """LLM API呼び出し（同じリクエストの応答は LLM キャッシュから）"""
+        request = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 2000
+        }
+        
+        async def call() -> str:
+            response = await self.openai_client.chat.completions.create(**request)
+            return (response.choices[0].message.content or "").strip()
+        
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content.strip()
+            return await shared_cache().aget_or_call(dict(request, provider="openai"), call)
         except Exception as e:
             logger.error(f"LLM API error: {e}")
             return ""
@@ -16,6 +16,7 @@ import json
 import logging
 import os
 import subprocess
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
@@ -30,15 +31,33 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
-# 内部モジュール
+# 内部モジュール（knowledge-graph/・ai-experiments/ はパッケージとして import できないのでディレクトリをパスに追加）
 import sys
-sys.path.append(str(Path(__file__).parent.parent))
-from knowledge_graph.zettelkasten_ai_system import ZettelkastenAISystem, AIKnowledgeNote
-from ai_experiments.multi_agent_systems.collaborative_research_agents import CollaborativeResearchSystem
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR / "knowledge-graph"))
+sys.path.append(str(ROOT_DIR / "ai-experiments" / "multi-agent-systems"))
+from zettelkasten_ai_system import ZettelkastenAISystem, AIKnowledgeNote
+from collaborative_research_agents import CollaborativeResearchSystem
+from rate_limiter import AdaptiveRateLimiter, retry_after_seconds
+from llm_cache import LLMCache, shared_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# セクション生成の並列度・1セクションの上限時間（秒）。config の generation で上書き可能
+SECTION_CONCURRENCY = 4
+SECTION_TIMEOUT = 90.0
+
+# 記事の同時生成数と、全リクエスト共通のレート制限（トークンバケット）
+ARTICLE_CONCURRENCY = 2
+REQUESTS_PER_SECOND = 3.0
+REQUEST_BURST = 6
+MAX_API_RETRIES = 5  # 429・一時的なエラーの再試行回数
+
+
+class SectionGenerationError(Exception):
+    """記事のセクションが1つも生成できなかった"""
+
 
 @dataclass
 class ArticleMetadata:
@@ -70,9 +89,15 @@ class ContentAnalytics:
 class AIEnhancedArticleGenerator:
     """AI強化記事生成システム"""
     
-    def __init__(self, config_path: str = "config/article_generator.yaml"):
+    def __init__(self, config_path: str = "config/article_generator.yaml", llm_cache: Optional[LLMCache] = None):
         self.config = self._load_config(config_path)
-        self.openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # 再試行は _chat_completion でレート制限と合わせて行う
+        self.openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        generation_config = self.config["generation"]
+        self.rate_limiter = AdaptiveRateLimiter(
+            generation_config.get("requests_per_second", REQUESTS_PER_SECOND),
+            generation_config.get("request_burst", REQUEST_BURST))
+        self.llm_cache = llm_cache or shared_cache()
         
         # システム統合
         self.zettelkasten_system = ZettelkastenAISystem("knowledge-graph")
@@ -96,7 +121,12 @@ class AIEnhancedArticleGenerator:
                 "min_quality_score": 0.7,
                 "seo_optimization": True,
                 "include_code_examples": True,
-                "max_articles_per_day": 3
+                "max_articles_per_day": 3,
+                "section_concurrency": SECTION_CONCURRENCY,
+                "section_timeout": SECTION_TIMEOUT,
+                "article_concurrency": ARTICLE_CONCURRENCY,
+                "requests_per_second": REQUESTS_PER_SECOND,
+                "request_burst": REQUEST_BURST
             },
             "content_strategy": {
                 "primary_domains": ["llm", "agent", "rag", "prompt-engineering"],
@@ -212,9 +242,13 @@ class AIEnhancedArticleGenerator:
         article_type = self._determine_article_type(experiment_data)
         template = self.article_templates[article_type]
         
-        # 4. コンテンツ生成
-        content_sections = await self._generate_content_sections(
-            experiment_data, related_notes, article_type)
+        # 4. コンテンツ生成（一部のセクションの失敗はエラー表示で続行）
+        try:
+            content_sections = await self._generate_content_sections(
+                experiment_data, related_notes, article_type)
+        except SectionGenerationError as e:
+            logger.error(f"Content generation failed for {experiment_id}: {e}")
+            return None
         
         # 5. 記事統合
         full_article = self._integrate_article_content(template, content_sections)
@@ -323,54 +357,86 @@ class AIEnhancedArticleGenerator:
         
         return sections
     
+    async def _generate_sections(self, specs: Dict[str, Tuple[str, str, str]]) -> Dict[str, str]:
+        """互いに独立したセクションを並行生成
+        
+        specs: セクション名 -> (見出し, コンテキスト, 指示)
+        同時実行数は generation.section_concurrency、1セクションの上限時間は generation.section_timeout。
+        失敗・タイムアウトしたセクションはエラー表示に置き換え、全セクションが失敗した場合は SectionGenerationError
+        """
+        generation_config = self.config["generation"]
+        semaphore = asyncio.Semaphore(max(1, generation_config.get("section_concurrency", SECTION_CONCURRENCY)))
+        timeout = generation_config.get("section_timeout", SECTION_TIMEOUT)
+        
+        async def generate(key: str, section_title: str, context: str, instruction: str) -> str:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self._request_section_content(section_title, context, instruction), timeout)
+        
+        results = await asyncio.gather(*(generate(key, *spec) for key, spec in specs.items()),
+                                       return_exceptions=True)
+        
+        sections, failed = {}, []
+        for (key, (section_title, _, _)), result in zip(specs.items(), results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.TimeoutError):
+                    logger.error(f"Section generation timed out after {timeout}s: {section_title}")
+                else:
+                    logger.error(f"Error generating section content ({section_title}): {result}")
+                sections[key] = self._section_error_content(section_title)
+                failed.append(key)
+            else:
+                sections[key] = result
+        
+        if failed:
+            if len(failed) == len(specs):
+                raise SectionGenerationError(f"All {len(specs)} sections failed")
+            logger.warning(f"Section generation partially failed ({len(failed)}/{len(specs)}): {', '.join(failed)}")
+        return sections
+    
     async def _generate_experiment_report_sections(self, experiment_data: Dict,
                                                  related_notes: List[AIKnowledgeNote]) -> Dict[str, str]:
         """実験レポートセクション生成"""
-        sections = {}
-        
-        # 実験概要
-        sections["experiment_overview"] = await self._generate_section_content(
-            "実験概要",
-            f"実験データ: {json.dumps(experiment_data, ensure_ascii=False)[:500]}",
-            "この実験の目的、対象技術、期待される成果について詳しく説明してください。"
-        )
-        
-        # 仮説・目的
-        sections["hypothesis"] = await self._generate_section_content(
-            "仮説・目的",
-            f"トピック: {experiment_data.get('topic', '')}",
-            "この実験で検証したい仮説と具体的な目的を明確に述べてください。"
-        )
-        
-        # 実験方法
-        sections["methodology"] = await self._generate_section_content(
-            "実験方法",
-            f"実装詳細: {experiment_data.get('implementation', {})}",
-            "実験の手順、使用したツール、評価指標について詳しく説明してください。コード例も含めてください。"
-        )
-        
-        # 結果・分析
-        sections["results"] = await self._generate_section_content(
-            "結果・分析",
-            f"評価結果: {experiment_data.get('evaluation', {})}",
-            "実験結果を定量的・定性的に分析し、グラフや表を用いて視覚化してください。"
-        )
-        
-        # 考察・洞察
         related_context = "\n".join([f"関連知識: {note.title} - {note.content[:200]}" 
                                    for note in related_notes])
-        sections["discussion"] = await self._generate_section_content(
-            "考察・洞察",
-            f"実験洞察: {experiment_data.get('insights', [])}\n{related_context}",
-            "結果から得られる洞察、既存研究との比較、発見された新しい知見について考察してください。"
-        )
-        
-        # 今後の展開
-        sections["future_work"] = await self._generate_section_content(
-            "今後の展開",
-            f"実験結果: {experiment_data.get('results', {})}",
-            "この実験結果を受けて、今後の研究方向や改善点について提案してください。"
-        )
+        sections = await self._generate_sections({
+            # 実験概要
+            "experiment_overview": (
+                "実験概要",
+                f"実験データ: {json.dumps(experiment_data, ensure_ascii=False)[:500]}",
+                "この実験の目的、対象技術、期待される成果について詳しく説明してください。"
+            ),
+            # 仮説・目的
+            "hypothesis": (
+                "仮説・目的",
+                f"トピック: {experiment_data.get('topic', '')}",
+                "この実験で検証したい仮説と具体的な目的を明確に述べてください。"
+            ),
+            # 実験方法
+            "methodology": (
+                "実験方法",
+                f"実装詳細: {experiment_data.get('implementation', {})}",
+                "実験の手順、使用したツール、評価指標について詳しく説明してください。コード例も含めてください。"
+            ),
+            # 結果・分析
+            "results": (
+                "結果・分析",
+                f"評価結果: {experiment_data.get('evaluation', {})}",
+                "実験結果を定量的・定性的に分析し、グラフや表を用いて視覚化してください。"
+            ),
+            # 考察・洞察
+            "discussion": (
+                "考察・洞察",
+                f"実験洞察: {experiment_data.get('insights', [])}\n{related_context}",
+                "結果から得られる洞察、既存研究との比較、発見された新しい知見について考察してください。"
+            ),
+            # 今後の展開
+            "future_work": (
+                "今後の展開",
+                f"実験結果: {experiment_data.get('results', {})}",
+                "この実験結果を受けて、今後の研究方向や改善点について提案してください。"
+            ),
+        })
         
         # 関連知識・参考文献
         sections["related_knowledge"] = self._generate_related_knowledge_section(related_notes)
@@ -380,43 +446,38 @@ class AIEnhancedArticleGenerator:
     async def _generate_tutorial_sections(self, experiment_data: Dict,
                                         related_notes: List[AIKnowledgeNote]) -> Dict[str, str]:
         """チュートリアルセクション生成"""
-        sections = {}
-        
-        sections["introduction"] = await self._generate_section_content(
-            "導入",
-            f"トピック: {experiment_data.get('topic', '')}",
-            "このチュートリアルで学習する内容、前提知識、期待される学習成果を説明してください。"
-        )
-        
-        sections["background"] = await self._generate_section_content(
-            "背景・基礎知識",
-            "\n".join([note.content[:300] for note in related_notes]),
-            "必要な背景知識、基礎概念を初学者にも分かりやすく説明してください。"
-        )
-        
-        sections["implementation"] = await self._generate_section_content(
-            "実装方法",
-            f"実装: {experiment_data.get('implementation', {})}",
-            "ステップバイステップの実装手順、重要なポイント、注意事項を含めてください。完全なコード例も提供してください。"
-        )
-        
-        sections["examples"] = await self._generate_section_content(
-            "実例・デモ",
-            f"評価結果: {experiment_data.get('evaluation', {})}",
-            "実際の使用例、デモンストレーション、期待される出力結果を示してください。"
-        )
-        
-        sections["applications"] = await self._generate_section_content(
-            "応用・発展",
-            f"洞察: {experiment_data.get('insights', [])}",
-            "基本実装からの発展方法、実際のプロジェクトでの応用例を提案してください。"
-        )
-        
-        sections["conclusion"] = await self._generate_section_content(
-            "まとめ",
-            f"実験結果全体: {json.dumps(experiment_data, ensure_ascii=False)[:300]}",
-            "学習した内容のまとめ、重要ポイントの再確認、次のステップを提示してください。"
-        )
+        sections = await self._generate_sections({
+            "introduction": (
+                "導入",
+                f"トピック: {experiment_data.get('topic', '')}",
+                "このチュートリアルで学習する内容、前提知識、期待される学習成果を説明してください。"
+            ),
+            "background": (
+                "背景・基礎知識",
+                "\n".join([note.content[:300] for note in related_notes]),
+                "必要な背景知識、基礎概念を初学者にも分かりやすく説明してください。"
+            ),
+            "implementation": (
+                "実装方法",
+                f"実装: {experiment_data.get('implementation', {})}",
+                "ステップバイステップの実装手順、重要なポイント、注意事項を含めてください。完全なコード例も提供してください。"
+            ),
+            "examples": (
+                "実例・デモ",
+                f"評価結果: {experiment_data.get('evaluation', {})}",
+                "実際の使用例、デモンストレーション、期待される出力結果を示してください。"
+            ),
+            "applications": (
+                "応用・発展",
+                f"洞察: {experiment_data.get('insights', [])}",
+                "基本実装からの発展方法、実際のプロジェクトでの応用例を提案してください。"
+            ),
+            "conclusion": (
+                "まとめ",
+                f"実験結果全体: {json.dumps(experiment_data, ensure_ascii=False)[:300]}",
+                "学習した内容のまとめ、重要ポイントの再確認、次のステップを提示してください。"
+            ),
+        })
         
         sections["references"] = self._generate_references_section(experiment_data, related_notes)
         
@@ -425,55 +486,51 @@ class AIEnhancedArticleGenerator:
     async def _generate_concept_sections(self, experiment_data: Dict,
                                        related_notes: List[AIKnowledgeNote]) -> Dict[str, str]:
         """概念解説セクション生成"""
-        sections = {}
-        
-        sections["definition"] = await self._generate_section_content(
-            "概念の定義",
-            f"トピック: {experiment_data.get('topic', '')}",
-            "この概念の正確な定義、類似概念との違い、技術的特徴を明確に説明してください。"
-        )
-        
-        sections["importance"] = await self._generate_section_content(
-            "重要性・背景",
-            f"実験背景: {experiment_data.get('results', {})}",
-            "なぜこの概念が重要なのか、現在の技術トレンドにおける位置づけを説明してください。"
-        )
-        
-        sections["technical_details"] = await self._generate_section_content(
-            "技術的詳細",
-            f"実装詳細: {experiment_data.get('implementation', {})}",
-            "技術的な仕組み、アルゴリズム、数学的基礎について詳しく解説してください。"
-        )
-        
-        sections["implementation_patterns"] = await self._generate_section_content(
-            "実装パターン",
-            "\n".join([note.content[:200] for note in related_notes]),
-            "一般的な実装パターン、ベストプラクティス、避けるべきアンチパターンを紹介してください。"
-        )
-        
-        sections["use_cases"] = await self._generate_section_content(
-            "使用例・ケーススタディ",
-            f"評価事例: {experiment_data.get('evaluation', {})}",
-            "実際の使用例、成功事例、失敗事例から学べる教訓を提示してください。"
-        )
-        
-        sections["relationships"] = await self._generate_section_content(
-            "他の概念との関係",
-            "\n".join([f"{note.title}: {', '.join(note.concepts)}" for note in related_notes]),
-            "関連する概念、上位・下位概念との関係、技術的な依存関係を図解してください。"
-        )
-        
-        sections["summary"] = await self._generate_section_content(
-            "まとめ・今後の発展",
-            f"今後の洞察: {experiment_data.get('insights', [])}",
-            "概念の重要ポイント整理、今後の発展方向、研究・開発の展望を述べてください。"
-        )
-        
-        return sections
+        return await self._generate_sections({
+            "definition": (
+                "概念の定義",
+                f"トピック: {experiment_data.get('topic', '')}",
+                "この概念の正確な定義、類似概念との違い、技術的特徴を明確に説明してください。"
+            ),
+            "importance": (
+                "重要性・背景",
+                f"実験背景: {experiment_data.get('results', {})}",
+                "なぜこの概念が重要なのか、現在の技術トレンドにおける位置づけを説明してください。"
+            ),
+            "technical_details": (
+                "技術的詳細",
+                f"実装詳細: {experiment_data.get('implementation', {})}",
+                "技術的な仕組み、アルゴリズム、数学的基礎について詳しく解説してください。"
+            ),
+            "implementation_patterns": (
+                "実装パターン",
+                "\n".join([note.content[:200] for note in related_notes]),
+                "一般的な実装パターン、ベストプラクティス、避けるべきアンチパターンを紹介してください。"
+            ),
+            "use_cases": (
+                "使用例・ケーススタディ",
+                f"評価事例: {experiment_data.get('evaluation', {})}",
+                "実際の使用例、成功事例、失敗事例から学べる教訓を提示してください。"
+            ),
+            "relationships": (
+                "他の概念との関係",
+                "\n".join([f"{note.title}: {', '.join(note.concepts)}" for note in related_notes]),
+                "関連する概念、上位・下位概念との関係、技術的な依存関係を図解してください。"
+            ),
+            "summary": (
+                "まとめ・今後の発展",
+                f"今後の洞察: {experiment_data.get('insights', [])}",
+                "概念の重要ポイント整理、今後の発展方向、研究・開発の展望を述べてください。"
+            ),
+        })
+    
+    @staticmethod
+    def _section_error_content(section_title: str) -> str:
+        return f"## {section_title}\n\n[Content generation error]"
     
-    async def _generate_section_content(self, section_title: str, context: str, 
-                                      instruction: str) -> str:
-        """セクションコンテンツ生成"""
+    async def _request_section_content(self, section_title: str, context: str, 
+                                       instruction: str) -> str:
+        """セクションコンテンツを LLM に1回リクエスト（例外はそのまま送出）"""
         system_prompt = f"""
         あなたは技術記事執筆のエキスパートです。
         azukiazusa1のような高品質で実用的な技術記事を執筆してください。
@@ -502,20 +559,47 @@ class AIEnhancedArticleGenerator:
         5. 実用性を重視した内容
         """
         
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            logger.error(f"Error generating section content: {e}")
-            return f"## {section_title}\n\n[Content generation error]"
+        return await self._chat_completion(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1000
+        )
+    
+    async def _chat_completion(self, **kwargs) -> str:
+        """chat.completions.create の応答テキスト（同じリクエストは LLM キャッシュから。API のレート制限に数えない）"""
+        return await self.llm_cache.aget_or_call(
+            dict(kwargs, provider="openai"), lambda: self._request_chat_completion(**kwargs))
+    
+    async def _request_chat_completion(self, **kwargs) -> str:
+        """chat.completions.create をレート制限付きで実行
+        
+        送信前にトークンバケットで待機し、429 はレートを下げて Retry-After（なければ指数バックオフ）の間待ってから、
+        接続エラー・5xx は指数バックオフで再試行する
+        """
+        for attempt in range(MAX_API_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.openai_client.chat.completions.create(**kwargs)
+            except openai.RateLimitError as e:
+                if attempt == MAX_API_RETRIES:
+                    raise
+                delay = self.rate_limiter.record_rate_limited(retry_after_seconds(e.response.headers), attempt)
+                logger.warning(f"Rate limited (429), retrying in {delay:.2f}s "
+                               f"(rate: {self.rate_limiter.rate:.2f} req/s)")
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                if attempt == MAX_API_RETRIES:
+                    raise
+                delay = min(30.0, 2 ** attempt)
+                logger.warning(f"API error ({e.__class__.__name__}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+            else:
+                self.rate_limiter.record_success()
+                # content は拒否応答・ツール呼び出しなどで None になる（空文字はキャッシュしない）
+                return (response.choices[0].message.content or "").strip()
     
     def _generate_related_knowledge_section(self, related_notes: List[AIKnowledgeNote]) -> str:
         """関連知識セクション生成"""
@@ -646,13 +730,12 @@ class AIEnhancedArticleGenerator:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            return await self._chat_completion(
                 model="gpt-4",
                 messages=[{"role": "user", "content": improvement_prompt}],
                 temperature=0.5,
                 max_tokens=3000
             )
-            return response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"Error improving article quality: {e}")
             return article
@@ -713,7 +796,8 @@ class AIEnhancedArticleGenerator:
                                      related_notes: List[AIKnowledgeNote],
                                      quality_score: float, seo_metadata: Dict) -> ArticleMetadata:
         """記事メタデータ作成"""
-        article_id = f"AI_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # 並行生成した記事が同じ秒に作られてもファイル名が重複しないよう採番
+        article_id = self.zettelkasten_system.id_allocator.next_id("AI_")
         
         return ArticleMetadata(
             id=article_id,
@@ -791,38 +875,52 @@ published_at: "{datetime.now().strftime('%Y-%m-%d')}"
         logger.info(f"Knowledge graph updated with article: {article_note_id}")
     
     async def auto_generate_daily_articles(self, max_articles: int = None) -> List[ArticleMetadata]:
-        """日次自動記事生成"""
+        """日次自動記事生成（複数記事を並行生成。API のレートはトークンバケットで制限）"""
         if max_articles is None:
             max_articles = self.config["generation"]["max_articles_per_day"]
         
         logger.info(f"Starting daily article generation (max: {max_articles})")
         
-        generated_articles = []
-        
         # 1. 新しい実験結果をチェック
         experiment_ids = await self._get_new_experiment_results()
         
         # 2. 各実験から記事生成
-        for i, experiment_id in enumerate(experiment_ids[:max_articles]):
-            try:
-                article_metadata = await self.generate_article_from_experiment(experiment_id)
-                if article_metadata:
-                    generated_articles.append(article_metadata)
-                    logger.info(f"Generated article {i+1}/{min(len(experiment_ids), max_articles)}")
-                    
-                    # レート制限を考慮して待機
-                    await asyncio.sleep(2)
-                    
-            except Exception as e:
-                logger.error(f"Error generating article for {experiment_id}: {e}")
+        start = time.perf_counter()
+        results = await self._generate_articles_concurrently(experiment_ids[:max_articles])
+        total_seconds = time.perf_counter() - start
+        
+        for experiment_id, article_metadata, seconds in results:
+            status = article_metadata.id if article_metadata else "failed"
+            logger.info(f"  {experiment_id}: {seconds:.2f}s ({status})")
+        generated_articles = [article_metadata for _, article_metadata, _ in results if article_metadata]
         
         # 3. GitHub自動コミット (オプション)
         if generated_articles and os.getenv("AUTO_COMMIT", "false").lower() == "true":
             await self._auto_commit_articles(generated_articles)
         
-        logger.info(f"Daily article generation completed: {len(generated_articles)} articles")
+        logger.info(f"Daily article generation completed: {len(generated_articles)}/{len(results)} articles "
+                    f"in {total_seconds:.2f}s (rate limited: {self.rate_limiter.throttled}, "
+                    f"LLM cache hits: {self.llm_cache.hits}, misses: {self.llm_cache.misses})")
         return generated_articles
     
+    async def _generate_articles_concurrently(self, experiment_ids: List[str]
+                                              ) -> List[Tuple[str, Optional[ArticleMetadata], float]]:
+        """記事を generation.article_concurrency 件ずつ並行生成し、[(実験ID, メタデータ, 所要秒数)] を返す"""
+        semaphore = asyncio.Semaphore(
+            max(1, self.config["generation"].get("article_concurrency", ARTICLE_CONCURRENCY)))
+        
+        async def generate(experiment_id: str) -> Tuple[str, Optional[ArticleMetadata], float]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    article_metadata = await self.generate_article_from_experiment(experiment_id)
+                except Exception as e:
+                    logger.error(f"Error generating article for {experiment_id}: {e}")
+                    article_metadata = None
+                return experiment_id, article_metadata, time.perf_counter() - start
+        
+        return list(await asyncio.gather(*(generate(experiment_id) for experiment_id in experiment_ids)))
+    
     async def _get_new_experiment_results(self) -> List[str]:
         """新しい実験結果取得"""
         # 過去24時間の実験結果を検索
@@ -12,6 +12,9 @@ from pathlib import Path
 from anthropic import Anthropic
 import re
 
+from dev_log_journal import read_recent_logs
+from llm_cache import shared_cache
+
 # 設定
 OBSIDIAN_VAULT_PATH = "/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents"
 DEV_LOGS_PATH = os.path.join(OBSIDIAN_VAULT_PATH, "01_Dev_Logs")
@@ -26,6 +29,7 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 class ArticleGenerator:
     def __init__(self):
         self.client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+        self.llm_cache = shared_cache()
         self.ensure_folders()
         
     def ensure_folders(self):
@@ -34,22 +38,8 @@ class ArticleGenerator:
         os.makedirs(PROJECT_ARTICLES_PATH, exist_ok=True)
         
     def get_recent_logs(self, days=7):
-        """最近のログを取得"""
-        all_logs = []
-        
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            log_file = os.path.join(DEV_LOGS_PATH, f"dev_log_{date.strftime('%Y-%m-%d')}.json")
-            
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        daily_logs = json.load(f)
-                        all_logs.extend(daily_logs)
-                except Exception as e:
-                    print(f"ログ読み込みエラー ({log_file}): {e}")
-        
-        return all_logs
+        """最近のログを取得（JSON Lines ジャーナル / 旧形式JSON 両対応）"""
+        return read_recent_logs(DEV_LOGS_PATH, days=days)
     
     def analyze_logs(self, logs):
         """ログを分析してテーマを抽出"""
@@ -168,16 +158,22 @@ class ArticleGenerator:
         themes = self.analyze_logs(logs)
         prompt = self.generate_article_prompt(themes, logs)
         
+        request = {
+            "provider": "anthropic",
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 3000,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=3000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+            content = self.llm_cache.get_or_call(
+                request,
+                lambda: self.client.messages.create(
+                    **{key: value for key, value in request.items() if key != "provider"}
+                ).content[0].text
             )
-            
-            content = response.content[0].text
+            print(self.llm_cache.summary())
             
             # JSONを抽出
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
@@ -186,8 +182,13 @@ class ArticleGenerator:
                 return article_data
             else:
                 print("❌ AIの出力からJSONを抽出できませんでした")
+                self.llm_cache.discard(request)
                 return None
                 
+        except json.JSONDecodeError as e:
+            print(f"❌ JSON解析エラー: {e}")
+            self.llm_cache.discard(request)
+            return None
         except Exception as e:
             print(f"❌ AI記事生成エラー: {e}")
             return None
@@ -10,12 +10,22 @@ from datetime import datetime
 from pathlib import Path
 
 from config import get_config
+from file_snapshot_index import FileSnapshotIndex
+from ignore_rules import IgnoreMatcher
+from obsidian_sync import CONFLICT_MARKER
+import git_access
+
+PUBLISH_CHECKPOINT = "auto_publisher"
 
 class AutoPublisher:
     def __init__(self):
         self.config = get_config()
         self.project_root = Path("/Users/dd/Desktop/1_dev/coding-rule2/projects/post_tool")
         self.articles_dir = self.project_root / "articles"
+        self.snapshot_index = FileSnapshotIndex(scope=PUBLISH_CHECKPOINT)
+        # Obsidian同期の競合コピーは投稿しない
+        self.conflict_matcher = IgnoreMatcher(patterns=[f"*{CONFLICT_MARKER}*"], extensions=[],
+                                              respect_gitignore=False)
         
     def publish_to_zenn(self, article_path):
         """
@@ -76,18 +86,15 @@ class AutoPublisher:
             print("📁 articlesフォルダが見つかりません")
             return
         
-        # 新しい記事を検出（git statusベース）
+        # 新しい記事を検出（スナップショット索引で前回投稿以降に追加された記事）
         try:
-            result = subprocess.run(['git', 'status', '--porcelain', 'articles/'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, text=True)
+            self.snapshot_index.refresh(self.articles_dir, suffixes=('.md',),
+                                        matcher=self.conflict_matcher)
+            if not self.snapshot_index.has_checkpoint(PUBLISH_CHECKPOINT, self.articles_dir):
+                self.create_publish_baseline()
             
-            new_articles = []
-            for line in result.stdout.split('\n'):
-                if line.startswith('??') or line.startswith('A '):
-                    filepath = line[3:].strip()
-                    if filepath.endswith('.md'):
-                        new_articles.append(self.project_root / filepath)
+            changes = self.snapshot_index.changes_since(PUBLISH_CHECKPOINT, self.articles_dir)
+            new_articles = [self.articles_dir / filepath for filepath in changes.added]
             
             if not new_articles:
                 print("📝 新しい記事はありません")
@@ -102,6 +109,9 @@ class AutoPublisher:
                 # Zenn投稿
                 if self.publish_to_zenn(article_path):
                     print(f"✅ {article_path.name} Zenn投稿完了")
+                    relative_path = article_path.relative_to(self.articles_dir).as_posix()
+                    self.snapshot_index.commit_checkpoint(
+                        PUBLISH_CHECKPOINT, self.articles_dir, paths=[relative_path])
                 
                 # ブログ投稿は一括で実行
             
@@ -112,6 +122,21 @@ class AutoPublisher:
         except Exception as e:
             print(f"❌ 自動投稿処理エラー: {e}")
 
+    def create_publish_baseline(self):
+        """初回のみ：Git管理済みの記事を投稿済みとしてチェックポイントに記録"""
+        status = git_access.porcelain_status(self.project_root, 'articles/')
+        untracked = {
+            filepath for code, filepath in status
+            if code == '??' or code.startswith('A')
+        }
+        published = []
+        for md_file in self.articles_dir.rglob('*.md'):
+            if md_file.relative_to(self.project_root).as_posix() not in untracked:
+                published.append(md_file.relative_to(self.articles_dir).as_posix())
+        
+        self.snapshot_index.commit_checkpoint(PUBLISH_CHECKPOINT, self.articles_dir, paths=published)
+        print(f"📌 投稿済み記事のベースライン作成: {len(published)}件")
+
 def main():
     """メイン実行関数"""
     print("🚀 AI自動投稿システム開始")
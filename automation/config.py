@@ -35,7 +35,43 @@ MONITORING_CONFIG = {
         ".py", ".js", ".ts", ".tsx", ".jsx", 
         ".vue", ".go", ".rs", ".java", ".cpp",
         ".html", ".css", ".scss", ".md"
-    ]
+    ],
+    "ignore_patterns": [            # 監視除外（.gitignore形式、各リポジトリの.gitignoreに追加で適用）
+        ".git/", "node_modules/", "venv/", ".venv/", "__pycache__/",
+        "dist/", "build/", ".next/", ".astro/", ".cache/",
+        ".mypy_cache/", ".pytest_cache/", "*.log", "*.tmp", "*.swp", ".DS_Store"
+    ],
+    "respect_gitignore": True       # 各リポジトリの.gitignoreを監視除外に反映
+}
+
+# シンプル開発監視設定（simple_dev_monitor.py）
+SIMPLE_MONITOR_CONFIG = {
+    "change_detection": "events",   # "events": watchdogで変更を常時収集 / "snapshot": 索引のstat走査 / "find": 従来のfind走査
+    "watch_dirs": [
+        "/Users/dd/Desktop/1_dev/coding-rule2/projects",
+        "/Users/dd/Desktop/1_dev/post_tool"
+    ],
+    "file_extensions": [".py", ".js", ".ts", ".md"],
+    "interval_seconds": 1800,       # 30分間隔
+    "max_tracked_changes": 10000    # 1周期で保持する変更パスの上限
+}
+
+# Obsidian同期設定（obsidian_sync.py）
+OBSIDIAN_SYNC_CONFIG = {
+    "copy_workers": 8,              # 並列コピー数（iCloud Driveは1ファイルの書き込みが遅いため並列化）
+    "progress_interval": 2.0,       # コピー進捗の表示間隔（秒）
+    "tombstone_days": 30            # 同期で削除したファイルの記録を保持する日数
+}
+
+# ツェッテルカステン整理設定（zettelkasten_processor.py）
+ZETTELKASTEN_CONFIG = {
+    "link_similarity_threshold": 0.3,  # 潜在リンクとみなす単語集合の Jaccard 類似度
+    "link_top_k": None,                # ノートごとの潜在リンク提案の上限（None: 閾値を超える全件）
+    "duplicate_threshold": 0.8,        # 重複候補とみなす本文（文字5-gram）の Jaccard 類似度
+    "duplicate_num_perm": 128,         # MinHash のハッシュ関数の数
+    "duplicate_shingle_size": 5,       # シングル（文字 n-gram）の長さ
+    "duplicate_folders": ["00_INBOX", "01_LITERATURE", "02_PERMANENT"],  # 重複検出の対象フォルダ
+    "inbox_workers": None              # 受信箱ノートを分類するプロセス数（None: CPU数）
 }
 
 # AI設定
@@ -46,6 +82,14 @@ AI_CONFIG = {
     "api_key_env": "ANTHROPIC_API_KEY"
 }
 
+# LLM応答キャッシュ設定（llm_cache.py）
+LLM_CACHE_CONFIG = {
+    "mode": "read_through",        # read_through / write_through（常にAPIを呼んで更新）/ off
+    "ttl_days": 30,                # 有効期限（日）
+    "max_entries": 5000,           # 件数の上限（超えたら最終参照が古い順に削除）
+    "max_size_mb": 200             # 合計サイズの上限（MB）
+}
+
 # Zenn設定
 ZENN_CONFIG = {
     "auto_publish": False,          # 自動投稿（要注意）
@@ -83,7 +127,11 @@ def get_config(section=None):
     configs = {
         "article": ARTICLE_GENERATION_CONFIG,
         "monitoring": MONITORING_CONFIG,
+        "simple_monitor": SIMPLE_MONITOR_CONFIG,
+        "obsidian_sync": OBSIDIAN_SYNC_CONFIG,
+        "zettelkasten": ZETTELKASTEN_CONFIG,
         "ai": AI_CONFIG,
+        "llm_cache": LLM_CACHE_CONFIG,
         "zenn": ZENN_CONFIG,
         "blog": BLOG_CONFIG,
         "security": SECURITY_CONFIG,
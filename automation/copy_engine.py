@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+並列ファイルコピーエンジン
+スレッドプールで同時実行数を制限しながらコピーし、進捗とスループットを表示します
+
+- 書き込みは同じディレクトリの一時ファイル（. 始まり）に書いてから os.replace で置き換え
+  （Obsidian が書きかけのノートを読むことはない）
+- iCloud Drive のように1ファイルの書き込みが遅い保存先向け
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, List, Optional
+
+DEFAULT_WORKERS = 8
+PROGRESS_INTERVAL = 2.0  # 進捗表示の間隔（秒）
+
+
+@dataclass
+class CopyJob:
+    """1ファイル分のコピー指示"""
+    source: Path
+    destination: Path
+    size: int = 0
+    tag: Any = None  # 呼び出し側が結果の対応付けに使う任意の値
+
+
+@dataclass
+class CopyResult:
+    """コピー結果"""
+    job: CopyJob
+    ok: bool
+    error: Optional[str] = None
+
+
+def atomic_copy(source, destination):
+    """一時ファイルに書いてから置き換える（メタデータも複製）"""
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{destination.name}.", suffix=".tmp",
+                                     dir=str(destination.parent))
+    try:
+        with os.fdopen(fd, 'wb') as dst, open(source, 'rb') as src:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ParallelCopier:
+    """同時実行数を制限した並列コピー"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, progress_interval=PROGRESS_INTERVAL, label="コピー",
+                 copy_func=atomic_copy):
+        self.workers = max(1, int(workers))
+        self.copy_func = copy_func
+        self.progress_interval = progress_interval
+        self.label = label
+        self._lock = threading.Lock()
+        self.stats = {"files": 0, "bytes": 0, "failed": 0, "seconds": 0.0}
+
+    def copy_all(self, jobs: List[CopyJob]) -> List[CopyResult]:
+        """ジョブをすべて実行して結果を返す（順序は完了順）"""
+        if not jobs:
+            return []
+
+        total_files = len(jobs)
+        total_bytes = sum(job.size for job in jobs)
+        done_files = done_bytes = failed = 0
+        results = []
+        start = last_report = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, total_files)) as executor:
+            futures = {executor.submit(self.copy_func, job.source, job.destination): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                except OSError as e:
+                    failed += 1
+                    results.append(CopyResult(job, False, str(e)))
+                else:
+                    done_bytes += job.size
+                    results.append(CopyResult(job, True))
+                done_files += 1
+
+                now = time.perf_counter()
+                if self.progress_interval and now - last_report >= self.progress_interval:
+                    last_report = now
+                    print(f"⏳ {self.label}: {done_files}/{total_files}ファイル "
+                          f"{done_bytes / max(total_bytes, 1) * 100:.0f}% "
+                          f"({self._throughput(done_bytes, now - start)})")
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["files"] += done_files - failed
+            self.stats["bytes"] += done_bytes
+            self.stats["failed"] += failed
+            self.stats["seconds"] += elapsed
+        print(f"🚚 {self.label}: {done_files - failed}ファイル {done_bytes:,}バイト "
+              f"{elapsed:.2f}秒 ({self._throughput(done_bytes, elapsed)}, {self.workers}並列)"
+              + (f" / 失敗 {failed}件" if failed else ""))
+        return results
+
+    @staticmethod
+    def _throughput(num_bytes, seconds):
+        return f"{num_bytes / max(seconds, 1e-9) / (1024 * 1024):.2f}MB/秒"
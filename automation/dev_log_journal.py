@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+開発ログジャーナル
+dev_log_watcher のイベントを日別の追記専用 JSON Lines ファイルに記録します
+
+- 書き込みはバッファリングし、一定件数・一定時間ごとにまとめて追記
+- fsync は fsync_interval 秒ごと（とクローズ時）のみ
+- 日付が変わったら dev_log_YYYY-MM-DD.jsonl を自動で切り替え
+- 旧形式（dev_log_YYYY-MM-DD.json の配列）も読み込み可能
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+JOURNAL_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+
+
+def journal_path(logs_dir, date):
+    """指定日のジャーナルファイルパス"""
+    return os.path.join(logs_dir, f"dev_log_{date.strftime('%Y-%m-%d')}{JOURNAL_SUFFIX}")
+
+
+def legacy_log_path(logs_dir, date):
+    """指定日の旧形式（JSON配列）ログファイルパス"""
+    return os.path.join(logs_dir, f"dev_log_{date.strftime('%Y-%m-%d')}{LEGACY_SUFFIX}")
+
+
+class DevLogJournal:
+    """追記専用・バッファ付きの開発ログジャーナル"""
+
+    def __init__(self, logs_dir, flush_interval=5.0, fsync_interval=30.0, max_buffered=50):
+        self.logs_dir = logs_dir
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_buffered = max_buffered
+
+        self._lock = threading.Lock()
+        self._buffer = []  # (日付文字列, JSON行)
+        self._file = None
+        self._file_date = None
+        self._last_flush = time.monotonic()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+
+        os.makedirs(self.logs_dir, exist_ok=True)
+
+    def append(self, entry):
+        """エントリを追加（必要に応じてフラッシュ）"""
+        timestamp = entry.get("timestamp") or datetime.now().isoformat()
+        line = json.dumps(entry, ensure_ascii=False)
+
+        with self._lock:
+            self._buffer.append((timestamp[:10], line))
+            if len(self._buffer) >= self.max_buffered or self._flush_due():
+                self._flush_locked()
+
+    def tick(self):
+        """定期呼び出し用：期限が来ていればフラッシュ・fsync"""
+        with self._lock:
+            if self._buffer and self._flush_due():
+                self._flush_locked()
+            if self._dirty and time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync_locked()
+
+    def flush(self, fsync=False):
+        """バッファを即座に書き出す"""
+        with self._lock:
+            self._flush_locked()
+            if fsync:
+                self._fsync_locked()
+
+    def close(self):
+        """フラッシュ・fsync してファイルを閉じる"""
+        with self._lock:
+            self._flush_locked()
+            self._fsync_locked()
+            if self._file:
+                self._file.close()
+                self._file = None
+                self._file_date = None
+
+    def _flush_due(self):
+        return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def _flush_locked(self):
+        """バッファを日付ごとにまとめて追記"""
+        if not self._buffer:
+            self._last_flush = time.monotonic()
+            return
+
+        pending, self._buffer = self._buffer, []
+        batch = []
+        for date_str, line in pending:
+            if date_str != self._file_date and batch:
+                self._file.write("\n".join(batch) + "\n")
+                batch = []
+            if date_str != self._file_date:
+                self._rotate_locked(date_str)
+            batch.append(line)
+
+        if batch:
+            self._file.write("\n".join(batch) + "\n")
+        self._file.flush()
+        self._dirty = True
+        self._last_flush = time.monotonic()
+
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync_locked()
+
+    def _rotate_locked(self, date_str):
+        """日付が変わったらジャーナルファイルを切り替え"""
+        if self._file:
+            self._fsync_locked()
+            self._file.close()
+
+        date = datetime.strptime(date_str, "%Y-%m-%d")
+        self._file = open(journal_path(self.logs_dir, date), 'a', encoding='utf-8')
+        self._file_date = date_str
+
+    def _fsync_locked(self):
+        if self._file and self._dirty:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+
+def iter_log_entries(path):
+    """ログファイルのエントリを1件ずつ返す（.jsonl / 旧形式 .json 両対応）"""
+    if path.endswith(LEGACY_SUFFIX):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 書き込み途中でクラッシュした末尾行などはスキップ
+                continue
+
+
+def read_recent_logs(logs_dir, days=7, limit=None):
+    """最近のログを取得（今日から遡って日別に連結）
+
+    limit を指定すると末尾 limit 件だけをメモリに保持します。
+    """
+    entries = deque(maxlen=limit) if limit else []
+
+    for i in range(days):
+        date = datetime.now() - timedelta(days=i)
+        for log_file in (legacy_log_path(logs_dir, date), journal_path(logs_dir, date)):
+            if not os.path.exists(log_file):
+                continue
+            try:
+                entries.extend(iter_log_entries(log_file))
+            except Exception as e:
+                print(f"ログ読み込みエラー ({log_file}): {e}")
+
+    return list(entries)
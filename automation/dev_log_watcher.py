@@ -7,19 +7,22 @@
 import os
 import time
 import json
-import subprocess
 from datetime import datetime
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
 import signal
-import sys
+
+from dev_log_journal import DevLogJournal, journal_path
+from event_debouncer import EventDebouncer
+from ignore_rules import IgnoreMatcher, plan_watches
+import git_access
 
 # 設定
 OBSIDIAN_VAULT_PATH = "/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents"
 DEV_LOGS_PATH = os.path.join(OBSIDIAN_VAULT_PATH, "01_Dev_Logs")
-LOG_FILE = os.path.join(DEV_LOGS_PATH, f"dev_log_{datetime.now().strftime('%Y-%m-%d')}.json")
+LOG_FILE = journal_path(DEV_LOGS_PATH, datetime.now())
 
 # 監視対象フォルダ
 WATCH_FOLDERS = [
@@ -29,8 +32,9 @@ WATCH_FOLDERS = [
 
 class DevLogCollector:
     def __init__(self):
-        self.logs = []
+        self.entry_count = 0
         self.ensure_folders()
+        self.journal = DevLogJournal(DEV_LOGS_PATH)
         
     def ensure_folders(self):
         """必要なフォルダを作成"""
@@ -44,45 +48,67 @@ class DevLogCollector:
             "message": message,
             "details": details or {}
         }
-        self.logs.append(entry)
-        self.save_logs()
+        self.journal.append(entry)
+        self.entry_count += 1
         print(f"📝 {log_type}: {message}")
         
-    def save_logs(self):
-        """ログをファイルに保存"""
-        with open(LOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, ensure_ascii=False, indent=2)
+    def flush(self):
+        """期限が来ていればジャーナルを書き出す（メインループから定期呼び出し）"""
+        self.journal.tick()
+        
+    def close(self):
+        """ジャーナルをフラッシュして閉じる"""
+        self.journal.close()
 
 class DevFileHandler(FileSystemEventHandler):
-    def __init__(self, collector):
+    def __init__(self, collector, matcher=None, quiet_period=5, max_pending=10000):
         self.collector = collector
-        self.last_processed = {}
+        self.matcher = matcher or IgnoreMatcher()
+        self.watch_new_directory = None  # 非再帰監視下に作成されたディレクトリの監視追加用
+        self.filtered_events = 0
+        # 連続編集は静かになってから1件にまとめて記録（保持件数は上限付き）
+        self.debouncer = EventDebouncer(self.emit_file_modified,
+                                        quiet_period=quiet_period,
+                                        max_entries=max_pending)
         
-    def on_modified(self, event):
+    def dispatch(self, event):
+        # ハンドラに渡す前にコンパイル済みパターンで判定
         if event.is_directory:
+            if event.event_type == "created" and self.watch_new_directory:
+                if not self.matcher.is_ignored(event.src_path, is_dir=True):
+                    self.watch_new_directory(event.src_path)
+            return
+        if not self.matcher.accepts(event.src_path):
+            self.filtered_events += 1
             return
+        super().dispatch(event)
+        
+    def on_modified(self, event):
+        self.debouncer.push(event.src_path)
             
-        file_path = event.src_path
+    def emit_file_modified(self, file_path, event_count, payload=None):
+        """デバウンス後のファイル編集イベントを記録"""
+        self.collector.add_log(
+            "file_modified",
+            f"ファイル編集: {os.path.basename(file_path)}",
+            {"file_path": file_path, "extension": Path(file_path).suffix,
+             "event_count": event_count}
+        )
         
-        # 重複処理を防ぐ
-        current_time = time.time()
-        if file_path in self.last_processed:
-            if current_time - self.last_processed[file_path] < 5:  # 5秒以内は無視
-                return
-        self.last_processed[file_path] = current_time
+    def flush(self):
+        """静止期間を過ぎたイベントを記録（メインループから定期呼び出し）"""
+        self.debouncer.flush_due()
         
-        # ファイル種別による処理
-        if file_path.endswith(('.py', '.js', '.ts', '.tsx', '.jsx', '.html', '.css', '.md')):
-            self.collector.add_log(
-                "file_modified",
-                f"ファイル編集: {os.path.basename(file_path)}",
-                {"file_path": file_path, "extension": Path(file_path).suffix}
-            )
+    def close(self):
+        """保留中のイベントをすべて記録"""
+        self.debouncer.flush_all()
 
 class GitWatcher:
+    MAX_COMMITS_PER_CHECK = 50  # 1回の検出で記録するコミット数の上限
+    
     def __init__(self, collector):
         self.collector = collector
-        self.last_commit_hash = None
+        self.repo_states = {}  # リポジトリごとの状態（最終ハッシュ・refファイルのstat署名）
         self.running = True
         
     def watch_git(self):
@@ -97,57 +123,130 @@ class GitWatcher:
             time.sleep(10)  # 10秒ごとにチェック
             
     def check_git_changes(self, repo_path):
-        """Git変更をチェック"""
+        """Git変更をチェック（HEAD/refs の stat が変わった時だけ解析）"""
         try:
-            # 最新コミットハッシュを取得
-            result = subprocess.run(
-                ['git', 'rev-parse', 'HEAD'], 
-                cwd=repo_path,
-                capture_output=True, 
-                text=True
-            )
+            state = self.repo_states.setdefault(repo_path, {
+                "git_dir": self.resolve_git_dir(repo_path),
+                "signature": None,
+                "last_hash": None
+            })
             
-            if result.returncode == 0:
-                current_hash = result.stdout.strip()
-                
-                if self.last_commit_hash and self.last_commit_hash != current_hash:
-                    # 新しいコミットが検出された
-                    commit_info = self.get_commit_info(repo_path, current_hash)
+            signature = self.ref_signature(state["git_dir"])
+            if signature == state["signature"]:
+                return  # 変更なし（プロセス起動なし）
+            state["signature"] = signature
+            
+            current_hash = self.read_head_hash(state["git_dir"])
+            if not current_hash or current_hash == state["last_hash"]:
+                return
+            
+            if state["last_hash"]:
+                # 前回以降の新しいコミットを1回の git log でまとめて取得
+                for commit_info in self.get_new_commits(repo_path, state["last_hash"], current_hash):
                     self.collector.add_log(
                         "git_commit",
                         f"新しいコミット: {commit_info['message'][:50]}...",
                         commit_info
                     )
                     
-                self.last_commit_hash = current_hash
+            state["last_hash"] = current_hash
                 
         except Exception as e:
             print(f"Git変更チェックエラー: {e}")
             
-    def get_commit_info(self, repo_path, commit_hash):
-        """コミット情報を取得"""
+    def resolve_git_dir(self, repo_path):
+        """.git ディレクトリを解決（worktree の .git ファイルにも対応）"""
+        git_path = os.path.join(repo_path, '.git')
+        if os.path.isfile(git_path):
+            with open(git_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir:'):
+                return os.path.normpath(os.path.join(repo_path, content[len('gitdir:'):].strip()))
+        return git_path
+    
+    def resolve_common_dir(self, git_dir):
+        """ブランチref・packed-refs のあるディレクトリ（worktree では commondir が指す本体の .git）"""
         try:
-            # コミットメッセージ
-            msg_result = subprocess.run(
-                ['git', 'log', '-1', '--pretty=%s', commit_hash],
-                cwd=repo_path, capture_output=True, text=True
-            )
-            
-            # コミット差分
-            diff_result = subprocess.run(
-                ['git', 'diff', f'{commit_hash}^', commit_hash, '--stat'],
-                cwd=repo_path, capture_output=True, text=True
-            )
+            with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+                common_dir = f.read().strip()
+        except OSError:
+            return git_dir
+        return os.path.normpath(os.path.join(git_dir, common_dir)) if common_dir else git_dir
+    
+    def ref_paths(self, git_dir, ref_name):
+        """ルーズrefの候補（worktree 固有のrefを優先し、次に commondir）"""
+        common_dir = self.resolve_common_dir(git_dir)
+        paths = [os.path.join(git_dir, ref_name)]
+        if common_dir != git_dir:
+            paths.append(os.path.join(common_dir, ref_name))
+        return paths
+    
+    def ref_signature(self, git_dir):
+        """HEAD・現在のブランチref・packed-refs の stat 署名"""
+        signature = []
+        head_path = os.path.join(git_dir, 'HEAD')
+        ref_name = self.read_head_ref(git_dir)
+        paths = [head_path, os.path.join(self.resolve_common_dir(git_dir), 'packed-refs')]
+        if ref_name:
+            paths.extend(self.ref_paths(git_dir, ref_name))
+        for path in paths:
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def read_head_ref(self, git_dir):
+        """HEAD が指すref名（detached HEAD の場合は None）"""
+        try:
+            with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        return head[len('ref:'):].strip() if head.startswith('ref:') else None
+    
+    def read_head_hash(self, git_dir):
+        """HEAD のコミットハッシュをファイルから直接解決"""
+        try:
+            with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        
+        if not head.startswith('ref:'):
+            return head or None
+        
+        ref_name = head[len('ref:'):].strip()
+        for ref_path in self.ref_paths(git_dir, ref_name):
+            try:
+                with open(ref_path, 'r', encoding='utf-8') as f:
+                    return f.read().strip() or None
+            except OSError:
+                pass
+        
+        # ルーズrefがなければ packed-refs を参照（worktree では commondir 側にある）
+        try:
+            with open(os.path.join(self.resolve_common_dir(git_dir), 'packed-refs'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith(('#', '^')):
+                        continue
+                    parts = line.strip().split(' ', 1)
+                    if len(parts) == 2 and parts[1] == ref_name:
+                        return parts[0]
+        except OSError:
+            pass
+        return None
             
-            return {
-                "hash": commit_hash,
-                "message": msg_result.stdout.strip(),
-                "diff_stat": diff_result.stdout.strip(),
-                "repo_path": repo_path
-            }
+    def get_new_commits(self, repo_path, since_hash, until_hash):
+        """since_hash 以降のコミット情報を取得（古い順。新しいコミットの検出時だけ git を実行）"""
+        try:
+            commits = git_access.commits_since(repo_path, since_hash, until_hash,
+                                               max_count=self.MAX_COMMITS_PER_CHECK)
+            return [git_access.commit_info(repo_path, commit) for commit in commits]
             
         except Exception as e:
-            return {"error": str(e)}
+            return [{"error": str(e), "message": "", "repo_path": repo_path}]
     
     def stop(self):
         self.running = False
@@ -164,20 +263,35 @@ def main():
         "log_file": LOG_FILE
     })
     
-    # ファイル監視セットアップ
-    event_handler = DevFileHandler(collector)
+    # ファイル監視セットアップ（除外ディレクトリを刈り込んだ監視計画）
+    matcher = IgnoreMatcher()
+    event_handler = DevFileHandler(collector, matcher)
     observers = []
+    non_recursive_dirs = {}  # 非再帰監視ディレクトリ -> 監視している Observer
     
     for folder in WATCH_FOLDERS:
         if os.path.exists(folder):
             observer = Observer()
-            observer.schedule(event_handler, folder, recursive=True)
+            plan = plan_watches(folder, matcher)
+            for directory, recursive in plan:
+                observer.schedule(event_handler, directory, recursive=recursive)
+                if not recursive:
+                    non_recursive_dirs[directory] = observer
             observer.start()
             observers.append(observer)
-            print(f"📁 監視開始: {folder}")
+            print(f"📁 監視開始: {folder} ({len(plan)}件の監視)")
         else:
             print(f"⚠️  フォルダが見つかりません: {folder}")
     
+    def watch_new_directory(directory):
+        """非再帰監視ディレクトリの直下に作成されたディレクトリを再帰監視に追加"""
+        observer = non_recursive_dirs.get(os.path.dirname(directory))
+        if observer is not None:
+            matcher.load_gitignore(directory)
+            observer.schedule(event_handler, directory, recursive=True)
+    
+    event_handler.watch_new_directory = watch_new_directory
+    
     # Git監視セットアップ
     git_watcher = GitWatcher(collector)
     git_thread = threading.Thread(target=git_watcher.watch_git)
@@ -189,7 +303,7 @@ def main():
     def check_article_generation():
         while True:
             time.sleep(3600)  # 1時間ごと
-            if len(collector.logs) >= 5:  # 5つ以上のログが蓄積されたら
+            if collector.entry_count >= 5:  # 5つ以上のログが蓄積されたら
                 print("📝 十分なログが蓄積されました。記事生成を検討してください。")
                 print("  → python automation/article_generator.py")
     
@@ -197,24 +311,35 @@ def main():
     article_thread.daemon = True
     article_thread.start()
     
-    # 終了シグナルハンドリング
+    # 終了シグナルハンドリング（ハンドラはフラグを立てるだけ。ジャーナルのロックを持ったまま
+    # 割り込まれても詰まらないよう、終了処理はメインループを抜けてから行う）
+    stop_requested = threading.Event()
+    
     def signal_handler(sig, frame):
-        print("\n🛑 監視を停止しています...")
-        git_watcher.stop()
-        for observer in observers:
-            observer.stop()
-            observer.join()
-        collector.add_log("system", "開発ログ監視終了")
-        sys.exit(0)
+        stop_requested.set()
     
     signal.signal(signal.SIGINT, signal_handler)
     
     # メインループ
     try:
-        while True:
-            time.sleep(1)
+        while not stop_requested.wait(1):
+            event_handler.flush()
+            collector.flush()
     except KeyboardInterrupt:
         pass
+    
+    print("\n🛑 監視を停止しています...")
+    git_watcher.stop()
+    git_access.close_all()
+    for observer in observers:
+        observer.stop()
+        observer.join()
+    event_handler.close()
+    collector.add_log("system", "開発ログ監視終了", {
+        "debounce_stats": event_handler.debouncer.stats,
+        "filtered_events": event_handler.filtered_events
+    })
+    collector.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ファイルイベント・デバウンサー
+同じパスへの連続イベントを1件にまとめ、静かになった時点（トレーリングエッジ）で通知します
+
+- 保持件数に上限のある LRU テーブル（上限超過時は最古のエントリを静止期間を待たずに通知して追い出す。
+  イベントは失われない）
+- 最終イベント時刻順に並ぶため、期限切れの取り出しは O(取り出し件数)
+- 静かにならないパス（ログ・ビルド出力など）も、最初のイベントから max_wait 秒経てば通知
+  （最初のイベント時刻順の表も持ち、こちらも先頭から取り出す）
+- received / emitted / coalesced / evicted（上限超過で早めに通知した件数。emitted にも含む）のカウンタを保持
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class EventDebouncer:
+    """パス単位のトレーリングエッジ・デバウンス"""
+
+    def __init__(self, emit, quiet_period=5.0, max_entries=10000, max_wait=60.0, clock=time.monotonic):
+        self.emit = emit
+        self.quiet_period = quiet_period
+        self.max_wait = max_wait
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()  # path -> [最終イベント時刻, イベント数, payload]（最終イベント時刻順）
+        self._first_seen = OrderedDict()  # path -> 最初のイベント時刻（まとめても並びを変えない）
+        self.stats = {
+            "received": 0,
+            "emitted": 0,
+            "coalesced": 0,
+            "evicted": 0
+        }
+
+    def push(self, path, payload=None):
+        """イベントを登録（同じパスの保留中イベントがあればまとめる）"""
+        now = self.clock()
+        evicted = None
+
+        with self._lock:
+            self.stats["received"] += 1
+            entry = self._pending.get(path)
+
+            if entry is not None:
+                entry[0] = now
+                entry[1] += 1
+                entry[2] = payload
+                self._pending.move_to_end(path)
+                self.stats["coalesced"] += 1
+                return
+
+            if len(self._pending) >= self.max_entries:
+                evicted_path, (_, evicted_count, evicted_payload) = self._pending.popitem(last=False)
+                del self._first_seen[evicted_path]
+                evicted = (evicted_path, evicted_count, evicted_payload)
+                self.stats["evicted"] += 1
+                self.stats["emitted"] += 1
+
+            self._pending[path] = [now, 1, payload]
+            self._first_seen[path] = now
+
+        # 追い出したパスの編集を失わないよう、ロックの外で早めに通知
+        if evicted is not None:
+            self.emit(*evicted)
+
+    def flush_due(self):
+        """静止期間を過ぎた（または最初のイベントから max_wait 秒経った）パスを通知（定期呼び出し用）"""
+        now = self.clock()
+        ready = []
+
+        with self._lock:
+            while self._pending:
+                path, entry = next(iter(self._pending.items()))
+                if now - entry[0] < self.quiet_period:
+                    break
+                self._pending.popitem(last=False)
+                del self._first_seen[path]
+                ready.append((path, entry[1], entry[2]))
+            while self.max_wait is not None and self._first_seen:
+                path, first = next(iter(self._first_seen.items()))
+                if now - first < self.max_wait:
+                    break
+                self._first_seen.popitem(last=False)
+                entry = self._pending.pop(path)
+                ready.append((path, entry[1], entry[2]))
+            self.stats["emitted"] += len(ready)
+
+        for path, count, payload in ready:
+            self.emit(path, count, payload)
+
+        return len(ready)
+
+    def flush_all(self):
+        """保留中のイベントをすべて通知（終了時用）"""
+        with self._lock:
+            ready = [(path, entry[1], entry[2]) for path, entry in self._pending.items()]
+            self._pending.clear()
+            self._first_seen.clear()
+            self.stats["emitted"] += len(ready)
+
+        for path, count, payload in ready:
+            self.emit(path, count, payload)
+
+        return len(ready)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+ファイルスナップショット索引
+パス・mtime_ns・サイズ・内容ハッシュをSQLiteに永続化し、名前付きチェックポイントからの差分を返します
+
+ObsidianSync / SimpleDevMonitor / AutoPublisher が共通で使用
+- refresh():         stat走査で索引を更新（mtime・サイズが変わったファイルだけ再ハッシュ）
+- update_paths():    イベントで分かっている変更パスだけを更新（走査なし）
+- changes_since():   チェックポイント以降の追加・変更・削除
+- commit_checkpoint(): 現在の状態をチェックポイントとして記録
+- add_tombstones():  同期で削除したファイルの記録（古いコピーの復活検知用）
+
+利用側ごとに scope を分けて索引を持つ（対象拡張子・除外ルールが違う利用側どうしで
+互いの行を追加・削除し合わないように）。チェックポイント名も利用側ごとに付ける
+"""
+
+import os
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "logs" / "file_snapshots.db"
+
+
+@dataclass
+class ChangeSet:
+    """チェックポイントからの差分（root からの相対パス）"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[str]:
+        return self.added + self.modified
+
+    def __bool__(self):
+        return bool(self.added or self.modified or self.deleted)
+
+    def __len__(self):
+        return len(self.added) + len(self.modified) + len(self.deleted)
+
+
+def content_hash(file_path) -> str:
+    """ファイル内容のハッシュ"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileSnapshotIndex:
+    """永続ファイルスナップショット索引"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, scope: str = ""):
+        self.db_path = Path(db_path)
+        self.scope = scope
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.lock = threading.Lock()
+        self.setup_database()
+
+    def setup_database(self):
+        """テーブル作成"""
+        with self.conn:
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(files)')]
+            if columns and "scope" not in columns:
+                # scope 導入前の索引は作り直す（次の refresh で再ハッシュされるだけ）
+                self.conn.execute('DROP TABLE files')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    scope TEXT NOT NULL,
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    PRIMARY KEY (scope, root, path)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS checkpoint_files (
+                    checkpoint TEXT NOT NULL,
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    PRIMARY KEY (checkpoint, root, path)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    checkpoint TEXT NOT NULL,
+                    root TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (checkpoint, root)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS tombstones (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    deleted_at TEXT NOT NULL,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _root_key(root) -> str:
+        return os.path.realpath(str(root))
+
+    @staticmethod
+    def _walk(root: str, suffixes: Optional[Tuple[str, ...]], matcher=None):
+        """(相対パス, stat) を列挙（隠しディレクトリと除外対象は辿らない）"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if matcher is None or not matcher.is_ignored(entry.path, is_dir=True):
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    if suffixes and not entry.name.endswith(suffixes):
+                        continue
+                    if matcher is not None and matcher.is_ignored(entry.path):
+                        continue
+                    relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    yield relative, entry.stat()
+
+    def _stored(self, root_key: str):
+        rows = self.conn.execute(
+            'SELECT path, mtime_ns, size FROM files WHERE scope = ? AND root = ?', (self.scope, root_key))
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def refresh(self, root, suffixes: Optional[Iterable[str]] = None, matcher=None) -> int:
+        """root 配下を stat 走査して索引を更新。再ハッシュしたファイル数を返す
+
+        suffixes・matcher に当てはまらなくなったファイルは、この scope の索引からは削除する
+        """
+        root_key = self._root_key(root)
+        suffixes = tuple(suffixes) if suffixes else None
+        if matcher is not None:
+            matcher.add_root(root_key)
+
+        with self.lock:
+            stored = self._stored(root_key)
+            seen = set()
+            upserts = []
+            for relative, st in self._walk(root_key, suffixes, matcher):
+                seen.add(relative)
+                if stored.get(relative) == (st.st_mtime_ns, st.st_size):
+                    continue
+                try:
+                    digest = content_hash(os.path.join(root_key, relative))
+                except OSError:
+                    continue
+                upserts.append((self.scope, root_key, relative, st.st_mtime_ns, st.st_size, digest))
+
+            removed = [(self.scope, root_key, path) for path in stored if path not in seen]
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)', upserts)
+                self.conn.executemany(
+                    'DELETE FROM files WHERE scope = ? AND root = ? AND path = ?', removed)
+        return len(upserts)
+
+    def update_paths(self, root, paths: Iterable[str]) -> int:
+        """変更が分かっているパスだけを更新（絶対パス・相対パスどちらも可）"""
+        root_key = self._root_key(root)
+        updated = 0
+
+        with self.lock:
+            stored = self._stored(root_key)
+            with self.conn:
+                for path in paths:
+                    full_path = path if os.path.isabs(path) else os.path.join(root_key, path)
+                    relative = os.path.relpath(os.path.realpath(full_path), root_key).replace(os.sep, "/")
+                    if relative.startswith(".."):
+                        continue
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        self.conn.execute('DELETE FROM files WHERE scope = ? AND root = ? AND path = ?',
+                                          (self.scope, root_key, relative))
+                        updated += 1
+                        continue
+                    if stored.get(relative) == (st.st_mtime_ns, st.st_size):
+                        continue
+                    self.conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)', (
+                        self.scope, root_key, relative, st.st_mtime_ns, st.st_size, content_hash(full_path)))
+                    updated += 1
+        return updated
+
+    def get(self, root, relative_path):
+        """索引上の (mtime_ns, size, content_hash)。未登録なら None"""
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, content_hash FROM files WHERE scope = ? AND root = ? AND path = ?',
+            (self.scope, self._root_key(root), relative_path)).fetchone()
+        return tuple(row) if row else None
+
+    def checkpoint_get(self, name: str, root, relative_path):
+        """チェックポイント時点の (mtime_ns, size, content_hash)。記録がなければ None"""
+        row = self.conn.execute('''
+            SELECT mtime_ns, size, content_hash FROM checkpoint_files
+            WHERE checkpoint = ? AND root = ? AND path = ?
+        ''', (name, self._root_key(root), relative_path)).fetchone()
+        return tuple(row) if row else None
+
+    def has_checkpoint(self, name: str, root) -> bool:
+        row = self.conn.execute(
+            'SELECT 1 FROM checkpoints WHERE checkpoint = ? AND root = ?',
+            (name, self._root_key(root))).fetchone()
+        return row is not None
+
+    def changes_since(self, name: str, root) -> ChangeSet:
+        """チェックポイント以降の追加・変更・削除（チェックポイントがなければ全ファイルが追加）"""
+        root_key = self._root_key(root)
+        changes = ChangeSet()
+
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT f.path, c.content_hash IS NULL
+                FROM files f
+                LEFT JOIN checkpoint_files c
+                  ON c.checkpoint = ? AND c.root = f.root AND c.path = f.path
+                WHERE f.scope = ? AND f.root = ? AND (c.content_hash IS NULL OR c.content_hash != f.content_hash)
+                ORDER BY f.path
+            ''', (name, self.scope, root_key))
+            for path, is_new in rows:
+                (changes.added if is_new else changes.modified).append(path)
+
+            rows = self.conn.execute('''
+                SELECT c.path
+                FROM checkpoint_files c
+                LEFT JOIN files f ON f.scope = ? AND f.root = c.root AND f.path = c.path
+                WHERE c.checkpoint = ? AND c.root = ? AND f.path IS NULL
+                ORDER BY c.path
+            ''', (self.scope, name, root_key))
+            changes.deleted = [path for (path,) in rows]
+
+        return changes
+
+    def commit_checkpoint(self, name: str, root, paths: Optional[Iterable[str]] = None):
+        """現在の状態をチェックポイントとして記録（paths 指定時はそのパスだけ反映）"""
+        root_key = self._root_key(root)
+        now = datetime.now().isoformat()
+
+        with self.lock, self.conn:
+            if paths is None:
+                self.conn.execute('DELETE FROM checkpoint_files WHERE checkpoint = ? AND root = ?',
+                                  (name, root_key))
+                self.conn.execute('''
+                    INSERT INTO checkpoint_files
+                    SELECT ?, root, path, mtime_ns, size, content_hash FROM files WHERE scope = ? AND root = ?
+                ''', (name, self.scope, root_key))
+            else:
+                for path in paths:
+                    self.conn.execute(
+                        'DELETE FROM checkpoint_files WHERE checkpoint = ? AND root = ? AND path = ?',
+                        (name, root_key, path))
+                    self.conn.execute('''
+                        INSERT INTO checkpoint_files
+                        SELECT ?, root, path, mtime_ns, size, content_hash
+                        FROM files WHERE scope = ? AND root = ? AND path = ?
+                    ''', (name, self.scope, root_key, path))
+            self.conn.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)',
+                              (name, root_key, now))
+
+    def add_tombstones(self, root, entries: Iterable[Tuple[str, str]]):
+        """削除したファイルを (相対パス, 内容ハッシュ) で記録"""
+        root_key = self._root_key(root)
+        now = datetime.now().isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO tombstones VALUES (?, ?, ?, ?)',
+                                  [(root_key, path, digest, now) for path, digest in entries])
+
+    def tombstones(self, root, max_age_days: float = 30) -> dict:
+        """有効期限内の削除記録 {相対パス: (内容ハッシュ, 削除日時 ISO形式)}（期限切れは破棄）"""
+        root_key = self._root_key(root)
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM tombstones WHERE root = ? AND deleted_at < ?',
+                              (root_key, cutoff))
+            rows = self.conn.execute('SELECT path, content_hash, deleted_at FROM tombstones WHERE root = ?',
+                                     (root_key,)).fetchall()
+        return {path: (digest, deleted_at) for path, digest, deleted_at in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ファイルスナップショット索引")
+    parser.add_argument("root", help="対象ディレクトリ")
+    parser.add_argument("--checkpoint", default="manual", help="チェックポイント名")
+    parser.add_argument("--scope", default="", help="索引の scope（利用側の名前）")
+    parser.add_argument("--suffix", action="append", help="対象拡張子（複数指定可）")
+    parser.add_argument("--commit", action="store_true", help="差分表示後にチェックポイントを更新")
+    args = parser.parse_args()
+
+    index = FileSnapshotIndex(scope=args.scope)
+    rehashed = index.refresh(args.root, args.suffix)
+    changes = index.changes_since(args.checkpoint, args.root)
+    print(f"🔍 再ハッシュ: {rehashed}件 / 差分: 追加{len(changes.added)} "
+          f"変更{len(changes.modified)} 削除{len(changes.deleted)}")
+    for label, paths in (("+", changes.added), ("M", changes.modified), ("-", changes.deleted)):
+        for path in paths:
+            print(f"  {label} {path}")
+    if args.commit:
+        index.commit_checkpoint(args.checkpoint, args.root)
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Git読み取りアクセス層
+GitPython のリポジトリハンドルをキャッシュし、ポーリングのたびに git を起動せずに読み取ります
+
+- HEAD・コミット履歴・差分統計・porcelain 形式のステータスを取得
+- HEAD・ステータスはプロセス内で計算し、オブジェクト読み込みはハンドルごとに常駐する
+  cat-file プロセス経由（ポーリングのたびにプロセスを起動しない）
+- コミット履歴（git rev-list）と差分統計（git diff --stat）は新しいコミットの検出時だけ
+  git を1回ずつ実行（履歴の走査・差分計算は git に任せる）
+- ステータスは stat が index と異なるファイルだけをハッシュし、結果とディレクトリ一覧を呼び出し間で再利用
+  （名前変更は内容が同一のステージ済みのものだけ検出。サブモジュールの変更は報告しない）
+- 書き込み系（add / commit / push）は対象外
+"""
+
+import os
+import sys
+import stat
+import hashlib
+import argparse
+import threading
+
+import git
+
+from ignore_rules import IgnoreMatcher
+
+GITLINK_MODE = 0o160000  # index・ツリー上のサブモジュールの mode
+
+_repo_cache = {}
+_repo_lock = threading.Lock()
+
+
+def get_repo(path):
+    """キャッシュ済みのリポジトリハンドルを取得"""
+    key = os.path.realpath(path)
+    with _repo_lock:
+        repo = _repo_cache.get(key)
+        if repo is None:
+            repo = git.Repo(key, search_parent_directories=True)
+            _repo_cache[key] = repo
+        return repo
+
+
+def close_all():
+    """キャッシュしたハンドル（常駐 cat-file プロセス）を解放"""
+    with _repo_lock:
+        for repo in _repo_cache.values():
+            repo.close()
+        _repo_cache.clear()
+        _status_cache.clear()
+
+
+def head_commit(path):
+    """HEAD のコミットハッシュ（コミットがなければ None）"""
+    try:
+        return get_repo(path).head.commit.hexsha
+    except ValueError:
+        return None
+
+
+def commits_since(path, since_hash=None, until="HEAD", max_count=50):
+    """since_hash 以降のコミットを古い順で返す（since_hash が None なら最新 max_count 件）
+
+    since_hash から到達できないコミットを git rev-list で列挙する（日時ではなく到達可能性で判定）
+    """
+    repo = get_repo(path)
+    try:
+        repo.commit(until)
+    except (ValueError, git.BadName):
+        return []
+
+    revision = until
+    if since_hash:
+        try:
+            revision = f"{repo.commit(since_hash).hexsha}..{until}"
+        except (ValueError, git.BadName):
+            pass  # 履歴が書き換えられて見つからなければ最新 max_count 件
+
+    return list(reversed(list(repo.iter_commits(revision, max_count=max_count))))
+
+
+def diff_stat(path, commit):
+    """コミットの差分統計（git diff --stat の文字列。名前変更も検出）
+
+    差分の計算は git に任せ、1回の git diff で全ファイル分を取得する
+    （Python でファイル全体を比較すると大きなファイルで極端に遅くなる）
+    """
+    repo = get_repo(path)
+    if isinstance(commit, str):
+        commit = repo.commit(commit)
+    if commit.parents:
+        return repo.git.diff(commit.parents[0].hexsha, commit.hexsha, "--stat", "-M")
+    return repo.git.diff_tree(commit.hexsha, "--stat", "-M", "--root", "--no-commit-id")
+
+
+def commit_info(path, commit):
+    """ログ記録用のコミット情報"""
+    return {
+        "hash": commit.hexsha,
+        "message": commit.summary,
+        "diff_stat": diff_stat(path, commit),
+        "repo_path": path
+    }
+
+
+def _blob_sha(file_path, st):
+    """作業ツリーのファイルの blob SHA-1（シンボリックリンクはリンク先のパス文字列）"""
+    if stat.S_ISLNK(st.st_mode):
+        data = os.fsencode(os.readlink(file_path))
+    else:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).digest()
+
+
+def _worktree_kind(entry, st):
+    """index の mode と作業ツリーの種別の比較（一致: None、種別変更: "T"、実行ビットのみ変更: "M"）"""
+    if stat.S_ISLNK(entry.mode) != stat.S_ISLNK(st.st_mode):
+        return "T"
+    if stat.S_ISREG(st.st_mode) and bool(entry.mode & 0o100) != bool(st.st_mode & 0o100):
+        return "M"
+    return None
+
+
+class _StatusCache:
+    """porcelain_status の呼び出し間で再利用する状態（リポジトリごと）"""
+
+    def __init__(self):
+        self.head = None
+        self.head_blobs = {}  # HEAD のツリーの 相対パス -> binsha
+        self.verdicts = {}  # 相対パス -> (stat署名, index の binsha, 変更あり)
+        self.listings = {}  # ディレクトリ -> (mtime_ns, [ファイル名], [ディレクトリ名])
+        self.lock = threading.Lock()
+
+
+_status_cache = {}
+
+
+def _head_blobs(repo, cache):
+    """HEAD のツリーの blob 一覧（HEAD が変わったときだけ辿り直す）"""
+    try:
+        head = repo.head.commit
+    except ValueError:
+        return {}
+    if cache.head != head.hexsha:
+        cache.head_blobs = {item.path: item.binsha for item in head.tree.traverse() if item.type == "blob"}
+        cache.head = head.hexsha
+    return cache.head_blobs
+
+
+def _is_modified(full_path, entry_path, entry, st, cache):
+    """作業ツリーのファイルが index と異なるか
+
+    stat が index と一致すれば内容を読まない。一致しないものだけハッシュし、
+    結果を stat 署名ごとに覚えて次回以降は再計算しない
+    """
+    if st.st_size == entry.size and int(st.st_mtime) == entry.mtime[0]:
+        return False
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = cache.verdicts.get(entry_path)
+    if cached is not None and cached[0] == signature and cached[1] == entry.binsha:
+        return cached[2]
+    modified = _blob_sha(full_path, st) != entry.binsha
+    cache.verdicts[entry_path] = (signature, entry.binsha, modified)
+    return modified
+
+
+def _listing(directory, cache):
+    """ディレクトリの (ファイル名, ディレクトリ名)（mtime が変わったときだけ読み直す）"""
+    mtime_ns = os.stat(directory).st_mtime_ns
+    cached = cache.listings.get(directory)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1], cached[2]
+    filenames, dirnames = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirnames.append(entry.name)
+            else:
+                filenames.append(entry.name)
+    cache.listings[directory] = (mtime_ns, filenames, dirnames)
+    return filenames, dirnames
+
+
+def _pair_renames(added, deleted, head_blobs, entries):
+    """ステージ済みの追加・削除のうち内容が同一のものを名前変更として対応付け {追加パス: 削除パス}"""
+    by_blob = {}
+    for old_path in sorted(deleted):
+        by_blob.setdefault(head_blobs[old_path], []).append(old_path)
+    renames = {}
+    for new_path in sorted(added):
+        candidates = by_blob.get(entries[new_path].binsha)
+        if not candidates:
+            continue
+        # 同じファイル名（ディレクトリ移動）を優先
+        name = new_path.rsplit("/", 1)[-1]
+        old_path = next((c for c in candidates if c.rsplit("/", 1)[-1] == name), candidates[0])
+        candidates.remove(old_path)
+        renames[new_path] = old_path
+    return renames
+
+
+def porcelain_status(path, pathspec=None):
+    """git status --porcelain 相当の [(XY, 相対パス)] を返す（名前変更は ("R ", "旧 -> 新")）"""
+    repo = get_repo(path)
+    root = repo.working_tree_dir
+    prefix = pathspec.strip("/") + "/" if pathspec else ""
+    with _repo_lock:
+        cache = _status_cache.setdefault(os.path.realpath(root), _StatusCache())
+
+    with cache.lock:
+        entries = {}
+        gitlinks = set()  # サブモジュール（中身は走査しない）
+        for (entry_path, stage), entry in repo.index.entries.items():
+            if stage != 0 or not entry_path.startswith(prefix):
+                continue
+            if stat.S_IFMT(entry.mode) == GITLINK_MODE:
+                gitlinks.add(entry_path)
+            else:
+                entries[entry_path] = entry
+
+        head_blobs = {entry_path: binsha for entry_path, binsha in _head_blobs(repo, cache).items()
+                      if entry_path.startswith(prefix)}
+        deleted = [entry_path for entry_path in head_blobs if entry_path not in entries]
+        added = [entry_path for entry_path in entries if entry_path not in head_blobs]
+        renames = _pair_renames(added, deleted, head_blobs, entries)
+        renamed_from = set(renames.values())
+
+        status = []
+        for entry_path, entry in entries.items():
+            if entry_path in renames:
+                x = "R"
+            else:
+                head_sha = head_blobs.get(entry_path)
+                x = "A" if head_sha is None else ("M" if head_sha != entry.binsha else " ")
+
+            full_path = os.path.join(root, entry_path)
+            try:
+                st = os.lstat(full_path)  # リンク先ではなくリンク自体（壊れたリンクも存在扱い）
+            except OSError:
+                st = None
+            if st is None or stat.S_ISDIR(st.st_mode):
+                y = "D"
+            else:
+                y = _worktree_kind(entry, st) or (
+                    "M" if _is_modified(full_path, entry_path, entry, st, cache) else " ")
+
+            if x != " " or y != " ":
+                label = f"{renames[entry_path]} -> {entry_path}" if x == "R" else entry_path
+                status.append((x + y, label))
+
+        for entry_path in deleted:
+            if entry_path not in renamed_from:
+                status.append(("D ", entry_path))
+
+        # 未追跡ファイル（.gitignore 対象は除外。変更のないディレクトリは前回の一覧を使う）
+        matcher = IgnoreMatcher(patterns=[".git/"], extensions=[])
+        matcher.add_root(root)
+        matcher.load_gitignore(root)
+        start = os.path.join(root, prefix) if prefix else root
+        stack = [start] if os.path.isdir(start) else []
+        while stack:
+            dirpath = stack.pop()
+            try:
+                filenames, dirnames = _listing(dirpath, cache)
+            except OSError:
+                continue
+            if ".gitignore" in filenames:
+                matcher.load_gitignore(dirpath)
+            for dirname in dirnames:
+                child = os.path.join(dirpath, dirname)
+                if os.path.relpath(child, root).replace(os.sep, "/") in gitlinks:
+                    continue
+                if not matcher.is_ignored(child, is_dir=True):
+                    stack.append(child)
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(full_path, root).replace(os.sep, "/")
+                if relative not in entries and not matcher.is_ignored(full_path):
+                    status.append(("??", relative))
+
+    # git と同じく追跡中のファイル → 未追跡ファイルの順（それぞれパス順）
+    return sorted(status, key=lambda item: (item[0] == "??", item[1].split(" -> ")[-1]))
+
+
+def format_porcelain(status):
+    """porcelain_status の結果を git status --porcelain 形式の文字列に"""
+    return "".join(f"{code} {file_path}\n" for code, file_path in status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Git読み取りアクセス層")
+    parser.add_argument("repo", nargs="?", default=".", help="リポジトリのパス")
+    args = parser.parse_args()
+
+    print(f"HEAD: {head_commit(args.repo)}")
+    sys.stdout.write(format_porcelain(porcelain_status(args.repo)))
+    close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+監視除外ルールエンジン（.gitignore対応）
+MONITORING_CONFIG の除外パターンと各リポジトリの .gitignore をまとめて正規表現にコンパイルします
+
+- スケジュール時: plan_watches() が除外ディレクトリを含まない部分木だけを再帰監視
+- イベント時: IgnoreMatcher.accepts() が事前コンパイル済みパターンで判定
+- 否定パターン（!pattern）は「除外パターンに一致し、否定パターンに一致しない」で近似
+- 設定パターンは監視ルートからの相対パスで判定（ルートより上の祖先ディレクトリ名では除外しない）
+"""
+
+import os
+import re
+import argparse
+import threading
+
+from config import get_config
+
+
+def _glob_to_regex(pattern):
+    """gitignore形式のグロブを正規表現に変換"""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            regex.append("[^/]*")
+        elif c == "?":
+            regex.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return "".join(regex)
+
+
+def parse_gitignore_line(line):
+    """1行を (ファイル用正規表現, ディレクトリ用正規表現, 否定) に変換。対象外の行は None"""
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    if line.startswith("\\"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.strip("/") if dir_only else line
+    anchored = line.startswith("/") or "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return None
+
+    body = _glob_to_regex(line)
+    prefix = "" if anchored else "(?:.*/)?"
+    # ファイルは「パターンに一致するディレクトリの配下」または（dir_onlyでなければ）パターン自体に一致
+    file_regex = prefix + body + ("/.*" if dir_only else "(?:/.*)?")
+    dir_regex = prefix + body + "(?:/.*)?"
+    return file_regex, dir_regex, negated
+
+
+class _RuleSet:
+    """1つの基準ディレクトリに属するコンパイル済みルール"""
+
+    def __init__(self, base, lines):
+        self.base = base
+        file_ignore, dir_ignore, file_keep, dir_keep = [], [], [], []
+
+        for line in lines:
+            parsed = parse_gitignore_line(line)
+            if not parsed:
+                continue
+            file_regex, dir_regex, negated = parsed
+            if negated:
+                file_keep.append(file_regex)
+                dir_keep.append(dir_regex)
+            else:
+                file_ignore.append(file_regex)
+                dir_ignore.append(dir_regex)
+
+        self.file_ignore = self._compile(file_ignore)
+        self.dir_ignore = self._compile(dir_ignore)
+        self.file_keep = self._compile(file_keep)
+        self.dir_keep = self._compile(dir_keep)
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile("^(?:" + "|".join(patterns) + ")$")
+
+    def matches(self, relative_path, is_dir):
+        ignore = self.dir_ignore if is_dir else self.file_ignore
+        keep = self.dir_keep if is_dir else self.file_keep
+        if not ignore or not ignore.match(relative_path):
+            return False
+        return not (keep and keep.match(relative_path))
+
+
+class IgnoreMatcher:
+    """監視除外判定（設定の除外パターン + 各リポジトリの .gitignore）"""
+
+    def __init__(self, patterns=None, extensions=None, respect_gitignore=None):
+        monitoring = get_config("monitoring")
+        if patterns is None:
+            patterns = monitoring.get("ignore_patterns", [])
+        if extensions is None:
+            extensions = monitoring.get("file_extensions", [])
+        if respect_gitignore is None:
+            respect_gitignore = monitoring.get("respect_gitignore", True)
+
+        self.respect_gitignore = respect_gitignore
+        self.extensions = tuple(extensions)
+        # 設定パターンはどの階層でも有効（絶対パスの先頭 / を除いて判定）
+        self.global_rules = _RuleSet("", patterns)
+        # 基準ディレクトリ -> _RuleSet。監視スレッドから読みながら追加されるので、
+        # 追加時は新しい dict に差し替える（コピーオンライト。読み取り側はロック不要）
+        self.scoped_rules = {}
+        self._rules_lock = threading.Lock()
+        # 監視ルート（長い順）。設定パターンはここからの相対パスで判定する
+        self.roots = ()
+
+    def add_root(self, root):
+        """監視ルートを登録（plan_watches などの走査開始時に呼ぶ）"""
+        root = os.path.normpath(root)
+        with self._rules_lock:
+            if root not in self.roots:
+                self.roots = tuple(sorted(self.roots + (root,), key=len, reverse=True))
+
+    def _root_relative(self, path):
+        """最も内側の監視ルートからの相対パス（どのルートにも属さなければ名前だけで判定）"""
+        for root in self.roots:
+            if path.startswith(root + os.sep):
+                return path[len(root) + 1:].replace(os.sep, "/")
+        return os.path.basename(path)
+
+    def add_gitignore(self, base_dir, lines):
+        """基準ディレクトリの .gitignore ルールを追加"""
+        base_dir = os.path.normpath(base_dir)
+        rules = _RuleSet(base_dir, lines)
+        if rules.file_ignore or rules.dir_ignore:
+            with self._rules_lock:
+                self.scoped_rules = {**self.scoped_rules, base_dir: rules}
+
+    def load_gitignore(self, directory):
+        """ディレクトリ直下の .gitignore があれば読み込む"""
+        if not self.respect_gitignore:
+            return
+        gitignore = os.path.join(directory, ".gitignore")
+        if os.path.isfile(gitignore):
+            try:
+                with open(gitignore, 'r', encoding='utf-8', errors='ignore') as f:
+                    self.add_gitignore(directory, f.readlines())
+            except OSError:
+                pass
+
+    def is_ignored(self, path, is_dir=False):
+        """パスが除外対象か判定"""
+        path = os.path.normpath(path)
+        if self.global_rules.matches(self._root_relative(path), is_dir):
+            return True
+
+        for base, rules in self.scoped_rules.items():  # 差し替え前の dict を最後まで使う
+            if path.startswith(base + os.sep):
+                relative = path[len(base) + 1:].replace(os.sep, "/")
+                if rules.matches(relative, is_dir):
+                    return True
+        return False
+
+    def accepts(self, path):
+        """イベント時判定：監視対象の拡張子で、かつ除外対象でない"""
+        if self.extensions and not path.endswith(self.extensions):
+            return False
+        return not self.is_ignored(path)
+
+
+def plan_watches(root, matcher):
+    """除外ディレクトリを刈り込んだ監視計画を作成
+
+    除外ディレクトリを含まない部分木は再帰監視1件にまとめ、
+    含む部分木は非再帰監視にして子ディレクトリへ降ります。
+    戻り値: [(ディレクトリ, recursive)]
+    """
+    root = os.path.normpath(root)
+    matcher.add_root(root)
+    children = {}
+    has_pruned = {}
+
+    for dirpath, dirnames, _ in os.walk(root, topdown=True):
+        matcher.load_gitignore(dirpath)
+        kept = []
+        for name in dirnames:
+            child = os.path.join(dirpath, name)
+            if os.path.islink(child) or matcher.is_ignored(child, is_dir=True):
+                has_pruned[dirpath] = True
+            else:
+                kept.append(name)
+        dirnames[:] = kept
+        children[dirpath] = [os.path.join(dirpath, name) for name in kept]
+
+    # 除外ディレクトリの有無を祖先へ伝播（深い順に処理）
+    for dirpath in sorted(children, key=lambda p: p.count(os.sep), reverse=True):
+        if has_pruned.get(dirpath):
+            parent = os.path.dirname(dirpath)
+            if parent in children and dirpath != root:
+                has_pruned[parent] = True
+
+    plan = []
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        if has_pruned.get(dirpath):
+            plan.append((dirpath, False))
+            stack.extend(children.get(dirpath, []))
+        else:
+            plan.append((dirpath, True))
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="監視除外ルールエンジン")
+    parser.add_argument("roots", nargs="*", help="監視計画を表示するディレクトリ")
+    args = parser.parse_args()
+
+    matcher = IgnoreMatcher()
+    for root in args.roots or get_config("monitoring").get("watch_folders", []):
+        if not os.path.exists(root):
+            print(f"⚠️  フォルダが見つかりません: {root}")
+            continue
+        for directory, recursive in plan_watches(root, matcher):
+            print(f"{'📁' if recursive else '📄'} {directory}{' (再帰)' if recursive else ''}")
+
+
+if __name__ == "__main__":
+    main()
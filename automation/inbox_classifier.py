@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+受信箱ノート分類
+00_INBOX のノートを「分割推奨」「恒久ノート候補」に分類します（ZettelkastenProcessor.process_inbox_notes 用）
+
+- 判定はファイル内容だけで決まる純粋関数なので、プロセスプールのワーカーでそのまま実行できる
+- 概念キーワードは1つの選択正規表現にコンパイルし、1回の走査で判定（従来はキーワードごとに部分文字列検索）
+- ワーカーは解析結果（ParsedNote）も返し、メインプロセスのノートキャッシュに登録して後続ステップで再利用
+- ファイル数が少ないときはプロセス起動のコストの方が大きいので、メインプロセスで順に分類
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from note_cache import ParsedNote, WIKILINK_PATTERN, parse_note
+
+POOL_MIN_FILES = 64  # これ未満のファイル数ならプロセスプールを使わない
+POOL_CHUNK_SIZE = 16  # ワーカーへ一度に渡すファイル数
+
+# 概念的内容のキーワード（日本語 + 英語。小文字化した本文に部分一致）
+CONCEPT_KEYWORDS = [
+    # 日本語キーワード
+    '原則', '法則', 'パターン', '理論', '概念', '手法', 'メソッド', '仕組み', 'システム',
+    '技術', '解説', '実装', '方法', '戦略', '設計', '構造', '機能', '特徴', '利点',
+    'エージェント', 'AI', '自動化', '統合', '連携', '最適化', 'ワークフロー',
+    # 英語キーワード
+    'agent', 'system', 'method', 'approach', 'technique', 'strategy', 'framework',
+    'implementation', 'integration', 'automation', 'workflow', 'architecture',
+    'technology', 'innovation', 'solution', 'optimization', 'functionality'
+]
+KEYWORD_PATTERN = re.compile("|".join(
+    re.escape(keyword) for keyword in sorted({k.lower() for k in CONCEPT_KEYWORDS}, key=len, reverse=True)))
+HEADER_LINE_PATTERN = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+
+
+@dataclass
+class InboxClassification:
+    """1ファイル分の分類結果"""
+    path: str
+    title: str = ""
+    split_suggestions: List[str] = field(default_factory=list)  # 空でなければ分割推奨
+    is_candidate: bool = False  # 恒久ノート候補
+    note: Optional[ParsedNote] = None
+    error: Optional[str] = None
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+
+def contains_multiple_ideas(content: str) -> bool:
+    """複数のアイデアが含まれているか（見出しの数で判定する簡易版）"""
+    return len(HEADER_LINE_PATTERN.findall(content)) > 3
+
+
+def suggest_note_split(title: str, headers) -> List[str]:
+    """H1・H2 見出しごとの分割案（最大3つ）"""
+    return [f"{title} - {header_text}" for level, header_text in headers if len(level) <= 2][:3]
+
+
+def is_permanent_note_candidate(content: str, full_text: Optional[str] = None) -> bool:
+    """恒久ノート候補か（文字数は本文、リンク・キーワードは full_text（省略時は本文）で判定）"""
+    # 文字数チェック（本文ベース）
+    if len(content) < 200:
+        return False
+
+    # リンクの存在チェック
+    full_text = content if full_text is None else full_text
+    links = WIKILINK_PATTERN.findall(full_text)
+    if len(links) < 1:
+        return False
+
+    # 概念的内容のキーワードチェック
+    if KEYWORD_PATTERN.search(full_text.lower()):
+        return True
+
+    # 高品質コンテンツの追加判定（文字数 + リンクで十分価値がある）
+    return len(content) > 1000 and len(links) >= 2
+
+
+def classify_note(note: ParsedNote) -> InboxClassification:
+    """解析済みノートを分類（frontmatter + 本文を統合してリンク・キーワードを検索）"""
+    title = note.metadata.get('title', note.filename[:-3])
+    full_text = str(note.metadata) + "\n" + note.content
+    suggestions = suggest_note_split(title, note.headers) if contains_multiple_ideas(note.content) else []
+    return InboxClassification(
+        path=note.path,
+        title=title,
+        split_suggestions=suggestions,
+        is_candidate=is_permanent_note_candidate(note.content, full_text),
+        note=note
+    )
+
+
+def classify_inbox_file(path: str) -> InboxClassification:
+    """ファイルを解析して分類（プロセスプールのワーカー。例外は結果に格納して返す）"""
+    try:
+        return classify_note(parse_note(path))
+    except Exception as e:
+        return InboxClassification(path=path, error=str(e))
+
+
+def classify_inbox_files(paths: Iterable[str], workers: Optional[int] = None,
+                         load: Optional[Callable[[str], ParsedNote]] = None) -> Iterator[InboxClassification]:
+    """ファイルを分類し、結果を入力順に逐次返す
+
+    workers: プロセス数（None なら CPU 数。1 以下かファイル数が POOL_MIN_FILES 未満ならメインプロセスで分類）
+    load: メインプロセスで分類するときの解析関数（ノートキャッシュの get など。省略時は毎回解析）
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < POOL_MIN_FILES:
+        for path in paths:
+            if load is None:
+                yield classify_inbox_file(path)
+                continue
+            try:
+                yield classify_note(load(path))
+            except Exception as e:
+                yield InboxClassification(path=path, error=str(e))
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        yield from executor.map(classify_inbox_file, paths, chunksize=POOL_CHUNK_SIZE)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+潜在リンク発見エンジン
+ノート本文の単語集合の Jaccard 類似度が閾値を超えるノートの組を、全ペアを比較せずに求めます
+
+- 本文は1回だけ単語分割（従来はペアごとに2回 re.findall）
+- 各ペアは1回だけ評価（A↔B と B↔A を重複して評価しない）
+- 共通語数はノート×単語の行列積（CSR）でブロックごとに計算し、閾値判定もまとめて行う
+  （多くのノートに出る語の列だけは密行列にして BLAS で計算）
+- scipy がない環境では転置リスト + 接頭辞フィルタで計算: 単語を出現ノート数の少ない順に並べたとき、
+  Jaccard が閾値 t を超える2ノートはそれぞれの先頭 |x| - ceil(t·|x|) + 1 語のどこかで必ず一致する
+"""
+
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+WORD_PATTERN = re.compile(r'\w+')
+PAIR_BLOCK = 512         # 共通語数を一度に求めるノート数（PAIR_BLOCK × 全ノートの密行列）
+DENSE_FRACTION = 0.05    # この割合以上のノートに出る語は密行列（BLAS）で数える
+
+
+def tokenize(content: str) -> Set[str]:
+    """単語集合（従来の _calculate_content_similarity と同じ分割）"""
+    return set(WORD_PATTERN.findall(content.lower()))
+
+
+def jaccard(words1: Set[str], words2: Set[str]) -> float:
+    union = len(words1 | words2)
+    return len(words1 & words2) / union if union else 0
+
+
+def _prefix_length(size: int, threshold: float) -> int:
+    return min(size, size - math.ceil(threshold * size) + 1)
+
+
+def _ordered_token_ids(token_sets: Sequence[Set[str]]) -> List[List[int]]:
+    """各ノートの単語を「出現ノート数の少ない順」の通し番号の昇順リストに変換"""
+    frequency = Counter(token for tokens in token_sets for token in tokens)
+    rank = {token: i for i, (token, _) in enumerate(
+        sorted(frequency.items(), key=lambda item: (item[1], item[0])))}
+    return [sorted(rank[token] for token in tokens) for tokens in token_sets]
+
+
+def _pairs_sparse(ordered: List[List[int]], threshold: float) -> List[Tuple[int, int, float]]:
+    """ノート×単語の行列積でブロックごとに共通語数を求める類似ペア検出"""
+    n = len(ordered)
+    sizes = np.fromiter((len(ids) for ids in ordered), dtype=np.int64, count=n)
+    vocabulary_size = max((ids[-1] for ids in ordered if ids), default=-1) + 1
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    indices = np.fromiter((i for ids in ordered for i in ids), dtype=np.int32, count=int(indptr[-1]))
+    words = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                              shape=(n, vocabulary_size))
+
+    # 1ノートにしか出ない語は共通語にならないので除外。多くのノートに出る語は密行列の BLAS 積、
+    # それ以外は疎行列積で数える（frontmatter のキーなど全ノート共通の語で疎行列積が遅くならない）
+    frequency = np.bincount(indices, minlength=vocabulary_size)
+    dense_columns = np.nonzero(frequency >= max(2, n * DENSE_FRACTION))[0]
+    sparse_columns = np.nonzero((frequency >= 2) & (frequency < max(2, n * DENSE_FRACTION)))[0]
+    dense_words = words[:, dense_columns].toarray()
+    sparse_words = words[:, sparse_columns].tocsr()
+
+    scaled_sizes = (sizes * threshold).astype(np.float32) - 1e-3
+    pairs = []
+    for start in range(0, n, PAIR_BLOCK):
+        stop = min(n, start + PAIR_BLOCK)
+        # 行 start:stop × 列 start:n（各ペアは i < j の向きで1回だけ）
+        common = dense_words[start:stop] @ dense_words[start:].T
+        common += (sparse_words[start:stop] @ sparse_words[start:].T).toarray()
+        # Jaccard > t ⇔ 共通語数·(1+t) > t·(|x|+|y|)。float32 で少し緩く絞り込み、該当ペアだけ厳密に再計算
+        common *= 1 + threshold
+        hit = common >= scaled_sizes[start:stop, None] + scaled_sizes[None, start:]
+        hit[:, :stop - start] &= np.triu(np.ones((stop - start, stop - start), dtype=bool), k=1)
+        rows, columns = np.nonzero(hit)
+        shared = np.rint(common[rows, columns] / (1 + threshold))
+        left, right = rows + start, columns + start
+        with np.errstate(invalid='ignore'):  # 空ノート同士（和集合0）は nan → 不採用
+            similarity = shared / (sizes[left] + sizes[right] - shared)
+        exact = similarity > threshold
+        pairs.extend(zip(left[exact].tolist(), right[exact].tolist(), similarity[exact].tolist()))
+    return pairs
+
+
+def _pairs_python(ordered: List[List[int]], threshold: float) -> List[Tuple[int, int, float]]:
+    """接頭辞フィルタ + 転置リストによる類似ペア検出（scipy なし）"""
+    postings: Dict[int, List[int]] = defaultdict(list)
+    sets = [set(ids) for ids in ordered]
+    pairs = []
+    for j, ids in enumerate(ordered):
+        size = len(ids)
+        candidates = set()
+        for token in ids[:_prefix_length(size, threshold)]:
+            candidates.update(postings[token])
+            postings[token].append(j)
+        for i in candidates:
+            other = len(ordered[i])
+            if other * threshold >= size or size * threshold >= other:
+                continue
+            common = len(sets[i] & sets[j])
+            similarity = common / (size + other - common)
+            if similarity > threshold:
+                pairs.append((i, j, similarity))
+    return pairs
+
+
+def _limit_per_note(pairs: List[Tuple[int, int, float]], top_k: int) -> List[Tuple[int, int, float]]:
+    """どちらかのノートにとって上位 top_k 件に入るペアだけを残す（pairs は類似度の降順）"""
+    rank = Counter()
+    kept = []
+    for i, j, similarity in pairs:
+        if rank[i] < top_k or rank[j] < top_k:
+            kept.append((i, j, similarity))
+        rank[i] += 1
+        rank[j] += 1
+    return kept
+
+
+def find_similar_pairs(contents: Sequence[str], threshold: float = 0.3,
+                       top_k: Optional[int] = None,
+                       use_sparse: Optional[bool] = None) -> List[Tuple[int, int, float]]:
+    """Jaccard 類似度が threshold を超えるペア [(i, j, similarity)]（i < j、類似度の降順）
+
+    top_k: 指定時は各ノートの上位 top_k 件に入るペアだけを返す
+    use_sparse: None なら scipy があれば疎行列、なければ転置リストで計算
+    """
+    return similar_token_pairs([tokenize(content) for content in contents], threshold, top_k, use_sparse)
+
+
+def similar_token_pairs(token_sets: Sequence[Set[str]], threshold: float = 0.3,
+                        top_k: Optional[int] = None,
+                        use_sparse: Optional[bool] = None) -> List[Tuple[int, int, float]]:
+    """find_similar_pairs の単語分割済み版（token_sets は tokenize() の結果）"""
+    if use_sparse is None:
+        use_sparse = sparse is not None
+    ordered = _ordered_token_ids(token_sets)
+    pairs = (_pairs_sparse if use_sparse else _pairs_python)(ordered, threshold)
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    if top_k is not None:
+        pairs = _limit_per_note(pairs, top_k)
+    return pairs
+
+
+def discover_links(notes: Dict[str, str], threshold: float = 0.3,
+                   top_k: Optional[int] = None) -> List[Dict]:
+    """{ファイル名: 本文} から潜在リンク提案 [{'note1', 'note2', 'similarity'}] を作成"""
+    return discover_links_from_tokens({name: tokenize(content) for name, content in notes.items()},
+                                      threshold, top_k)
+
+
+def discover_links_from_tokens(token_sets: Dict[str, Set[str]], threshold: float = 0.3,
+                               top_k: Optional[int] = None) -> List[Dict]:
+    """{ファイル名: 単語集合} から潜在リンク提案を作成（ノートキャッシュの単語集合を再利用）"""
+    names = list(token_sets)
+    pairs = similar_token_pairs([token_sets[name] for name in names], threshold, top_k)
+    return [{'note1': names[i], 'note2': names[j], 'similarity': similarity}
+            for i, j, similarity in pairs]
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+LLM 応答キャッシュ
+モデル・パラメータ・プロンプトのハッシュをキーに、LLM の応答テキストを SQLite に永続化します
+
+- キー: リクエスト（provider・model・temperature などのパラメータ・メッセージ）を正規化した JSON の SHA-256
+  （内容アドレス方式。同じプロンプトの再実行・再試行では API を呼ばない）
+- mode:
+    read_through:  キャッシュを参照し、なければ API を呼んで保存（既定）
+    write_through: 常に API を呼び、結果でキャッシュを更新（応答を作り直したいとき）
+    off:           キャッシュを使わない
+- 環境変数 LLM_CACHE_BYPASS=1 で一時的にキャッシュを迂回（参照も保存もしない）
+- 有効期限（ttl_days）を過ぎたエントリはミス扱いで削除し、件数・合計サイズの上限を超えたら
+  最終参照が古い順に削除（LRU）
+- ヒット・ミス・保存・削除の件数を記録
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import get_config
+
+CACHE_VERSION = 1  # キーの形式を変えたら上げる（古いエントリはヒットしなくなる）
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "logs" / "llm_cache.db"
+MODES = ("read_through", "write_through", "off")
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """リクエストの内容ハッシュ（キーの順序・空白に依存しない）"""
+    canonical = json.dumps({"version": CACHE_VERSION, "request": request},
+                           sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """内容アドレス方式の永続 LLM 応答キャッシュ"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, mode: str = "read_through", ttl_days: float = 30,
+                 max_entries: int = 5000, max_size_mb: float = 200, bypass: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"mode は {', '.join(MODES)} のいずれか: {mode}")
+        self.db_path = Path(db_path)
+        self.mode = mode
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+        self.setup_database()
+
+    @classmethod
+    def from_config(cls, db_path=DEFAULT_DB_PATH) -> "LLMCache":
+        """config の llm_cache 設定と環境変数 LLM_CACHE_BYPASS から作成"""
+        config = get_config("llm_cache")
+        return cls(db_path,
+                   mode=config.get("mode", "read_through"),
+                   ttl_days=config.get("ttl_days", 30),
+                   max_entries=config.get("max_entries", 5000),
+                   max_size_mb=config.get("max_size_mb", 200),
+                   bypass=os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes"))
+
+    def setup_database(self):
+        """テーブル作成"""
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses(last_access)')
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and not self.bypass
+
+    # 参照・保存
+
+    def get(self, request: Dict[str, Any]) -> Optional[str]:
+        """キャッシュ済みの応答（なければ・期限切れなら None）"""
+        key = request_key(request)
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT response, created_at FROM llm_responses WHERE key = ?',
+                                    (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self.conn.execute('DELETE FROM llm_responses WHERE key = ?', (key,))
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE llm_responses SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?',
+                              (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, request: Dict[str, Any], response: str):
+        """応答を保存し、上限を超えたら古いエントリを削除"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?, ?, 0)', (
+                request_key(request), request.get("provider"), request.get("model"),
+                response, size, now, now))
+            self.writes += 1
+            self._evict(now)
+
+    def discard(self, request: Dict[str, Any]):
+        """使えなかった応答（JSON を抽出できない等）を削除し、次回は API を呼び直す"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM llm_responses WHERE key = ?', (request_key(request),))
+
+    def _evict(self, now: float):
+        """期限切れ・上限超過のエントリを削除（ロック・トランザクション内で呼ぶ）"""
+        cursor = self.conn.execute('DELETE FROM llm_responses WHERE created_at < ?', (now - self.ttl_seconds,))
+        self.evictions += cursor.rowcount
+        count, total = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self.conn.execute('SELECT key, size FROM llm_responses ORDER BY last_access').fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        self.conn.executemany('DELETE FROM llm_responses WHERE key = ?', stale)
+        self.evictions += len(stale)
+
+    def get_or_call(self, request: Dict[str, Any], call: Callable[[], str]) -> str:
+        """mode に従ってキャッシュを参照し、必要なら call() で API を呼んで保存（空の応答は保存しない）"""
+        if not self.enabled:
+            return call()
+        if self.mode == "read_through":
+            cached = self.get(request)
+            if cached is not None:
+                return cached
+        else:
+            self.misses += 1
+        response = call()
+        if response:
+            self.put(request, response)
+        return response
+
+    async def aget_or_call(self, request: Dict[str, Any], call: Callable[[], Awaitable[str]]) -> str:
+        """get_or_call の非同期版（call は API を呼ぶコルーチンを返す関数）"""
+        if not self.enabled:
+            return await call()
+        if self.mode == "read_through":
+            cached = self.get(request)
+            if cached is not None:
+                return cached
+        else:
+            self.misses += 1
+        response = await call()
+        if response:
+            self.put(request, response)
+        return response
+
+    # 管理
+
+    def stats(self) -> Dict[str, Any]:
+        count, total = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses').fetchone()
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes,
+                "evictions": self.evictions, "entries": count, "size_bytes": total}
+
+    def summary(self) -> str:
+        """ヒット・ミス件数の表示用文字列"""
+        if not self.enabled:
+            return "💾 LLMキャッシュ: 無効" + ("（バイパス）" if self.bypass else "")
+        return f"💾 LLMキャッシュ: ヒット{self.hits}件 / ミス{self.misses}件"
+
+    def prune(self) -> int:
+        """期限切れ・上限超過のエントリを削除し、削除件数を返す"""
+        before = self.evictions
+        with self.lock, self.conn:
+            self._evict(time.time())
+        return self.evictions - before
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM llm_responses')
+
+
+@lru_cache(maxsize=None)
+def shared_cache(db_path: str = str(DEFAULT_DB_PATH)) -> LLMCache:
+    """プロセス内で共有するキャッシュ（生成器・エージェントごとに接続を作らない）"""
+    return LLMCache.from_config(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 応答キャッシュ")
+    parser.add_argument("--stats", action="store_true", help="エントリ数・サイズを表示")
+    parser.add_argument("--prune", action="store_true", help="期限切れ・上限超過のエントリを削除")
+    parser.add_argument("--clear", action="store_true", help="全エントリを削除")
+    args = parser.parse_args()
+
+    cache = LLMCache.from_config()
+    if args.clear:
+        cache.clear()
+        print("🗑️ LLMキャッシュを削除しました")
+    if args.prune:
+        print(f"🧹 {cache.prune()}件を削除しました")
+    stats = cache.stats()
+    print(f"💾 LLMキャッシュ: {stats['entries']}件 / {stats['size_bytes'] / 1024 / 1024:.1f}MB "
+          f"（{cache.db_path}、mode: {cache.mode}）")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+重複ノート検出（MinHash + LSH）
+本文の文字 n-gram（シングル）の Jaccard 類似度が閾値以上のノートの集まりを、全ペアを比較せずに求めます
+
+- シングルは文字コード列のローリングハッシュで一括計算（32bit）
+- MinHash: num_perm 個のハッシュ関数 ((a·x + b) mod 2^64) >> 32（multiply-add-shift）の最小値を署名にする
+  （numpy の uint64 演算の折り返しをそのまま使い、剰余演算なしで一括計算）
+- LSH: 署名を bands × rows に分割し、いずれかの帯が一致したノートだけを候補にする
+  （帯の数・行数は閾値の前後で偽陽性・偽陰性が最小になる組を選ぶ）
+- 候補は署名の一致率（Jaccard 推定値）で確認し、Union-Find でグループにまとめる
+- 大きなバケット（テンプレートのコピーなど）は全ペアに展開せず、先頭のノートとのペアだけを候補にする
+  （バケット内の数に比例。先頭と似ていないノートどうしの組は他の帯のバケットで見つける）
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+HASH_SHIFT = np.uint64(32)
+HASH_MAX = np.uint64(2 ** 32)  # ハッシュ値は32bit（署名の初期値）
+ROLLING_BASE = np.uint64(1000003)
+SIGNATURE_CHUNK = 4096  # 1回の MinHash 計算で扱うシングル数（num_perm × chunk の行列）
+LARGE_BUCKET = 64  # これより多いノートが入ったバケットは全ペアに展開しない
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """空白を正規化・小文字化した本文の文字 size-gram のハッシュ値（重複なし、uint64 に格納した32bit値）"""
+    normalized = " ".join(text.lower().split())
+    if not normalized:
+        return np.zeros(0, dtype=np.uint64)
+    codes = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    size = min(size, len(codes))
+    count = len(codes) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * ROLLING_BASE + codes[offset:offset + count]  # 2^64 で折り返し
+    hashes ^= hashes >> np.uint64(32)
+    return np.unique(hashes & np.uint64(0xFFFFFFFF))
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """閾値の前後の偽陽性・偽陰性の面積の和が最小になる (bands, rows)"""
+    similarity = np.linspace(0.0, 1.0, 201)
+    below, above = similarity < threshold, similarity >= threshold
+    best, best_error = (num_perm, 1), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            probability = 1 - (1 - similarity ** rows) ** bands
+            error = (probability[below].mean() * threshold if below.any() else 0.0)
+            error += ((1 - probability[above]).mean() * (1 - threshold) if above.any() else 0.0)
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """MinHash 署名の LSH 索引"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128,
+                 shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # multiply-add-shift の係数（a は奇数）
+        self.a = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2)
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+
+        self.keys: List[str] = []
+        self.signatures: List[np.ndarray] = []
+        self.buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash 署名（シングルがない空のノートは None）"""
+        shingles = shingle_hashes(text, self.shingle_size)
+        if len(shingles) == 0:
+            return None
+        signature = np.full(self.num_perm, HASH_MAX, dtype=np.uint64)
+        for start in range(0, len(shingles), SIGNATURE_CHUNK):
+            chunk = shingles[start:start + SIGNATURE_CHUNK]
+            values = (self.a[:, None] * chunk[None, :] + self.b[:, None]) >> HASH_SHIFT
+            np.minimum(signature, values.min(axis=1), out=signature)
+        return signature
+
+    def add(self, key: str, text: str) -> bool:
+        """ノートを索引に追加（空のノートは追加しない）"""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        position = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(signature)
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets[band][signature[start:start + self.rows].tobytes()].append(position)
+        return True
+
+    def candidate_pairs(self) -> set:
+        """いずれかの帯が一致したペア {(i, j)}（i < j）"""
+        pairs = set()
+        for buckets in self.buckets:
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) > LARGE_BUCKET:
+                    # 確認で類似と分かれば Union-Find で先頭のグループにまとまる
+                    anchor = members[0]
+                    pairs.update((anchor, j) for j in members[1:])
+                    continue
+                for x, i in enumerate(members):
+                    for j in members[x + 1:]:
+                        pairs.add((i, j))
+        return pairs
+
+    def estimated_similarity(self, i: int, j: int) -> float:
+        """署名の一致率（Jaccard 類似度の推定値）"""
+        return float(np.mean(self.signatures[i] == self.signatures[j]))
+
+    def duplicate_pairs(self) -> List[Tuple[int, int, float]]:
+        """推定類似度が閾値以上のペア [(i, j, similarity)]"""
+        pairs = []
+        for i, j in self.candidate_pairs():
+            similarity = self.estimated_similarity(i, j)
+            if similarity >= self.threshold:
+                pairs.append((i, j, similarity))
+        return pairs
+
+    def clusters(self) -> List[Dict]:
+        """重複候補のグループ [{'notes': [...], 'similarity': グループ内の最大類似度}]"""
+        parent = list(range(len(self.keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        best = defaultdict(float)
+        pairs = self.duplicate_pairs()
+        for i, j, _ in pairs:
+            parent[find(i)] = find(j)
+        members = defaultdict(list)
+        for i, j, similarity in pairs:
+            root = find(i)
+            best[root] = max(best[root], similarity)
+        for i in range(len(self.keys)):
+            if find(i) in best:
+                members[find(i)].append(self.keys[i])
+
+        groups = [{'notes': sorted(notes), 'similarity': best[root]} for root, notes in members.items()]
+        return sorted(groups, key=lambda group: (-len(group['notes']), -group['similarity'], group['notes']))
+
+
+def find_duplicate_clusters(notes: Dict[str, str], threshold: float = 0.8,
+                            num_perm: int = 128, shingle_size: int = 5) -> List[Dict]:
+    """{ノート名: 本文} から重複候補のグループを検出"""
+    index = MinHashLSH(threshold, num_perm, shingle_size)
+    for key, text in notes.items():
+        index.add(key, text)
+    return index.clusters()
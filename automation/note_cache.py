@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+ノート解析キャッシュ
+Obsidian ノートの解析結果（frontmatter・本文・リンク・見出し・単語集合）をパスと mtime をキーに保持します
+
+- ZettelkastenProcessor の日次メンテナンスの各ステップで共有（同じファイルを何度も解析しない）
+- logs/ に pickle で保存し、次回の実行でも mtime・サイズが同じノートは再解析しない
+- 削除されたファイルのエントリは保存時に除去
+- 受信箱の分類ワーカー（inbox_classifier）が解析した結果は put() で登録
+"""
+
+import os
+import re
+import copy
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import frontmatter
+
+from link_discovery import tokenize
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "logs" / "zettelkasten_note_cache.pickle"
+
+WIKILINK_PATTERN = re.compile(r'\[\[([^\]]+)\]\]')
+HEADER_PATTERN = re.compile(r'^(#{1,6})\s+(.+)', re.MULTILINE)
+
+
+@dataclass
+class ParsedNote:
+    """1ノートの解析結果"""
+    path: str
+    mtime_ns: int
+    size: int
+    metadata: Dict
+    content: str  # frontmatter を除いた本文
+    links: List[str]  # 本文の [[リンク]]
+    headers: List[Tuple[str, str]]  # (見出し記号, 見出し文字列)
+    tokens: FrozenSet[str]  # ファイル全体（frontmatter込み）の単語集合
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    def to_post(self) -> frontmatter.Post:
+        """書き換え用の frontmatter.Post（キャッシュのメタデータは変更されない）"""
+        return frontmatter.Post(self.content, **copy.deepcopy(self.metadata))
+
+
+def parse_note(path: str, stat: Optional[os.stat_result] = None) -> ParsedNote:
+    """ファイルを1回読み込んで解析"""
+    stat = stat or os.stat(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    post = frontmatter.loads(text)
+    return ParsedNote(
+        path=path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        metadata=post.metadata,
+        content=post.content,
+        links=WIKILINK_PATTERN.findall(post.content),
+        headers=HEADER_PATTERN.findall(post.content),
+        tokens=frozenset(tokenize(text))
+    )
+
+
+class NoteCache:
+    """パス + mtime をキーにした永続ノート解析キャッシュ"""
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.notes: Dict[str, ParsedNote] = {}
+        self.hits = 0
+        self.misses = 0
+        self._touched = set()
+        self._load()
+
+    def _load(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ ノートキャッシュを読み込めないため作り直します: {e}")
+            return
+        if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+            self.notes = data['notes']
+
+    def get(self, path: str) -> ParsedNote:
+        """解析結果（mtime・サイズが変わっていなければキャッシュから）"""
+        stat = os.stat(path)
+        note = self.notes.get(path)
+        if note is not None and note.mtime_ns == stat.st_mtime_ns and note.size == stat.st_size:
+            self.hits += 1
+        else:
+            note = parse_note(path, stat)
+            self.notes[path] = note
+            self.misses += 1
+        self._touched.add(path)
+        return note
+
+    def put(self, note: ParsedNote):
+        """別プロセスで解析した結果を登録（解析数として数える）"""
+        self.notes[note.path] = note
+        self.misses += 1
+        self._touched.add(note.path)
+
+    def folder(self, folder: str) -> List[ParsedNote]:
+        """フォルダ内の Markdown ノート（読み込めないファイルは表示して除外）"""
+        notes = []
+        if not os.path.exists(folder):
+            return notes
+        for filename in os.listdir(folder):
+            if filename.endswith('.md'):
+                try:
+                    notes.append(self.get(os.path.join(folder, filename)))
+                except Exception as e:
+                    print(f"❌ 読み込みエラー ({filename}): {e}")
+        return notes
+
+    def discard(self, path: str):
+        """移動・削除したファイルのエントリを破棄"""
+        self.notes.pop(path, None)
+        self._touched.discard(path)
+
+    def save(self):
+        """キャッシュを保存（今回参照せず、既に存在しないファイルのエントリは除去）"""
+        for path in [path for path in self.notes if path not in self._touched]:
+            if not os.path.exists(path):
+                del self.notes[path]
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".note_cache_", dir=str(self.cache_path.parent))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'version': CACHE_VERSION, 'notes': self.notes}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
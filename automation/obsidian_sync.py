@@ -5,13 +5,21 @@ post_toolプロジェクト ↔ Obsidian Vault の双方向同期
 """
 
 import os
-import shutil
 import json
+import argparse
 from datetime import datetime
 from pathlib import Path
 
+from config import get_config
+from copy_engine import CopyJob, ParallelCopier
+from file_snapshot_index import FileSnapshotIndex
+from ignore_rules import IgnoreMatcher
+
+# 競合コピーのファイル名に付ける印（同期対象からは除外）
+CONFLICT_MARKER = ".sync-conflict-"
+
 class ObsidianSync:
-    def __init__(self):
+    def __init__(self, dry_run=False):
         self.project_root = Path("/Users/dd/Desktop/1_dev/coding-rule2/projects/post_tool")
         self.obsidian_vault = Path("/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents")
         self.project_vault = self.project_root / "obsidian_vault"
@@ -30,6 +38,20 @@ class ObsidianSync:
             }
         }
         
+        # 前回同期以降の変更だけをコピーするためのスナップショット索引
+        self.snapshot_index = FileSnapshotIndex(scope="obsidian_sync")
+        self.conflict_matcher = IgnoreMatcher(patterns=[f"*{CONFLICT_MARKER}*"], extensions=[],
+                                              respect_gitignore=False)
+        self.reset_stats()
+        self.dry_run = dry_run
+        
+        # 大量コピー（初回同期など）はスレッドプールで並列実行
+        config = get_config("obsidian_sync")
+        self.tombstone_days = config.get("tombstone_days", 30)
+        self.copier = ParallelCopier(workers=config.get("copy_workers", 8),
+                                     progress_interval=config.get("progress_interval", 2.0),
+                                     label="Obsidian同期コピー")
+        
     def ensure_structure(self):
         """プロジェクト内Obsidianフォルダ構造を確保"""
         folders = [
@@ -54,23 +76,9 @@ class ObsidianSync:
             print("❌ ObsidianVaultが見つかりません")
             return False
             
-        synced_files = 0
-        
-        for project_path, vault_path in self.sync_config["project_to_vault"].items():
-            source = self.project_root / project_path
-            target = self.obsidian_vault / vault_path
-            
-            if source.exists():
-                target.mkdir(parents=True, exist_ok=True)
-                
-                # .mdファイルのみ同期
-                for md_file in source.rglob("*.md"):
-                    relative_path = md_file.relative_to(source)
-                    target_file = target / relative_path
-                    
-                    target_file.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(md_file, target_file)
-                    synced_files += 1
+        synced_files = self._sync_mappings(
+            self.sync_config["project_to_vault"], self.project_root, self.obsidian_vault,
+            "project_to_vault")
                     
         print(f"✅ プロジェクト→Obsidian同期完了: {synced_files}ファイル")
         return True
@@ -81,26 +89,219 @@ class ObsidianSync:
             print("❌ ObsidianVaultが見つかりません")
             return False
             
+        synced_files = self._sync_mappings(
+            self.sync_config["vault_to_project"], self.obsidian_vault, self.project_root,
+            "vault_to_project")
+                    
+        print(f"✅ Obsidian→プロジェクト同期完了: {synced_files}ファイル")
+        return True
+    
+    def _sync_mappings(self, mappings, source_base, target_base, direction):
+        """マッピングごとに前回同期以降の変更（追加・更新・削除・リネーム）を同期先へ反映
+
+        各マッピングのチェックポイント（同期元・同期先それぞれ）が前回同期時点のマニフェストです。
+        - 同期先と同一（サイズ・mtime一致、または内容ハッシュ一致）ならスキップ
+        - 前回同期以降に両側で変更されていれば競合として同期先を上書きせず、
+          同期元の内容を競合コピー（*.sync-conflict-日時.md）として残す
+        - 同期元での削除は、同期先が前回同期時のままなら削除して墓標（tombstone）を記録
+        - 削除と追加の内容ハッシュが一致すればリネームとして同期先も移動
+        - 墓標と同じ内容のファイルが、墓標より古い mtime のまま同期元に再出現したら古いコピーの復活とみなし、
+          同期せず報告だけする（ファイルは削除しない。墓標より新しければ復元・再作成として通常どおり同期）
+        """
         synced_files = 0
         
-        for vault_path, project_path in self.sync_config["vault_to_project"].items():
-            source = self.obsidian_vault / vault_path
-            target = self.project_root / project_path
+        for source_path, target_path in mappings.items():
+            source = source_base / source_path
+            target = target_base / target_path
             
             if source.exists():
-                target.mkdir(parents=True, exist_ok=True)
+                checkpoint = f"obsidian_sync:{direction}:{target_path}"
+                target_checkpoint = f"{checkpoint}:target"
                 
-                # .mdファイルのみ同期
-                for md_file in source.rglob("*.md"):
-                    relative_path = md_file.relative_to(source)
-                    target_file = target / relative_path
-                    
-                    target_file.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(md_file, target_file)
-                    synced_files += 1
+                # .mdファイルのみ同期（索引でチェックポイントからの差分を取得）
+                self.snapshot_index.refresh(source, suffixes=(".md",), matcher=self.conflict_matcher)
+                self.snapshot_index.refresh(target, suffixes=(".md",), matcher=self.conflict_matcher)
+                plan = self._plan_mapping(source, target, checkpoint, target_checkpoint)
+                
+                if self.dry_run:
+                    self._print_plan(target_path, plan)
+                    continue
+                
+                target.mkdir(parents=True, exist_ok=True)
+                synced_files += self._apply_plan(source, target, target_path, plan)
+                self.snapshot_index.commit_checkpoint(checkpoint, source, paths=plan["done"])
+                self.snapshot_index.commit_checkpoint(target_checkpoint, target)
                     
-        print(f"✅ Obsidian→プロジェクト同期完了: {synced_files}ファイル")
-        return True
+        return synced_files
+    
+    def _plan_mapping(self, source, target, checkpoint, target_checkpoint):
+        """1マッピング分の同期計画（ファイル操作は行わない）"""
+        index = self.snapshot_index
+        changes = index.changes_since(checkpoint, source)
+        
+        # 同期先側の変更（初回は比較基準がないので競合判定しない）
+        target_changed = set()
+        if index.has_checkpoint(target_checkpoint, target):
+            target_changed = set(index.changes_since(target_checkpoint, target).changed)
+        tombstones = index.tombstones(source, self.tombstone_days)
+        
+        plan = {"copy": [], "conflict": [], "skip": [], "delete": [], "rename": [],
+                "keep": [], "stale": [], "done": []}
+        
+        # 削除されたパスの前回同期時の内容（リネーム・削除判定用）
+        deleted = {}
+        for relative_path in changes.deleted:
+            previous = index.checkpoint_get(checkpoint, source, relative_path)
+            deleted[relative_path] = previous[2] if previous else None
+        deleted_by_hash = {}
+        for relative_path, digest in deleted.items():
+            deleted_by_hash.setdefault(digest, []).append(relative_path)
+        
+        for relative_path in changes.changed:
+            source_state = index.get(source, relative_path)
+            if source_state is None:
+                continue
+            size, digest = source_state[1], source_state[2]
+            target_state = index.get(target, relative_path)
+            
+            if target_state is not None and (
+                    target_state[:2] == source_state[:2] or target_state[2] == digest):
+                plan["skip"].append((relative_path, size))
+                continue
+            
+            tombstone = tombstones.get(relative_path)
+            if (target_state is None and tombstone is not None and tombstone[0] == digest
+                    and source_state[0] < datetime.fromisoformat(tombstone[1]).timestamp() * 1e9):
+                plan["stale"].append(relative_path)
+                continue
+            
+            if target_state is None and relative_path in changes.added and deleted_by_hash.get(digest):
+                old_path = deleted_by_hash[digest].pop()
+                old_target = index.get(target, old_path)
+                if old_target is not None and old_target[2] == digest:
+                    del deleted[old_path]
+                    plan["rename"].append((old_path, relative_path))
+                    continue
+            
+            if relative_path in target_changed:
+                plan["conflict"].append((relative_path, size))
+            else:
+                plan["copy"].append((relative_path, size))
+        
+        for relative_path, digest in deleted.items():
+            target_state = index.get(target, relative_path)
+            if target_state is None:
+                plan["done"].append(relative_path)
+            elif target_state[2] == digest:
+                plan["delete"].append((relative_path, digest))
+            else:
+                # 同期先で編集済みなら削除より編集を優先（逆方向の同期で同期元へ戻る）
+                plan["keep"].append(relative_path)
+        
+        return plan
+    
+    def _apply_plan(self, source, target, target_path, plan):
+        """同期計画を実行し、同期先へ書き込んだファイル数を返す"""
+        index = self.snapshot_index
+        done = plan["done"]
+        touched = []
+        
+        for relative_path, size in plan["skip"]:
+            self.sync_stats["skipped_files"] += 1
+            self.sync_stats["skipped_bytes"] += size
+            done.append(relative_path)
+        
+        jobs = [CopyJob(source / relative_path, target / relative_path, size, tag=(relative_path, False))
+                for relative_path, size in plan["copy"]]
+        for relative_path, size in plan["conflict"]:
+            destination = self._conflict_path(target / relative_path)
+            self.sync_stats["conflicts"].append(f"{target_path}/{relative_path}")
+            print(f"⚠️  競合（両側で変更）: {target_path}/{relative_path} → {destination.name}")
+            jobs.append(CopyJob(source / relative_path, destination, size, tag=(relative_path, True)))
+        
+        # コピーは並列・アトミックに実行
+        synced_files = 0
+        for result in self.copier.copy_all(jobs):
+            relative_path, conflict = result.job.tag
+            if not result.ok:
+                print(f"❌ コピー失敗 ({relative_path}): {result.error}")
+                continue
+            done.append(relative_path)
+            if not conflict:
+                touched.append(relative_path)
+                synced_files += 1
+                self.sync_stats["copied_files"] += 1
+                self.sync_stats["copied_bytes"] += result.job.size
+        
+        for old_path, new_path in plan["rename"]:
+            try:
+                (target / new_path).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(target / old_path, target / new_path)
+            except OSError as e:
+                print(f"❌ リネーム失敗 ({old_path} → {new_path}): {e}")
+                continue
+            done.extend([old_path, new_path])
+            touched.extend([old_path, new_path])
+            self.sync_stats["renamed_files"] += 1
+        
+        tombstones = []
+        for relative_path, digest in plan["delete"]:
+            try:
+                os.remove(target / relative_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"❌ 削除失敗 ({relative_path}): {e}")
+                continue
+            done.append(relative_path)
+            touched.append(relative_path)
+            tombstones.append((relative_path, digest))
+            self.sync_stats["deleted_files"] += 1
+        index.add_tombstones(target, tombstones)
+        
+        # 削除済みファイルの古いコピー: 意図した復元の可能性もあるので削除せず、同期もしない
+        for relative_path in plan["stale"]:
+            print(f"⚠️  削除済みファイルの古いコピー（同期しません。不要なら手動で削除）: {source / relative_path}")
+            self.sync_stats["stale_kept"].append(str(source / relative_path))
+        done.extend(plan["stale"])
+        
+        done.extend(plan["keep"])
+        self.sync_stats["kept_files"] += len(plan["keep"])
+        index.update_paths(target, touched)
+        return synced_files
+    
+    def _print_plan(self, target_path, plan):
+        """ドライラン時の差分レポート"""
+        rows = ([("+", f"{path} ({size:,}バイト)") for path, size in plan["copy"]] +
+                [("!", f"{path}（競合: 競合コピーとして保存）") for path, _ in plan["conflict"]] +
+                [("→", f"{old} → {new}") for old, new in plan["rename"]] +
+                [("-", path) for path, _ in plan["delete"]] +
+                [("=", f"{path}（同期先で編集済みのため削除しない）") for path in plan["keep"]] +
+                [("⚠", f"{path}（削除済みファイルの古いコピーのため同期しない）") for path in plan["stale"]])
+        skipped_bytes = sum(size for _, size in plan["skip"])
+        print(f"🧪 {target_path}: 変更{len(rows)}件 / スキップ{len(plan['skip'])}件 ({skipped_bytes:,}バイト)")
+        for mark, text in rows:
+            print(f"   {mark} {text}")
+    
+    @staticmethod
+    def _conflict_path(target_file):
+        """競合コピーの保存先"""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return target_file.with_name(f"{target_file.stem}{CONFLICT_MARKER}{stamp}{target_file.suffix}")
+    
+    def reset_stats(self):
+        """同期統計をリセット"""
+        self.sync_stats = {
+            "copied_files": 0,
+            "copied_bytes": 0,
+            "skipped_files": 0,
+            "skipped_bytes": 0,
+            "deleted_files": 0,
+            "renamed_files": 0,
+            "kept_files": 0,
+            "stale_kept": [],
+            "conflicts": []
+        }
     
     def create_sync_log(self):
         """同期ログ作成"""
@@ -108,7 +309,15 @@ class ObsidianSync:
             "timestamp": datetime.now().isoformat(),
             "sync_status": "completed",
             "project_vault_exists": self.project_vault.exists(),
-            "obsidian_vault_exists": self.obsidian_vault.exists()
+            "obsidian_vault_exists": self.obsidian_vault.exists(),
+            "copied_files": self.sync_stats["copied_files"],
+            "copied_bytes": self.sync_stats["copied_bytes"],
+            "skipped_files": self.sync_stats["skipped_files"],
+            "skipped_bytes": self.sync_stats["skipped_bytes"],
+            "deleted_files": self.sync_stats["deleted_files"],
+            "renamed_files": self.sync_stats["renamed_files"],
+            "stale_kept": self.sync_stats["stale_kept"],
+            "conflicts": self.sync_stats["conflicts"]
         }
         
         log_path = self.project_vault / "knowledge_management/dialogue_logs/sync_log.json"
@@ -135,19 +344,35 @@ class ObsidianSync:
         print("🔄 Obsidian同期開始...")
         
         # 1. フォルダ構造確保
-        self.ensure_structure()
+        if not self.dry_run:
+            self.ensure_structure()
         
         # 2. 双方向同期
+        self.reset_stats()
         self.sync_to_obsidian()
         self.sync_from_obsidian()
         
+        if self.dry_run:
+            print("🧪 ドライラン完了（ファイルは変更していません）")
+            return
+        
+        stats = self.sync_stats
+        print(f"📊 コピー: {stats['copied_files']}ファイル ({stats['copied_bytes']:,}バイト) / "
+              f"スキップ: {stats['skipped_files']}ファイル ({stats['skipped_bytes']:,}バイト) / "
+              f"削除: {stats['deleted_files']}件 / リネーム: {stats['renamed_files']}件 / "
+              f"競合: {len(stats['conflicts'])}件 / 削除済みの古いコピー: {len(stats['stale_kept'])}件")
+        
         # 3. ログ記録
         self.create_sync_log()
         
         print("✅ Obsidian同期完了")
 
 def main():
-    sync = ObsidianSync()
+    parser = argparse.ArgumentParser(description="Obsidian同期システム")
+    parser.add_argument("--dry-run", action="store_true", help="変更内容を表示するだけで同期しない")
+    args = parser.parse_args()
+    
+    sync = ObsidianSync(dry_run=args.dry_run)
     sync.run_full_sync()
 
 if __name__ == "__main__":
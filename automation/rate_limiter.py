@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+適応型レート制限（トークンバケット）
+LLM API へのリクエストを一定レートに抑え、429（Rate limit）を受けたらレートを下げて待機します
+
+- トークンバケット: rate 件/秒で補充、最大 burst 件まで連続で送信可能
+- 429 を受けたら Retry-After（なければ指数バックオフ）の間すべてのリクエストを止め、レートを半減
+- 成功が続いたらレートを少しずつ設定値まで戻す（AIMD）
+- 複数の記事・セクションを並行生成するときも同じ制限器を共有する
+"""
+
+import time
+import random
+import asyncio
+from typing import Optional
+
+MIN_RATE_FRACTION = 0.1  # 429 でレートを下げるときの下限（設定レートに対する割合）
+DECREASE_FACTOR = 0.5    # 429 を受けたときのレートの倍率
+INCREASE_FRACTION = 0.05  # 成功1件ごとに戻すレート（設定レートに対する割合）
+BASE_BACKOFF = 1.0       # Retry-After がないときの初回待機（秒）
+MAX_BACKOFF = 60.0
+
+
+class AdaptiveRateLimiter:
+    """429 に応じてレートを調整する非同期トークンバケット"""
+
+    def __init__(self, rate: float = 3.0, burst: int = 6):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled = 0  # 受けた 429 の数
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """送信可能になるまで待機してトークンを1つ消費"""
+        async with self._lock:  # 待機中の順番を保つ（先に待ったリクエストから送信）
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def record_success(self):
+        """成功したリクエスト: レートを設定値に向けて少し戻す"""
+        self._refill(time.monotonic())
+        self.rate = min(self.max_rate, self.rate + self.max_rate * INCREASE_FRACTION)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None, attempt: int = 0) -> float:
+        """429 を受けたリクエスト: レートを下げて全体を一時停止し、待機秒数を返す"""
+        self.throttled += 1
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * DECREASE_FACTOR)
+        if retry_after is None:
+            retry_after = min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt)) * random.uniform(0.5, 1.0)
+        self.paused_until = max(self.paused_until, now + retry_after)
+        self.tokens = min(self.tokens, 0.0)  # 再開直後にバーストしない
+        return retry_after
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """429 応答のヘッダーから待機秒数（retry-after-ms / retry-after）"""
+    if headers is None:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP 日付形式は扱わずバックオフに任せる
+    return None
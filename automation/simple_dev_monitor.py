@@ -7,16 +7,60 @@
 import os
 import json
 import time
+import threading
 import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from config import get_config
+from ignore_rules import IgnoreMatcher, plan_watches
+from file_snapshot_index import FileSnapshotIndex
+
+class ChangeSetCollector:
+    """watchdogイベントから変更パスをメモリ上に蓄積（周期ごとに取り出し）"""
+    
+    def __init__(self, matcher, max_tracked=10000):
+        self.matcher = matcher
+        self.max_tracked = max_tracked
+        self.changes = {}  # パス -> 最終変更時刻（挿入順を保持）
+        self.overflow = 0
+        self.lock = threading.Lock()
+        
+    def dispatch(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "moved"):
+            return
+        path = getattr(event, "dest_path", None) or event.src_path
+        if not self.matcher.accepts(path):
+            return
+        with self.lock:
+            if path in self.changes:
+                self.changes.pop(path)
+            elif len(self.changes) >= self.max_tracked:
+                self.overflow += 1
+                return
+            self.changes[path] = time.time()
+            
+    def drain(self):
+        """蓄積した変更を取り出してリセット（新しい順）"""
+        with self.lock:
+            changes, self.changes = self.changes, {}
+            overflow, self.overflow = self.overflow, 0
+        return list(reversed(changes)), overflow
+
 class SimpleDevMonitor:
     def __init__(self):
         self.project_dir = Path("/Users/dd/Desktop/1_dev/coding-rule2/projects/post_tool")
         self.brain_dir = Path("/Users/dd/Desktop/1_dev/coding-rule2")
         self.log_file = self.project_dir / "logs" / "simple_dev.log"
         self.log_file.parent.mkdir(exist_ok=True)
+        # find走査の基準ファイル（ログ書き込みで基準時刻が動かないよう専用に持つ）
+        self.scan_stamp = self.project_dir / "logs" / ".simple_dev_scan"
+        
+        self.config = get_config("simple_monitor")
+        self.change_collector = None
+        self.observers = []
+        self.matcher = IgnoreMatcher(extensions=self.config["file_extensions"])
+        self.snapshot_index = FileSnapshotIndex(scope="simple_dev_monitor")
         
         # 頭脳からAPIキー読み込み
         self.load_api_keys()
@@ -51,30 +95,95 @@ class SimpleDevMonitor:
         
         print(f"[{level}] {message}")
     
+    def start_event_watch(self):
+        """イベント駆動モード開始（watchdog未導入ならfind走査にフォールバック）"""
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            self.log_event("WARNING", "watchdog未インストールのためfind走査で監視します")
+            return False
+        
+        self.change_collector = ChangeSetCollector(self.matcher, self.config["max_tracked_changes"])
+        
+        for watch_dir in self.config["watch_dirs"]:
+            if not os.path.exists(watch_dir):
+                continue
+            observer = Observer()
+            for directory, recursive in plan_watches(watch_dir, self.matcher):
+                observer.schedule(self.change_collector, directory, recursive=recursive)
+            observer.start()
+            self.observers.append(observer)
+        
+        self.log_event("INFO", f"イベント駆動監視開始: {len(self.observers)}ディレクトリ")
+        return True
+    
+    def stop_event_watch(self):
+        """イベント駆動モード停止"""
+        for observer in self.observers:
+            observer.stop()
+            observer.join()
+        self.observers = []
+    
     def check_git_changes(self):
-        """Git変更チェック（軽量版）"""
-        watch_dirs = [
-            "/Users/dd/Desktop/1_dev/coding-rule2/projects",
-            "/Users/dd/Desktop/1_dev/post_tool"  # 他のプロジェクトがあれば追加
-        ]
+        """変更ファイルチェック（スナップショット索引で前回チェック以降の差分を取得）"""
+        watch_dirs = [d for d in self.config["watch_dirs"] if os.path.exists(d)]
+        
+        if self.change_collector:
+            # イベント駆動：蓄積した変更パスだけを索引に反映（走査なし）
+            changes, overflow = self.change_collector.drain()
+            if overflow:
+                self.log_event("DEBUG", f"変更パス上限超過: {overflow}件は未記録")
+            for watch_dir in watch_dirs:
+                prefix = os.path.realpath(watch_dir) + os.sep
+                self.snapshot_index.update_paths(
+                    watch_dir, [p for p in changes if os.path.realpath(p).startswith(prefix)])
+        elif self.config["change_detection"] == "snapshot":
+            # stat走査（mtime・サイズが変わったファイルだけ再ハッシュ）
+            for watch_dir in watch_dirs:
+                self.snapshot_index.refresh(watch_dir, self.config["file_extensions"], self.matcher)
+        else:
+            return self.scan_with_find()
         
+        return self.collect_index_changes(watch_dirs)
+    
+    def collect_index_changes(self, watch_dirs):
+        """索引のチェックポイント以降に追加・変更されたファイル"""
+        checkpoint = "simple_dev_monitor"
         changes = []
         for watch_dir in watch_dirs:
+            if self.snapshot_index.has_checkpoint(checkpoint, watch_dir):
+                root = os.path.realpath(watch_dir)
+                change_set = self.snapshot_index.changes_since(checkpoint, watch_dir)
+                changes.extend(os.path.join(root, path) for path in change_set.changed)
+            # 初回は現状をベースラインとして記録するだけ
+            self.snapshot_index.commit_checkpoint(checkpoint, watch_dir)
+        return changes
+    
+    def scan_with_find(self):
+        """従来のfind走査（前回走査以降に更新されたファイル）"""
+        changes = []
+        next_stamp = self.scan_stamp.with_name(self.scan_stamp.name + ".next")
+        next_stamp.touch()  # 走査中の変更を次回に取りこぼさないよう開始時点を記録
+        name_filters = []
+        for extension in self.config["file_extensions"]:
+            name_filters += ['-name', f'*{extension}', '-o']
+        name_filters = name_filters[:-1]
+        
+        for watch_dir in self.config["watch_dirs"]:
             if os.path.exists(watch_dir):
                 try:
-                    # 最近の変更を確認（軽量）
-                    result = subprocess.run(
-                        ['find', watch_dir, '-name', '*.py', '-o', '-name', '*.js', '-o', '-name', '*.ts', '-o', '-name', '*.md', '-newer', str(self.log_file)],
-                        capture_output=True, text=True, timeout=10
-                    )
+                    command = ['find', watch_dir, '(', *name_filters, ')']
+                    if self.scan_stamp.exists():
+                        command += ['-newer', str(self.scan_stamp)]
+                    result = subprocess.run(command, capture_output=True, text=True, timeout=10)
                     
                     if result.stdout.strip():
-                        files = result.stdout.strip().split('\n')[:5]  # 最大5ファイルまで
-                        changes.extend(files)
+                        changes.extend(result.stdout.strip().split('\n'))
                         
                 except Exception as e:
                     self.log_event("DEBUG", f"ディレクトリ監視エラー ({watch_dir}): {e}")
         
+        next_stamp.replace(self.scan_stamp)
         return changes
     
     def collect_dev_log(self):
@@ -98,6 +207,14 @@ class SimpleDevMonitor:
         """シンプル監視実行"""
         self.log_event("INFO", "シンプル開発監視開始")
         
+        if self.config["change_detection"] == "events":
+            if not self.start_event_watch():
+                self.config = dict(self.config, change_detection="find")
+        if self.config["change_detection"] == "find":
+            self.scan_stamp.touch()  # 起動時点を基準にする
+        else:
+            self.check_git_changes()  # 索引のベースライン作成
+        
         while True:
             try:
                 log_entry = self.collect_dev_log()
@@ -105,9 +222,10 @@ class SimpleDevMonitor:
                     # ログをObsidianに保存（軽量）
                     self.save_to_obsidian(log_entry)
                 
-                time.sleep(1800)  # 30分間隔（適切な頻度）
+                time.sleep(self.config["interval_seconds"])  # 30分間隔（適切な頻度）
                 
             except KeyboardInterrupt:
+                self.stop_event_watch()
                 self.log_event("INFO", "監視停止")
                 break
             except Exception as e:
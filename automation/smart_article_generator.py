@@ -11,6 +11,8 @@ import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from llm_cache import shared_cache
+
 # 頭脳ディレクトリからAPIキー読み込み
 def load_brain_api_keys():
     """頭脳ディレクトリからAPIキー自動読み込み"""
@@ -145,14 +147,20 @@ published_at: "{datetime.now().strftime('%Y-%m-%d')}"
 (締めくくり)
 """
             
-            response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+            request = {
+                "provider": "anthropic",
+                "model": "claude-3-5-sonnet-20241022",
+                "max_tokens": 2000,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+            cache = shared_cache()
+            content = cache.get_or_call(
+                request,
+                lambda: client.messages.create(
+                    **{key: value for key, value in request.items() if key != "provider"}
+                ).content[0].text
             )
-            
-            content = response.content[0].text
-            self.log_event("✅ AI記事生成完了")
+            self.log_event(f"✅ AI記事生成完了（{cache.summary()}）")
             
             # 記事保存
             self.save_article(content)
@@ -9,6 +9,8 @@ import time
 import requests
 from datetime import datetime
 
+import git_access
+
 class ZennConnectTester:
     def __init__(self):
         self.zenn_account = "daideguchi"
@@ -17,13 +19,8 @@ class ZennConnectTester:
     def check_git_status(self):
         """Git状況確認"""
         try:
-            result = subprocess.run(
-                ['git', 'status', '--porcelain'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True
-            )
-            return result.returncode == 0, result.stdout
+            status = git_access.porcelain_status(self.project_root)
+            return True, git_access.format_porcelain(status)
         except Exception as e:
             return False, str(e)
     
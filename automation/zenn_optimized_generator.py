@@ -14,6 +14,9 @@ from pathlib import Path
 from anthropic import Anthropic
 from typing import Dict, List, Optional, Any
 
+from dev_log_journal import read_recent_logs
+from llm_cache import shared_cache
+
 # 設定
 OBSIDIAN_VAULT_PATH = "/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents"
 DEV_LOGS_PATH = os.path.join(OBSIDIAN_VAULT_PATH, "01_Dev_Logs")
@@ -54,6 +57,7 @@ TECH_EMOJIS = {
 class ZennOptimizedGenerator:
     def __init__(self):
         self.client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+        self.llm_cache = shared_cache()
         self.ensure_folders()
         
     def ensure_folders(self):
@@ -61,22 +65,8 @@ class ZennOptimizedGenerator:
         os.makedirs(PROJECT_ARTICLES_PATH, exist_ok=True)
         
     def get_recent_logs(self, days: int = 7) -> List[Dict[str, Any]]:
-        """最近のログを取得"""
-        all_logs = []
-        
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            log_file = os.path.join(DEV_LOGS_PATH, f"dev_log_{date.strftime('%Y-%m-%d')}.json")
-            
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        daily_logs = json.load(f)
-                        all_logs.extend(daily_logs)
-                except Exception as e:
-                    print(f"ログ読み込みエラー ({log_file}): {e}")
-        
-        return all_logs
+        """最近のログを取得（JSON Lines ジャーナル / 旧形式JSON 両対応）"""
+        return read_recent_logs(DEV_LOGS_PATH, days=days)
     
     def analyze_technical_domains(self, logs: List[Dict]) -> Dict[str, Any]:
         """技術ドメインを分析してZenn最適なトピックを抽出"""
@@ -265,16 +255,21 @@ def example_function():
         tech_analysis = self.analyze_technical_domains(logs)
         prompt = self.create_zenn_optimized_prompt(logs, tech_analysis)
         
+        request = {
+            "provider": "anthropic",
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 4000,
+            "temperature": 0.7,
+            "messages": [{"role": "user", "content": prompt}]
+        }
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
+            content = self.llm_cache.get_or_call(
+                request,
+                lambda: self.client.messages.create(
+                    **{key: value for key, value in request.items() if key != "provider"}
+                ).content[0].text
             )
-            
-            content = response.content[0].text
-            print(f"📄 AI応答長: {len(content)}文字")
+            print(f"📄 AI応答長: {len(content)}文字 / {self.llm_cache.summary()}")
             
             # JSON抽出（より堅牢）
             json_matches = re.findall(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
@@ -287,9 +282,11 @@ def example_function():
                     return self.validate_article_quality(article_data)
                 except json.JSONDecodeError as e:
                     print(f"❌ JSON解析エラー: {e}")
+                    self.llm_cache.discard(request)
                     return None
             else:
                 print("❌ AIの出力からJSONを抽出できませんでした")
+                self.llm_cache.discard(request)
                 print("デバッグ用出力:")
                 print(content[:500] + "...")
                 return None
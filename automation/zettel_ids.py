@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+ツェッテルID採番
+秒単位のタイムスタンプ + 連番で、プロセスをまたいでも重複しない単調増加のIDを払い出します
+
+- 形式: Z20250101120000（その秒の1件目）、Z20250101120000-01、-02 ...（同じ秒の2件目以降）
+- 接頭辞ごとの最後のタイムスタンプ・連番を SQLite に保存し、BEGIN IMMEDIATE で排他して更新
+  （同時に実行された別プロセス・スレッドとも重複しない）
+- 連番が上限を超えたら次の秒を先取りし、時計が戻っても最後のIDより前にはならない
+  （ID の文字列順 = 払い出し順）
+- ZettelkastenProcessor（恒久ノート）と ZettelkastenAISystem（AIノート）が共通で使用
+"""
+
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "logs" / "zettel_ids.db"
+TIMESTAMP_FORMAT = "%Y%m%d%H%M%S"
+MAX_SEQUENCE = 99  # 1秒あたりの連番の上限（-01 〜 -99）
+BUSY_TIMEOUT = 30.0  # 他プロセスの採番を待つ秒数
+
+
+def format_id(prefix: str, timestamp: str, sequence: int) -> str:
+    return f"{prefix}{timestamp}" if sequence == 0 else f"{prefix}{timestamp}-{sequence:02d}"
+
+
+class ZettelIdAllocator:
+    """プロセス間で安全な単調増加ID採番"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 採番はこちらで BEGIN IMMEDIATE するので自動トランザクションは使わない
+        self.conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT,
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS zettel_id_sequences (
+                prefix TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                sequence INTEGER NOT NULL
+            )
+        ''')
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def allocate(self, prefix: str = "Z", count: int = 1, now: Optional[datetime] = None) -> List[str]:
+        """count 件のIDを1トランザクションでまとめて払い出し（昇順）"""
+        if count <= 0:
+            return []
+        current = (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.conn.execute(
+                    'SELECT timestamp, sequence FROM zettel_id_sequences WHERE prefix = ?',
+                    (prefix,)).fetchone()
+                if row is not None and row[0] >= current:
+                    # 同じ秒（または先取り済みの秒・時計の巻き戻り）: 最後のIDの続きから
+                    timestamp, sequence = row[0], row[1] + 1
+                else:
+                    timestamp, sequence = current, 0
+
+                ids = []
+                for _ in range(count):
+                    if sequence > MAX_SEQUENCE:
+                        timestamp = (datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+                                     + timedelta(seconds=1)).strftime(TIMESTAMP_FORMAT)
+                        sequence = 0
+                    ids.append(format_id(prefix, timestamp, sequence))
+                    sequence += 1
+
+                self.conn.execute('INSERT OR REPLACE INTO zettel_id_sequences VALUES (?, ?, ?)',
+                                  (prefix, timestamp, sequence - 1))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return ids
+
+    def next_id(self, prefix: str = "Z") -> str:
+        """IDを1件払い出し"""
+        return self.allocate(prefix)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ツェッテルID採番")
+    parser.add_argument("--prefix", default="Z", help="採番するIDの接頭辞")
+    args = parser.parse_args()
+
+    print(ZettelIdAllocator().next_id(args.prefix))
+
+
+if __name__ == "__main__":
+    main()
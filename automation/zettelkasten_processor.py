@@ -4,20 +4,37 @@ Obsidianノートの完全自動化処理
 """
 
 import os
-import re
 import json
+import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 import frontmatter
 
+from config import get_config
+from link_discovery import discover_links_from_tokens, jaccard, tokenize
+from note_cache import HEADER_PATTERN, NoteCache
+from file_snapshot_index import FileSnapshotIndex
+from zettel_ids import ZettelIdAllocator
+from inbox_classifier import (classify_inbox_files, contains_multiple_ideas, is_permanent_note_candidate,
+                              suggest_note_split)
+
+INBOX_CHECKPOINT = "zettelkasten:inbox"  # 受信箱の処理済み状態を記録するチェックポイント名
+
 class ZettelkastenProcessor:
-    def __init__(self):
-        self.obsidian_vault = "/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents"
+    def __init__(self, vault_path=None, note_cache=None, snapshot_index=None, id_allocator=None):
+        self.obsidian_vault = vault_path or "/Users/dd/Library/Mobile Documents/iCloud~md~obsidian/Documents"
         self.inbox_path = os.path.join(self.obsidian_vault, "00_INBOX")
         self.literature_path = os.path.join(self.obsidian_vault, "01_LITERATURE")
         self.permanent_path = os.path.join(self.obsidian_vault, "02_PERMANENT")
         self.moc_path = os.path.join(self.obsidian_vault, "03_MOC")
         self.output_path = os.path.join(self.obsidian_vault, "04_OUTPUT")
+        self.config = get_config("zettelkasten")
+        # 解析結果をパス + mtime で保持し、メンテナンスの各ステップ・次回実行で再利用
+        self.note_cache = note_cache or NoteCache()
+        # 前回の実行以降に受信箱へ届いたファイルだけを処理するためのスナップショット索引
+        self.snapshot_index = snapshot_index or FileSnapshotIndex(scope="zettelkasten_processor")
+        # 同じ秒の昇格・別プロセスからの作成でも重複しないツェッテルID
+        self.id_allocator = id_allocator or ZettelIdAllocator()
         
         print(f"✅ Obsidian Vault: {self.obsidian_vault}")
         print(f"📥 INBOX: {self.inbox_path}")
@@ -42,9 +59,8 @@ class ZettelkastenProcessor:
         print("✅ ツェッテルカステン フォルダ構造を確認")
     
     def generate_zettel_id(self):
-        """ユニークなツェッテルIDを生成"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"Z{timestamp}"
+        """ユニークなツェッテルIDを生成（Z<タイムスタンプ>、同じ秒の2件目以降は -01, -02 ...）"""
+        return self.id_allocator.next_id("Z")
     
     def create_permanent_note_template(self, title, concept, links=None):
         """恒久ノートテンプレートを生成"""
@@ -94,137 +110,80 @@ tags: [zettelkasten, concept]
             formatted.append(f"- [[{link}]]")
         return "\n".join(formatted)
     
-    def process_inbox_notes(self):
-        """受信箱のノートを処理"""
+    def process_inbox_notes(self, full_scan=False):
+        """受信箱のノートを処理（前回の実行以降に追加・変更されたファイルだけ）
+
+        分類はプロセスプールで並列に行い、結果を受け取りながら分割推奨を表示。
+        昇格は分類の完了後にまとめて書き込む（full_scan=True なら受信箱の全ファイルを処理）
+        """
         if not os.path.exists(self.inbox_path):
             return
         
-        processed_count = 0
+        # 前回の実行以降に届いたファイル（内容ハッシュで比較。受信箱直下の .md のみ）
+        self.snapshot_index.refresh(self.inbox_path, ('.md',))
+        changes = self.snapshot_index.changes_since(INBOX_CHECKPOINT, self.inbox_path)
+        if full_scan:
+            targets = sorted(name for name in os.listdir(self.inbox_path) if name.endswith('.md'))
+        else:
+            targets = [path for path in changes.changed if '/' not in path]
+        
+        # チェックポイントに反映する相対パス（エラーになったファイルは次回も処理対象に残す）
+        processed = set(changes.deleted)
+        promotions = []
+        
+        for result in classify_inbox_files([os.path.join(self.inbox_path, name) for name in targets],
+                                           workers=self.config["inbox_workers"],
+                                           load=self.note_cache.get):
+            if result.error is not None:
+                print(f"❌ 処理エラー ({result.filename}): {result.error}")
+                continue
+            if self.note_cache.notes.get(result.path) is not result.note:
+                # ワーカープロセスで解析した結果は後続ステップ用にキャッシュへ登録
+                self.note_cache.put(result.note)
+            processed.add(result.filename)
+            
+            # 原子性チェック：複数のアイデアが含まれているか
+            if result.split_suggestions:
+                print(f"📝 分割推奨: {result.filename}")
+                for i, suggestion in enumerate(result.split_suggestions, 1):
+                    print(f"   {i}. {suggestion}")
+            
+            # 恒久ノート候補（frontmatter込みで判定）は後でまとめて昇格
+            if result.is_candidate:
+                promotions.append(result)
+        
+        promoted = self._promote_batch([(result.path, result.note.to_post()) for result in promotions])
+        promoted_paths = set(promoted)
+        processed -= {result.filename for result in promotions if result.path not in promoted_paths}
         
-        for filename in os.listdir(self.inbox_path):
-            if filename.endswith('.md'):
-                file_path = os.path.join(self.inbox_path, filename)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        post = frontmatter.load(f)
-                    
-                    # フローティングノートを分析
-                    content = post.content
-                    title = post.metadata.get('title', filename[:-3])
-                    
-                    # frontmatter + content を統合してリンクを検索
-                    full_text = str(post.metadata) + "\n" + content
-                    
-                    # 原子性チェック：複数のアイデアが含まれているか
-                    if self._contains_multiple_ideas(content):
-                        suggestions = self._suggest_note_split(content, title)
-                        print(f"📝 分割推奨: {filename}")
-                        for i, suggestion in enumerate(suggestions, 1):
-                            print(f"   {i}. {suggestion}")
-                    
-                    # 恒久ノート候補判定（frontmatter込みで判定）
-                    is_candidate = self._is_permanent_note_candidate_full(content, full_text)
-                    
-                    if is_candidate:
-                        self._promote_to_permanent(file_path, post)
-                        processed_count += 1
-                        
-                except Exception as e:
-                    print(f"❌ 処理エラー ({filename}): {e}")
+        # 昇格で削除したファイルを索引から外し、処理済みの状態を記録
+        self.snapshot_index.update_paths(self.inbox_path, promoted)
+        self.snapshot_index.commit_checkpoint(INBOX_CHECKPOINT, self.inbox_path, sorted(processed))
         
-        print(f"✅ 受信箱処理完了: {processed_count}件処理")
+        print(f"✅ 受信箱処理完了: {len(promoted)}件処理（新規・変更 {len(targets)}件を分類）")
     
     def _contains_multiple_ideas(self, content):
         """複数のアイデアが含まれているかチェック"""
-        # 見出しの数で判定（簡易版）
-        headers = re.findall(r'^#{1,6}\s+', content, re.MULTILINE)
-        return len(headers) > 3
+        return contains_multiple_ideas(content)
     
-    def _suggest_note_split(self, content, title):
-        """ノート分割の提案"""
-        suggestions = []
-        
-        # 見出しベースの分割提案
-        headers = re.findall(r'^(#{1,6})\s+(.+)', content, re.MULTILINE)
-        for level, header_text in headers:
-            if len(level) <= 2:  # H1, H2レベルの見出し
-                suggestions.append(f"{title} - {header_text}")
-        
-        return suggestions[:3]  # 最大3つまで
+    def _suggest_note_split(self, content, title, headers=None):
+        """ノート分割の提案（headers: 解析済みの見出し）"""
+        if headers is None:
+            headers = HEADER_PATTERN.findall(content)
+        return suggest_note_split(title, headers)
     
     def _is_permanent_note_candidate(self, content):
         """恒久ノート候補かどうか判定"""
-        # 文字数チェック
-        if len(content) < 200:
-            return False
-        
-        # リンクの存在チェック
-        links = re.findall(r'\[\[([^\]]+)\]\]', content)
-        if len(links) < 1:
-            return False
-        
-        # 概念的内容のキーワードチェック（日本語 + 英語）
-        concept_keywords = [
-            # 日本語キーワード
-            '原則', '法則', 'パターン', '理論', '概念', '手法', 'メソッド', '仕組み', 'システム', 
-            '技術', '解説', '実装', '方法', '戦略', '設計', '構造', '機能', '特徴', '利点',
-            'エージェント', 'AI', '自動化', '統合', '連携', '最適化', 'ワークフロー',
-            # 英語キーワード（小文字で検索）
-            'agent', 'system', 'method', 'approach', 'technique', 'strategy', 'framework',
-            'implementation', 'integration', 'automation', 'workflow', 'architecture',
-            'technology', 'innovation', 'solution', 'optimization', 'functionality'
-        ]
-        
-        content_lower = content.lower()
-        for keyword in concept_keywords:
-            if keyword.lower() in content_lower:
-                return True
-        
-        # 高品質コンテンツの追加判定（文字数 + リンクで十分価値がある）
-        if len(content) > 1000 and len(links) >= 2:
-            return True
-        
-        return False
+        return is_permanent_note_candidate(content)
     
     def _is_permanent_note_candidate_full(self, content, full_text):
         """恒久ノート候補かどうか判定（frontmatter込み）"""
-        # 文字数チェック（本文ベース）
-        if len(content) < 200:
-            return False
-        
-        # リンクの存在チェック（frontmatter + 本文）
-        links = re.findall(r'\[\[([^\]]+)\]\]', full_text)
-        if len(links) < 1:
-            return False
-        
-        # 概念的内容のキーワードチェック（frontmatter + 本文）
-        concept_keywords = [
-            # 日本語キーワード
-            '原則', '法則', 'パターン', '理論', '概念', '手法', 'メソッド', '仕組み', 'システム', 
-            '技術', '解説', '実装', '方法', '戦略', '設計', '構造', '機能', '特徴', '利点',
-            'エージェント', 'AI', '自動化', '統合', '連携', '最適化', 'ワークフロー',
-            # 英語キーワード（小文字で検索）
-            'agent', 'system', 'method', 'approach', 'technique', 'strategy', 'framework',
-            'implementation', 'integration', 'automation', 'workflow', 'architecture',
-            'technology', 'innovation', 'solution', 'optimization', 'functionality'
-        ]
-        
-        full_text_lower = full_text.lower()
-        for keyword in concept_keywords:
-            if keyword.lower() in full_text_lower:
-                return True
-        
-        # 高品質コンテンツの追加判定（文字数 + リンクで十分価値がある）
-        if len(content) > 1000 and len(links) >= 2:
-            return True
-        
-        return False
+        return is_permanent_note_candidate(content, full_text)
     
-    def _promote_to_permanent(self, inbox_path, post):
-        """恒久ノートに昇格"""
+    def _permanent_note(self, post, zettel_id=None):
+        """恒久ノートのファイル名と内容（post のメタデータを昇格後の値に更新）"""
         title = post.metadata.get('title', 'Untitled')
-        zettel_id = self.generate_zettel_id()
+        zettel_id = zettel_id or self.generate_zettel_id()
         
         # メタデータ更新
         post.metadata.update({
@@ -234,76 +193,74 @@ tags: [zettelkasten, concept]
             'tags': post.metadata.get('tags', []) + ['zettelkasten', 'permanent']
         })
         
-        # 恒久ノートフォルダに移動
         new_filename = f"{zettel_id}_{title.replace(' ', '_')}.md"
-        new_path = os.path.join(self.permanent_path, new_filename)
-        
-        with open(new_path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
+        return new_filename, frontmatter.dumps(post)
+    
+    def _promote_to_permanent(self, inbox_path, post):
+        """恒久ノートに昇格"""
+        self._promote_batch([(inbox_path, post)])
+    
+    def _promote_batch(self, promotions):
+        """恒久ノートへの昇格 [(受信箱のパス, post)] をまとめて実行し、削除した受信箱のファイルパスを返す
+
+        先に全ての恒久ノートを書き込み、書き込めたものだけ元ファイルを削除する
+        （途中で失敗しても受信箱のノートは失われない）
+        """
+        written = []
+        # IDはまとめて1トランザクションで採番
+        zettel_ids = self.id_allocator.allocate("Z", len(promotions))
+        for (inbox_path, post), zettel_id in zip(promotions, zettel_ids):
+            try:
+                new_filename, text = self._permanent_note(post, zettel_id)
+                # 既存の恒久ノートは上書きしない
+                with open(os.path.join(self.permanent_path, new_filename), 'x', encoding='utf-8') as f:
+                    f.write(text)
+                written.append((inbox_path, new_filename))
+            except Exception as e:
+                print(f"❌ 昇格エラー ({os.path.basename(inbox_path)}): {e}")
         
         # 元ファイル削除
-        os.remove(inbox_path)
-        
-        print(f"✅ 恒久ノートに昇格: {new_filename}")
+        promoted = []
+        for inbox_path, new_filename in written:
+            try:
+                os.remove(inbox_path)
+            except OSError as e:
+                print(f"❌ 受信箱から削除できません ({os.path.basename(inbox_path)}): {e}")
+                continue
+            self.note_cache.discard(inbox_path)
+            promoted.append(inbox_path)
+            print(f"✅ 恒久ノートに昇格: {new_filename}")
+        
+        return promoted
     
     def discover_missing_links(self):
         """欠落しているリンクを発見"""
-        permanent_notes = {}
-        
-        # 恒久ノートを全て読み込み
-        for filename in os.listdir(self.permanent_path):
-            if filename.endswith('.md'):
-                file_path = os.path.join(self.permanent_path, filename)
-                
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    permanent_notes[filename] = content
-        
-        # 潜在的なリンクを発見
-        suggestions = []
-        
-        for note1, content1 in permanent_notes.items():
-            for note2, content2 in permanent_notes.items():
-                if note1 != note2:
-                    # 共通キーワード検出
-                    similarity = self._calculate_content_similarity(content1, content2)
-                    if similarity > 0.3:  # 閾値
-                        suggestions.append({
-                            'note1': note1,
-                            'note2': note2,
-                            'similarity': similarity
-                        })
-        
-        return suggestions
+        # 恒久ノートを全て読み込み（キャッシュ済みの単語集合を使用）
+        permanent_notes = {note.filename: note.tokens
+                           for note in self.note_cache.folder(self.permanent_path)}
+        
+        # 潜在的なリンクを発見（各ペアを1回だけ評価。類似度の降順）
+        return discover_links_from_tokens(permanent_notes,
+                                          threshold=self.config["link_similarity_threshold"],
+                                          top_k=self.config["link_top_k"])
     
     def _calculate_content_similarity(self, content1, content2):
         """コンテンツ類似度を計算（簡易版）"""
         # 単語セットベースの類似度
-        words1 = set(re.findall(r'\w+', content1.lower()))
-        words2 = set(re.findall(r'\w+', content2.lower()))
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0
+        return jaccard(tokenize(content1), tokenize(content2))
     
     def generate_moc_suggestions(self):
         """MOC作成提案を生成"""
         # タグベースのクラスター分析
         tag_clusters = {}
         
-        for filename in os.listdir(self.permanent_path):
-            if filename.endswith('.md'):
-                file_path = os.path.join(self.permanent_path, filename)
-                
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
-                    tags = post.metadata.get('tags', [])
-                    
-                    for tag in tags:
-                        if tag not in tag_clusters:
-                            tag_clusters[tag] = []
-                        tag_clusters[tag].append(filename)
+        for note in self.note_cache.folder(self.permanent_path):
+            tags = note.metadata.get('tags', [])
+            
+            for tag in tags:
+                if tag not in tag_clusters:
+                    tag_clusters[tag] = []
+                tag_clusters[tag].append(note.filename)
         
         # 大きなクラスターをMOC候補として提案
         moc_suggestions = []
@@ -317,12 +274,31 @@ tags: [zettelkasten, concept]
         
         return sorted(moc_suggestions, key=lambda x: x['note_count'], reverse=True)
     
-    def run_daily_maintenance(self):
+    def find_near_duplicates(self):
+        """重複ノート候補のグループを検出（MinHash + LSH、全ペアは比較しない）"""
+        try:
+            from near_duplicates import find_duplicate_clusters
+        except ImportError:
+            print("⚠️ numpy未インストールのため重複ノート検出をスキップします")
+            return []
+        
+        notes = {}
+        for folder_name in self.config["duplicate_folders"]:
+            # frontmatter（ID・日付）の違いは無視して本文で比較
+            for note in self.note_cache.folder(os.path.join(self.obsidian_vault, folder_name)):
+                notes[os.path.join(folder_name, note.filename)] = note.content
+        
+        return find_duplicate_clusters(notes,
+                                       threshold=self.config["duplicate_threshold"],
+                                       num_perm=self.config["duplicate_num_perm"],
+                                       shingle_size=self.config["duplicate_shingle_size"])
+    
+    def run_daily_maintenance(self, full_inbox=False):
         """日次メンテナンス実行"""
         print("🧠 ツェッテルカステン日次メンテナンス開始")
         
-        # 1. 受信箱処理
-        self.process_inbox_notes()
+        # 1. 受信箱処理（前回の実行以降に届いたノート）
+        self.process_inbox_notes(full_scan=full_inbox)
         
         # 2. 欠落リンク発見
         missing_links = self.discover_missing_links()
@@ -338,11 +314,28 @@ tags: [zettelkasten, concept]
             for suggestion in moc_suggestions[:3]:  # 上位3件表示
                 print(f"   {suggestion['topic']}: {suggestion['note_count']}ノート")
         
+        # 4. 重複ノート検出
+        duplicates = self.find_near_duplicates()
+        if duplicates:
+            print(f"🪞 重複ノート候補 {len(duplicates)}グループ")
+            for group in duplicates[:3]:  # 上位3件表示
+                print(f"   {' / '.join(group['notes'])} (類似度: {group['similarity']:.2f})")
+        
+        self.note_cache.save()
+        print(f"💾 ノートキャッシュ: 再利用{self.note_cache.hits}件 / 解析{self.note_cache.misses}件")
         print("✅ 日次メンテナンス完了")
 
+
 def main():
+    parser = argparse.ArgumentParser(description="ツェッテルカステン自動整理システム")
+    parser.add_argument("--workers", type=int, default=None, help="分類のプロセス数（既定: CPU数）")
+    parser.add_argument("--full-inbox", action="store_true", help="前回の実行に関係なく受信箱の全ノートを処理")
+    args = parser.parse_args()
+
     processor = ZettelkastenProcessor()
-    processor.run_daily_maintenance()
+    if args.workers is not None:
+        processor.config["inbox_workers"] = args.workers
+    processor.run_daily_maintenance(full_inbox=args.full_inbox)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+記事生成のベンチマーク（模擬OpenAIサーバー使用）
+- section: セクション逐次生成と並列生成の end-to-end 時間（失敗・無応答の注入も可能）
+- daily: 日次記事生成の従来（1記事ずつ + 固定2秒待機）と並行生成 + トークンバケットの比較
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from fake_openai_server import FakeOpenAIServer
+from llm_cache import LLMCache
+from rate_limiter import AdaptiveRateLimiter
+from ai_enhanced_article_generator import (ARTICLE_CONCURRENCY, REQUEST_BURST, SECTION_CONCURRENCY,
+                                           SECTION_TIMEOUT, AIEnhancedArticleGenerator)
+
+
+BENCHMARK_EXPERIMENTS = {
+    # 記事タイプごとの実験データ（_determine_article_type の判定に合わせる）
+    "tutorial": {"topic": "RAG Pipeline", "implementation": {"code": "def retrieve(query): ..."},
+                 "evaluation": {"accuracy": 0.82}, "insights": ["チャンク長が精度に影響"]},
+    "experiment-report": {"topic": "Prompt Experiment", "evaluation": {"win_rate": 0.64},
+                          "results": {"summary": "Few-shot が最良"}, "insights": ["例示の順序が重要"]},
+    "concept-explanation": {"topic": "Agent Memory", "results": {"summary": "長期記憶の設計"},
+                            "insights": ["要約と検索の併用"]},
+}
+
+
+def _benchmark_experiment_id(index: int, article_type: str) -> str:
+    return f"BENCH_{index:02d}_{article_type.replace('-', '_').upper()}"
+
+
+@contextlib.asynccontextmanager
+async def _benchmark_generator(server, experiment_count: int = len(BENCHMARK_EXPERIMENTS)):
+    """一時ディレクトリで模擬サーバーに接続する生成器と、実験データの ID 一覧を用意"""
+    original_cwd, original_env = os.getcwd(), dict(os.environ)
+    root_logger_level = logging.getLogger().level
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # 記事・知識ベースは相対パスに保存されるので作業ディレクトリごと一時ディレクトリに
+            os.chdir(temp_dir)
+            os.environ.update(OPENAI_API_KEY="sk-benchmark", OPENAI_BASE_URL=server.base_url)
+            results_dir = Path("results/synthesizer_001")
+            results_dir.mkdir(parents=True)
+            experiment_ids = []
+            article_types = list(BENCHMARK_EXPERIMENTS)
+            for i in range(experiment_count):
+                article_type = article_types[i % len(article_types)]
+                experiment_id = _benchmark_experiment_id(i, article_type)
+                with open(results_dir / f"{experiment_id}_synthesis.json", 'w', encoding='utf-8') as f:
+                    json.dump(dict(BENCHMARK_EXPERIMENTS[article_type], experiment_id=experiment_id),
+                              f, ensure_ascii=False)
+                experiment_ids.append(experiment_id)
+            
+            # キャッシュが効くと API の待ち時間を計測できないので無効に
+            llm_cache = LLMCache(Path(temp_dir) / "llm_cache.db", mode="off")
+            generator = AIEnhancedArticleGenerator(llm_cache=llm_cache)
+            try:
+                yield generator, experiment_ids
+            finally:
+                generator.zettelkasten_system.store.close()
+                llm_cache.close()
+    finally:
+        os.chdir(original_cwd)
+        os.environ.clear()
+        os.environ.update(original_env)
+        logging.getLogger().setLevel(root_logger_level)
+
+
+async def run_section_benchmark(concurrency: int = SECTION_CONCURRENCY, latency: float = 0.5,
+                                failure_rate: float = 0.0, hang_rate: float = 0.0,
+                                timeout: float = SECTION_TIMEOUT):
+    """模擬OpenAIサーバーに対する記事生成の end-to-end 時間（セクション逐次 / 並列）"""
+    async with FakeOpenAIServer(latency=latency, failure_rate=failure_rate, hang_rate=hang_rate,
+                                hang_seconds=timeout * 4) as server:
+        async with _benchmark_generator(server) as (generator, experiment_ids):
+            generator.config["generation"]["section_timeout"] = timeout
+            print(f"📊 記事生成ベンチマーク（模擬API 遅延 {latency}秒、失敗率 {failure_rate:.0%}、"
+                  f"無応答率 {hang_rate:.0%}、タイムアウト {timeout}秒）")
+            for label, workers in (("逐次", 1), (f"並列 {concurrency}", concurrency)):
+                generator.config["generation"]["section_concurrency"] = workers
+                server.reset_stats()
+                timings = []
+                total_start = time.perf_counter()
+                for experiment_id, article_type in zip(experiment_ids, BENCHMARK_EXPERIMENTS):
+                    start = time.perf_counter()
+                    metadata = await generator.generate_article_from_experiment(experiment_id)
+                    timings.append(f"{article_type} {time.perf_counter() - start:.2f}秒"
+                                   f"{'' if metadata else '（失敗）'}")
+                print(f"   {label}: 合計 {time.perf_counter() - total_start:.2f}秒 / "
+                      f"リクエスト {server.requests}件・最大同時 {server.max_in_flight}件")
+                print(f"      {' / '.join(timings)}")
+
+
+async def run_daily_benchmark(articles: int = 6, concurrency: int = ARTICLE_CONCURRENCY,
+                              latency: float = 0.5, requests_per_second: float = 10.0,
+                              rate_limit: Optional[float] = 6.0):
+    """日次記事生成: 従来（1記事ずつ + 固定2秒待機）と並行生成 + トークンバケットの比較"""
+    async with FakeOpenAIServer(latency=latency, rate_limit=rate_limit) as server:
+        async with _benchmark_generator(server, articles) as (generator, experiment_ids):
+            print(f"📊 日次記事生成ベンチマーク（{articles}記事、模擬API 遅延 {latency}秒・上限 {rate_limit} req/s、"
+                  f"クライアント {requests_per_second} req/s）")
+            
+            generator.rate_limiter = AdaptiveRateLimiter(requests_per_second, REQUEST_BURST)
+            server.reset_stats()
+            timings = []
+            total_start = time.perf_counter()
+            for experiment_id in experiment_ids:
+                start = time.perf_counter()
+                await generator.generate_article_from_experiment(experiment_id)
+                timings.append(time.perf_counter() - start)
+                await asyncio.sleep(2)
+            print(f"   従来（逐次 + 2秒待機）: 合計 {time.perf_counter() - total_start:.2f}秒 / "
+                  f"429 {server.rate_limited}件")
+            print(f"      記事ごと: {' / '.join(f'{seconds:.2f}秒' for seconds in timings)}")
+            
+            generator.config["generation"]["article_concurrency"] = concurrency
+            generator.rate_limiter = AdaptiveRateLimiter(requests_per_second, REQUEST_BURST)
+            server.reset_stats()
+            total_start = time.perf_counter()
+            results = await generator._generate_articles_concurrently(experiment_ids)
+            generated = sum(1 for _, metadata, _ in results if metadata)
+            print(f"   並行 {concurrency}記事 + トークンバケット: 合計 {time.perf_counter() - total_start:.2f}秒 / "
+                  f"{generated}/{len(results)}記事・429 {server.rate_limited}件"
+                  f"（調整後のレート {generator.rate_limiter.rate:.1f} req/s）")
+            print(f"      記事ごと: {' / '.join(f'{seconds:.2f}秒' for _, _, seconds in results)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="記事生成のベンチマーク（模擬OpenAIサーバー使用）")
+    parser.add_argument("mode", choices=["section", "daily"], help="計測対象（セクション並列化 / 日次記事生成）")
+    parser.add_argument("--concurrency", type=int, default=SECTION_CONCURRENCY, help="セクションの同時生成数")
+    parser.add_argument("--latency", type=float, default=0.5, help="模擬APIの応答遅延（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="模擬APIが500エラーを返す割合")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="模擬APIが応答しない割合")
+    parser.add_argument("--timeout", type=float, default=SECTION_TIMEOUT, help="1セクションの上限時間（秒）")
+    parser.add_argument("--articles", type=int, default=6, help="日次生成の記事数")
+    parser.add_argument("--article-concurrency", type=int, default=ARTICLE_CONCURRENCY, help="記事の同時生成数")
+    parser.add_argument("--rps", type=float, default=10.0, help="日次生成のクライアント側レート（req/s）")
+    parser.add_argument("--rate-limit", type=float, default=6.0, help="模擬APIの受付上限（req/s、超過は 429）")
+    args = parser.parse_args()
+
+    if args.mode == "section":
+        await run_section_benchmark(args.concurrency, args.latency, args.failure_rate,
+                                    args.hang_rate, args.timeout)
+    else:
+        await run_daily_benchmark(args.articles, args.article_concurrency, args.latency,
+                                  args.rps, args.rate_limit)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Git読み取りアクセス層のベンチマーク
+HEAD 取得・ステータス取得のレイテンシを subprocess での git 実行と比較します
+"""
+
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from git_access import close_all, head_commit, porcelain_status
+
+
+def run_benchmark(repo_path, polls=1000):
+    """HEAD取得のレイテンシ比較（subprocess vs キャッシュ済みハンドル）"""
+    start = time.perf_counter()
+    for _ in range(polls):
+        subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_path,
+                       capture_output=True, text=True)
+    forked = time.perf_counter() - start
+
+    head_commit(repo_path)  # ハンドル作成分は除外
+    start = time.perf_counter()
+    for _ in range(polls):
+        head_commit(repo_path)
+    in_process = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(min(polls, 100)):
+        subprocess.run(['git', 'status', '--porcelain'], cwd=repo_path,
+                       capture_output=True, text=True)
+    status_forked = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(min(polls, 100)):
+        porcelain_status(repo_path)
+    status_in_process = time.perf_counter() - start
+
+    status_polls = min(polls, 100)
+    print(f"📊 Gitポーリングベンチマーク: {repo_path}")
+    print(f"   HEAD  subprocess: {forked / polls * 1000:.3f}ms/回 ({polls}回 {forked:.2f}秒)")
+    print(f"   HEAD  GitPython:  {in_process / polls * 1000:.3f}ms/回 ({polls}回 {in_process:.2f}秒)")
+    print(f"   status subprocess: {status_forked / status_polls * 1000:.3f}ms/回 ({status_polls}回)")
+    print(f"   status GitPython:  {status_in_process / status_polls * 1000:.3f}ms/回 ({status_polls}回)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Git読み取りアクセス層のベンチマーク")
+    parser.add_argument("repo", nargs="?", default=".", help="リポジトリのパス")
+    parser.add_argument("--polls", type=int, default=1000, help="ポーリング回数")
+    args = parser.parse_args()
+    run_benchmark(args.repo, args.polls)
+    close_all()
+
+
+if __name__ == "__main__":
+    main()
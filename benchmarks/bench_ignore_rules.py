@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+監視除外ルールのベンチマーク
+合成ツリーで、監視計画の刈り込みとイベント時のフィルタで回避できるコールバック数を計測します
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from ignore_rules import IgnoreMatcher, plan_watches
+
+
+def _is_delivered(path, plan):
+    """監視計画のもとでイベントがハンドラに届くか"""
+    parent = os.path.dirname(path)
+    if parent in plan:
+        return True
+    while True:
+        if plan.get(parent):
+            return True
+        grandparent = os.path.dirname(parent)
+        if grandparent == parent:
+            return False
+        parent = grandparent
+
+
+def run_benchmark(total_files=100000):
+    """合成ツリーで回避できるコールバック数を計測"""
+    root = tempfile.mkdtemp(prefix="ignore_bench_")
+    layout = [
+        ("src", 0.15), ("tests", 0.05), ("docs", 0.02),
+        ("node_modules/pkg", 0.45), (".git/objects", 0.15),
+        ("dist", 0.08), ("venv/lib", 0.07), ("logs", 0.03),
+    ]
+    paths = []
+    try:
+        for repo_index in range(4):
+            repo = os.path.join(root, f"repo_{repo_index}")
+            os.makedirs(repo)
+            with open(os.path.join(repo, ".gitignore"), 'w', encoding='utf-8') as f:
+                f.write("logs/\n*.generated.ts\n")
+            for folder, share in layout:
+                count = int(total_files * share / 4)
+                for shard in range(max(count // 500, 1)):
+                    directory = os.path.join(repo, folder, f"d{shard}")
+                    os.makedirs(directory, exist_ok=True)
+                    for i in range(min(500, count - shard * 500)):
+                        ext = (".py", ".ts", ".md", ".generated.ts", ".json")[i % 5]
+                        path = os.path.join(directory, f"f{i}{ext}")
+                        open(path, 'w').close()
+                        paths.append(path)
+
+        matcher = IgnoreMatcher()
+        start = time.perf_counter()
+        plan = plan_watches(root, matcher)
+        plan_seconds = time.perf_counter() - start
+
+        # 全ファイルに1回ずつ変更イベントが発生したと仮定
+        naive_callbacks = len(paths)
+        watch_table = dict(plan)
+        delivered = [p for p in paths if _is_delivered(p, watch_table)]
+        start = time.perf_counter()
+        accepted = [p for p in delivered if matcher.accepts(p)]
+        filter_seconds = time.perf_counter() - start
+
+        print("📊 監視除外ベンチマーク")
+        print(f"   合成ファイル数:           {len(paths)}")
+        print(f"   監視計画: {len(plan)}件 ({plan_seconds:.2f}秒)")
+        print(f"   従来のコールバック数:     {naive_callbacks}")
+        print(f"   刈り込み後のコールバック: {len(delivered)} "
+              f"({naive_callbacks - len(delivered)}件回避)")
+        print(f"   イベント時フィルタ通過:   {len(accepted)} "
+              f"({len(delivered) / max(filter_seconds, 1e-9):,.0f}件/秒)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="監視除外ルールのベンチマーク")
+    parser.add_argument("--files", type=int, default=100000, help="合成ファイル数")
+    args = parser.parse_args()
+    run_benchmark(args.files)
+
+
+if __name__ == "__main__":
+    main()
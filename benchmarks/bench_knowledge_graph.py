@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+AI特化ツェッテルカステンのベンチマーク（一時ディレクトリの合成データで計測）
+- save: ノート保存（ノートごとの接続・コミット vs 一括トランザクション）
+- similarity: ノート1件追加時の類似度計算（ペアごとの再学習 vs ベクトル索引）
+- graph: グラフ読み込み（SQLite・スナップショット・ドメイン部分グラフ）
+- insights: 創発的洞察の抽出（ノートごとのクエリ vs 集約クエリ1回）
+- concepts: 概念抽出（パターンごとの re.search vs 単一走査）
+- import: Vault取り込み（create_note 逐次 vs 一括取り込み・変更なしの再実行）
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "knowledge-graph"))
+from concept_extractor import load_extractor
+from graph_loader import GraphLoader
+from knowledge_store import KnowledgeStore
+from zettelkasten_ai_system import (CROSS_DOMAIN_SQL, EMERGENCE_THRESHOLD, MIN_CROSS_DOMAINS,
+                                    ZettelkastenAISystem)
+
+
+def run_load_benchmark(store, snapshot_path: Path):
+    """SQLite からの構築とスナップショットからの復元の比較"""
+    loader = GraphLoader(store, snapshot_path)
+    if snapshot_path.exists():
+        snapshot_path.unlink()
+
+    start = time.perf_counter()
+    loader.arrays(refresh=True)
+    from_db = time.perf_counter() - start
+
+    loader = GraphLoader(store, snapshot_path)
+    start = time.perf_counter()
+    arrays = loader.arrays()
+    from_snapshot = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = loader.load_graph()
+    build = time.perf_counter() - start
+
+    print(f"📊 グラフ読み込みベンチマーク: ノード{len(arrays['ids'])} / 接続{len(arrays['indices'])}")
+    print(f"   SQLiteから配列構築:     {from_db:.2f}秒")
+    print(f"   スナップショットから:   {from_snapshot:.2f}秒")
+    print(f"   networkxグラフ構築:     {build:.2f}秒 ({graph.number_of_edges()}辺)")
+
+
+def _synthetic_notes(count: int) -> List[Dict]:
+    """ベンチマーク用の合成ノート"""
+    domains = ["llm", "agent", "rag", "prompt-engineering"]
+    topics = ["transformer attention", "multi-agent planning", "vector-database retrieval",
+              "chain-of-thought few-shot", "embedding reranking", "tool-use reflection"]
+    return [{
+        'title': f"Synthetic note {i}",
+        'content': f"{topics[i % len(topics)]} の実験結果と実装例 {i}。" * 5,
+        'ai_domain': domains[i % len(domains)]
+    } for i in range(count)]
+
+
+def run_benchmark(count: int = 10000):
+    """ノート保存の比較（従来のノートごとの接続・コミット vs 一括トランザクション）"""
+    base = tempfile.mkdtemp(prefix="zettel_bench_")
+    try:
+        items = _synthetic_notes(count)
+        
+        # 従来経路: ノートごとに接続を開き、同じ行を2回書き込んでコミット
+        legacy = ZettelkastenAISystem(os.path.join(base, "legacy"))
+        notes = [legacy._build_note(item['title'], item['content'], item['ai_domain']) for item in items]
+        start = time.perf_counter()
+        for note in notes:
+            for _ in range(2):
+                conn = sqlite3.connect(legacy.db_path)
+                conn.execute('''
+                    INSERT OR REPLACE INTO knowledge_notes 
+                    (id, title, content, ai_domain, experiment_id, concepts, connections,
+                     created_at, updated_at, permanence_score, emergence_potential)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (note.id, note.title, note.content, note.ai_domain, note.experiment_id,
+                      json.dumps(note.concepts), json.dumps(note.connections),
+                      note.created_at, note.updated_at, note.permanence_score,
+                      note.emergence_potential))
+                conn.commit()
+                conn.close()
+        legacy_seconds = time.perf_counter() - start
+        
+        # 常設接続でノートごとに1トランザクション
+        single = ZettelkastenAISystem(os.path.join(base, "single"))
+        start = time.perf_counter()
+        for note in notes:
+            single._save_note_to_db(note)
+        single_seconds = time.perf_counter() - start
+        
+        # 一括保存（同じ組み立て済みノートを1トランザクションで）
+        batched = ZettelkastenAISystem(os.path.join(base, "batched"))
+        start = time.perf_counter()
+        batched.store.save_notes(notes)
+        batched_seconds = time.perf_counter() - start
+        
+        # create_notes_bulk（概念抽出・スコア計算込み）
+        bulk = ZettelkastenAISystem(os.path.join(base, "bulk"))
+        start = time.perf_counter()
+        bulk.create_notes_bulk(items, write_files=False)
+        bulk_seconds = time.perf_counter() - start
+        
+        print(f"📊 ノート保存ベンチマーク: {count}件")
+        print(f"   従来（ノートごとに接続・2回書き込み）: {legacy_seconds:.2f}秒 "
+              f"({count / legacy_seconds:,.0f}件/秒)")
+        print(f"   常設接続（ノートごとにコミット）:     {single_seconds:.2f}秒 "
+              f"({count / single_seconds:,.0f}件/秒)")
+        print(f"   一括保存（1トランザクション）:        {batched_seconds:.2f}秒 "
+              f"({count / batched_seconds:,.0f}件/秒)")
+        print(f"   create_notes_bulk（抽出・スコア込み）: {bulk_seconds:.2f}秒 "
+              f"({count / bulk_seconds:,.0f}件/秒)")
+        for system in (legacy, single, batched, bulk):
+            system.store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def run_similarity_benchmark(count: int = 2000):
+    """ノート1件追加時の類似度計算（ペアごとの再学習 vs ベクトル索引）"""
+    base = tempfile.mkdtemp(prefix="zettel_sim_bench_")
+    try:
+        system = ZettelkastenAISystem(base)
+        items = _synthetic_notes(count + 1)
+        system.create_notes_bulk(items[:count], write_files=False)
+        contents = system._load_corpus()[1]
+        new_content = items[count]['content']
+        
+        start = time.perf_counter()
+        for content in contents:
+            tfidf_matrix = system.vectorizer.fit_transform([new_content, content])
+            cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
+        pairwise_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        vector = system.vector_index.transform([new_content])
+        system.vector_index.query(vector, k=10)
+        indexed_seconds = time.perf_counter() - start
+        
+        print(f"📊 類似度ベンチマーク: 既存{count}件に1件追加")
+        print(f"   ペアごとの再学習: {pairwise_seconds * 1000:.1f}ms")
+        print(f"   ベクトル索引:     {indexed_seconds * 1000:.1f}ms")
+        system.store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def _populate_synthetic_db(store: KnowledgeStore, count: int, degree: int = 5):
+    """ベンチマーク用に合成ノートとランダムな接続を直接書き込む"""
+    domains = ["llm", "agent", "rag", "prompt-engineering"]
+    now = datetime.now().isoformat()
+    rng = np.random.default_rng(0)
+    with store.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO knowledge_notes VALUES (?, ?, ?, ?, NULL, ?, '[]', ?, ?, ?, ?)
+        ''', ((f"N{i:07d}", f"note {i}", "本文" * 200, domains[i % 4],
+               json.dumps(["retrieval", "planning"]), now, now,
+               float(rng.random()), float(rng.random())) for i in range(count)))
+        targets = rng.integers(0, count, size=(count, degree))
+        store.save_connections(
+            (f"N{i:07d}", f"N{int(t):07d}", 0.5, 'semantic', now)
+            for i in range(count) for t in targets[i] if t != i)
+
+
+def run_graph_benchmark(count: int = 100000, degree: int = 5):
+    """合成DBでグラフ読み込み（SQLite・スナップショット・ドメイン部分グラフ）を計測"""
+    base = tempfile.mkdtemp(prefix="zettel_graph_bench_")
+    try:
+        store = KnowledgeStore(os.path.join(base, "knowledge_graph.db"))
+        store.setup_schema()
+        _populate_synthetic_db(store, count, degree)
+        
+        snapshot_path = Path(base) / "graph_snapshot.npz"
+        run_load_benchmark(store, snapshot_path)
+        
+        loader = GraphLoader(store, snapshot_path)
+        start = time.perf_counter()
+        graph = loader.domain_graph("rag")
+        print(f"   ドメイン部分グラフ(rag): {time.perf_counter() - start:.2f}秒 "
+              f"(ノード{graph.number_of_nodes()} / 辺{graph.number_of_edges()})")
+        store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def run_insight_benchmark(count: int = 50000, degree: int = 5):
+    """合成DBで創発的洞察の抽出を計測（従来のノートごとのクエリ vs 集約クエリ1回）"""
+    base = tempfile.mkdtemp(prefix="zettel_insight_bench_")
+    try:
+        system = ZettelkastenAISystem(base, graph_snapshot=False)
+        _populate_synthetic_db(system.store, count, degree)
+        store = system.store
+        
+        def legacy_pass():
+            """従来: 高創発ノートごとに接続先ドメインを集計（N+1）"""
+            hits = 0
+            for row in store.query(
+                    'SELECT id, concepts, ai_domain, emergence_potential, title, content '
+                    'FROM knowledge_notes WHERE emergence_potential > 0.5 '
+                    'ORDER BY emergence_potential DESC'):
+                cross = store.query('''
+                    SELECT DISTINCT ai_domain, COUNT(*) as count
+                    FROM knowledge_notes
+                    WHERE id IN (SELECT target_concept FROM concept_connections WHERE source_concept = ?)
+                    AND ai_domain != ?
+                    GROUP BY ai_domain
+                ''', (row[0], row[2]))
+                hits += len(cross) >= MIN_CROSS_DOMAINS
+            return hits
+        
+        def set_pass():
+            rows = store.query(CROSS_DOMAIN_SQL, (EMERGENCE_THRESHOLD, MIN_CROSS_DOMAINS))
+            return len({row[0] for row in rows})
+        
+        # ページキャッシュの影響をならすため、それぞれ2回実行して速い方を採用
+        timings = {}
+        for name, func in (("legacy", legacy_pass), ("set", set_pass)) * 2:
+            start = time.perf_counter()
+            hits = func()
+            elapsed = time.perf_counter() - start
+            if name not in timings or elapsed < timings[name][0]:
+                timings[name] = (elapsed, hits)
+        
+        start = time.perf_counter()
+        insights = system.discover_emergent_insights()
+        total_seconds = time.perf_counter() - start
+        
+        print(f"📊 創発的洞察ベンチマーク: ノート{count}件 / 接続{count * degree}件")
+        print(f"   従来（ノートごとのクエリ）: {timings['legacy'][0]:.2f}秒 ({timings['legacy'][1]}件)")
+        print(f"   集約クエリ1回:              {timings['set'][0]:.2f}秒 ({timings['set'][1]}件)")
+        print(f"   discover_emergent_insights（保存込み）: {total_seconds:.2f}秒 ({len(insights)}件)")
+        system.store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def run_concept_benchmark(count: int = 10000):
+    """概念抽出のスループット（従来のパターンごとの re.search vs 単一走査）"""
+    extractor = load_extractor()
+    samples = _synthetic_notes(count)
+    texts = [item['content'] * 4 for item in samples]
+    domains = [item['ai_domain'] for item in samples]
+    
+    def legacy_extract(content, ai_domain):
+        concepts = [pattern for pattern in extractor.domains.get(ai_domain, [])
+                    if re.search(pattern, content, re.IGNORECASE)]
+        concepts += [concept for concept in extractor.general
+                     if re.search(concept.replace("-", "[-_\\s]?"), content, re.IGNORECASE)]
+        depth = len(re.findall(r'(例|実装|詳細|具体|詳しく)', content))
+        references = len(re.findall(r'(論文|研究|実験|結果)', content))
+        return list(set(concepts)), depth, references
+    
+    start = time.perf_counter()
+    legacy = [legacy_extract(text, domain) for text, domain in zip(texts, domains)]
+    legacy_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    results = []
+    for text, domain in zip(texts, domains):
+        hits = extractor.scan(text)
+        results.append((extractor.concepts_for(hits, domain), hits.signals["depth"], hits.signals["references"]))
+    scan_seconds = time.perf_counter() - start
+    
+    mismatches = sum(set(a[0]) != set(b[0]) or a[1:] != b[1:] for a, b in zip(legacy, results))
+    print(f"📊 概念抽出ベンチマーク: {count}件")
+    print(f"   従来（パターンごとの re.search）: {count / legacy_seconds:,.0f}件/秒")
+    print(f"   単一走査:                         {count / scan_seconds:,.0f}件/秒")
+    print(f"   結果の不一致: {mismatches}件")
+
+
+def _synthetic_vault_notes(count: int, seed: int = 0) -> List[Dict]:
+    """ベンチマーク用の合成 Vault ノート（概念2つ + ランダムな語。1割は内容が重複）"""
+    rng = np.random.default_rng(seed)
+    extractor = load_extractor()
+    concepts = extractor.all_concepts
+    words = [f"topic{i}" for i in range(2000)]
+    notes = []
+    for i in range(count):
+        if i % 10 == 9:
+            notes.append(dict(notes[i - 9], title=f"Vault note {i}"))
+            continue
+        picked = [concepts[j] for j in rng.choice(len(concepts), 2, replace=False)]
+        body = " ".join(words[j] for j in rng.integers(0, len(words), 40))
+        notes.append({
+            'title': f"Vault note {i}",
+            'content': f"{' '.join(picked)} の実験結果と実装例。{body}",
+            'ai_domain': "llm"
+        })
+    return notes
+
+
+def _write_synthetic_vault(vault_path: Path, notes: List[Dict]):
+    """合成ノートを 02_PERMANENT 形式の Markdown として書き出す"""
+    folder = vault_path / "02_PERMANENT"
+    folder.mkdir(parents=True, exist_ok=True)
+    for i, item in enumerate(notes):
+        (folder / f"Z{i:08d}_note_{i}.md").write_text(
+            f"---\nid: Z{i:08d}\ntitle: \"{item['title']}\"\nai_domain: {item['ai_domain']}\n"
+            f"type: permanent\ntags: [zettelkasten, permanent]\n---\n\n{item['content']}\n",
+            encoding='utf-8')
+
+
+def run_import_benchmark(count: int = 10000, workers: Optional[int] = None):
+    """Vault取り込みの比較（従来の create_note 逐次 vs 一括取り込み・変更なしの再実行）"""
+    base = Path(tempfile.mkdtemp(prefix="zettel_import_bench_"))
+    try:
+        notes = _synthetic_vault_notes(count)
+        _write_synthetic_vault(base / "vault", notes)
+        legacy_count = min(count, 1000)
+        
+        legacy = ZettelkastenAISystem(str(base / "legacy"), graph_snapshot=False)
+        start = time.perf_counter()
+        for item in notes[:legacy_count]:
+            legacy.create_note(item['title'], item['content'], item['ai_domain'])
+        legacy_seconds = time.perf_counter() - start
+        
+        system = ZettelkastenAISystem(str(base / "bulk"), graph_snapshot=False)
+        start = time.perf_counter()
+        stats = system.import_vault(base / "vault", workers=workers)
+        import_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        system.import_vault(base / "vault", workers=workers)
+        rerun_seconds = time.perf_counter() - start
+        
+        print(f"📊 Vault取り込みベンチマーク: {count}ファイル")
+        print(f"   従来（create_note 逐次、先頭{legacy_count}件）: {legacy_seconds:.2f}秒 "
+              f"({legacy_count / legacy_seconds:,.0f}件/秒)")
+        print(f"   一括取り込み（全件）: {import_seconds:.2f}秒 ({count / import_seconds:,.0f}件/秒、"
+              f"登録{stats['imported']} / 重複{stats['duplicates']} / 接続{stats['connections']})")
+        print(f"   再実行（変更なし）:   {rerun_seconds:.2f}秒")
+        legacy.store.close()
+        system.store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "save": run_benchmark,
+    "similarity": run_similarity_benchmark,
+    "graph": run_graph_benchmark,
+    "insights": run_insight_benchmark,
+    "concepts": run_concept_benchmark,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI特化ツェッテルカステンのベンチマーク")
+    parser.add_argument("target", choices=[*BENCHMARKS, "import"], help="計測対象")
+    parser.add_argument("--notes", type=int, default=10000, help="ノート数")
+    parser.add_argument("--workers", type=int, default=None, help="取り込みのワーカープロセス数")
+    args = parser.parse_args()
+
+    if args.target == "import":
+        run_import_benchmark(args.notes, args.workers)
+    else:
+        BENCHMARKS[args.target](args.notes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+潜在リンク発見エンジンのベンチマーク
+従来の全ペア比較（部分集合）と、疎行列・転置リストによるペア探索を比較します
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from link_discovery import find_similar_pairs, jaccard, sparse, tokenize
+
+
+def _synthetic_notes(count: int, seed: int = 0) -> List[str]:
+    """恒久ノート形式の合成本文（Zipf 分布の語彙 + 共通の frontmatter、一部は派生ノート）"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    notes = []
+    for i in range(count):
+        if notes and rng.random() < 0.2:
+            # 既存ノートを少し書き換えた派生ノート（類似ペアになる）
+            words = rng.choice(notes).split()
+            words[-20:] = rng.choices(vocabulary, weights, k=20)
+            notes.append(" ".join(words))
+            continue
+        body = " ".join(rng.choices(vocabulary, weights, k=150))
+        notes.append(f"---\nid: Z{i:014d}\ntitle: \"note {i}\"\ntype: permanent\n"
+                     f"tags: [zettelkasten, permanent]\n---\n\n# note {i}\n\n{body}")
+    return notes
+
+
+def run_benchmark(count: int = 20000, legacy_count: int = 300, threshold: float = 0.3):
+    """従来の全ペア比較（部分集合）と疎行列・転置リストの比較"""
+    contents = _synthetic_notes(count)
+    legacy_count = min(legacy_count, count)
+
+    start = time.perf_counter()
+    legacy = set()
+    subset = contents[:legacy_count]
+    for i, content1 in enumerate(subset):
+        for j, content2 in enumerate(subset):
+            if i != j:
+                similarity = jaccard(tokenize(content1), tokenize(content2))
+                if similarity > threshold:
+                    legacy.add((min(i, j), max(i, j)))
+    legacy_seconds = time.perf_counter() - start
+
+    subset_pairs = {(i, j) for i, j, _ in find_similar_pairs(subset, threshold)}
+    print(f"📊 潜在リンク発見ベンチマーク（閾値 {threshold}）")
+    print(f"   従来（二重ループ、{legacy_count}件）: {legacy_seconds:.2f}秒 / {len(legacy)}ペア"
+          f"（新方式との一致: {'✅' if subset_pairs == legacy else '❌'}）")
+
+    fallback_count = min(count, 2000)
+    start = time.perf_counter()
+    pairs = find_similar_pairs(contents[:fallback_count], threshold, use_sparse=False)
+    print(f"   転置リスト（scipy なし、{fallback_count}件）: {time.perf_counter() - start:.2f}秒 / {len(pairs)}ペア")
+
+    if sparse is not None:
+        start = time.perf_counter()
+        pairs = find_similar_pairs(contents, threshold, use_sparse=True)
+        print(f"   疎行列（CSR、{count}件）: {time.perf_counter() - start:.2f}秒 / {len(pairs)}ペア")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="潜在リンク発見エンジンのベンチマーク")
+    parser.add_argument("--notes", type=int, default=20000, help="ノート数")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Jaccard 類似度の閾値")
+    args = parser.parse_args()
+    run_benchmark(args.notes, threshold=args.threshold)
+
+
+if __name__ == "__main__":
+    main()
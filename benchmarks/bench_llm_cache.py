@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+LLM 応答キャッシュのベンチマーク
+模擬OpenAIサーバーに同じプロンプトを2回送り、2回目がキャッシュから返る時間を計測します
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+import openai
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from fake_openai_server import FakeOpenAIServer
+from llm_cache import LLMCache
+
+
+async def run_benchmark(prompts: int = 20, latency: float = 0.5):
+    """模擬OpenAIサーバーに同じプロンプトを2回送ったときの時間（2回目はキャッシュから）"""
+    async with FakeOpenAIServer(latency=latency, jitter=0.0) as server:
+        client = openai.AsyncOpenAI(api_key="sk-benchmark", base_url=server.base_url)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = LLMCache(Path(temp_dir) / "llm_cache.db")
+
+            async def complete(prompt: str) -> str:
+                request = {"provider": "openai", "model": "gpt-4", "temperature": 0.7, "max_tokens": 1000,
+                           "messages": [{"role": "user", "content": prompt}]}
+
+                async def call():
+                    response = await client.chat.completions.create(
+                        **{key: value for key, value in request.items() if key != "provider"})
+                    return response.choices[0].message.content.strip()
+                return await cache.aget_or_call(request, call)
+
+            print(f"📊 LLMキャッシュベンチマーク（{prompts}プロンプト、模擬API 遅延 {latency}秒）")
+            outputs = []
+            for label in ("1回目（API）", "2回目（キャッシュ）"):
+                start = time.perf_counter()
+                outputs.append([await complete(f"セクション: テスト{i}\n本文") for i in range(prompts)])
+                print(f"   {label}: {time.perf_counter() - start:.3f}秒 / API リクエスト累計 {server.requests}件")
+            print(f"   応答の一致: {'✅' if outputs[0] == outputs[1] else '❌'} / {cache.summary()}")
+            cache.close()
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 応答キャッシュのベンチマーク")
+    parser.add_argument("--prompts", type=int, default=20, help="プロンプト数")
+    parser.add_argument("--latency", type=float, default=0.5, help="模擬APIの応答遅延（秒）")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.prompts, args.latency))
+
+
+if __name__ == "__main__":
+    main()
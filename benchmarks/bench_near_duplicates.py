@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+重複ノート検出のベンチマーク
+全ペアの厳密な Jaccard（部分集合）と MinHash + LSH を比較し、仕込んだ重複の検出率を確認します
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from near_duplicates import MinHashLSH, shingle_hashes
+
+
+def _synthetic_notes(count: int, seed: int = 0) -> Tuple[Dict[str, str], set]:
+    """合成ノート（1割は既存ノートに数行追記した重複ノート）と、仕込んだ重複ペア"""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(5000)]
+    notes, planted = {}, set()
+    for i in range(count):
+        key = f"note{i:06d}.md"
+        if i and rng.random() < 0.1:
+            source = f"note{rng.randrange(i):06d}.md"
+            notes[key] = notes[source] + "\n\n## 追記\n" + " ".join(rng.choices(words, k=8))
+            planted.add(tuple(sorted((source, key))))
+            continue
+        notes[key] = "\n".join(" ".join(rng.choices(words, k=12)) for _ in range(15))
+    return notes, planted
+
+
+def run_benchmark(count: int = 20000, exact_count: int = 400, threshold: float = 0.8):
+    """全ペアの厳密な Jaccard（部分集合）と MinHash + LSH の比較"""
+    notes, planted = _synthetic_notes(count)
+
+    keys = list(notes)[:min(exact_count, count)]
+    start = time.perf_counter()
+    shingles = [set(shingle_hashes(notes[key]).tolist()) for key in keys]
+    exact = set()
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            union = len(shingles[i] | shingles[j])
+            if union and len(shingles[i] & shingles[j]) / union >= threshold:
+                exact.add((keys[i], keys[j]))
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = MinHashLSH(threshold)
+    for key, text in notes.items():
+        index.add(key, text)
+    found = {tuple(sorted((index.keys[i], index.keys[j]))) for i, j, _ in index.duplicate_pairs()}
+    clusters = index.clusters()
+    lsh_seconds = time.perf_counter() - start
+
+    subset = set(keys)
+    found_subset = {pair for pair in found if pair[0] in subset and pair[1] in subset}
+    recall = len(found & planted) / len(planted) if planted else 1.0
+    print(f"📊 重複ノート検出ベンチマーク（閾値 {threshold}、帯{index.bands} × 行{index.rows}）")
+    print(f"   全ペア厳密計算（{len(keys)}件）: {exact_seconds:.2f}秒 / {len(exact)}ペア"
+          f"（LSH の一致: {len(found_subset & exact)} / 余分: {len(found_subset - exact)}）")
+    print(f"   MinHash + LSH（{count}件）: {lsh_seconds:.2f}秒 / {len(found)}ペア・{len(clusters)}グループ"
+          f"（仕込んだ重複の検出率: {recall:.1%}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重複ノート検出のベンチマーク")
+    parser.add_argument("--notes", type=int, default=20000, help="ノート数")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard 類似度の閾値")
+    args = parser.parse_args()
+    run_benchmark(args.notes, threshold=args.threshold)
+
+
+if __name__ == "__main__":
+    main()
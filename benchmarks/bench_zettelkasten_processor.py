@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+受信箱処理のベンチマーク
+従来の逐次処理と、並列分類 + 一括昇格 + 差分処理（新着なし・新着あり）の処理時間を比較します
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+import frontmatter
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from file_snapshot_index import FileSnapshotIndex
+from inbox_classifier import CONCEPT_KEYWORDS
+from note_cache import NoteCache
+from zettel_ids import ZettelIdAllocator
+from zettelkasten_processor import ZettelkastenProcessor
+
+
+def _write_benchmark_inbox(inbox_path, count, start=0, seed=0):
+    """受信箱の合成ノート（約半数が恒久ノート候補、一部は分割推奨）"""
+    rng = random.Random(seed + start)
+    words = [f"word{i}" for i in range(3000)]
+    for i in range(start, start + count):
+        sections = rng.choice([1, 2, 5])
+        body = "\n\n".join(f"## 節{s}\n" + " ".join(rng.choices(words, k=60)) for s in range(sections))
+        if rng.random() < 0.5:
+            body += f"\n\n関連: [[note {rng.randrange(count)}]] の{rng.choice(['設計', '手法', '仕組み'])}"
+        with open(os.path.join(inbox_path, f"note_{i:06d}.md"), 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: \"note {i}\"\ntags: [inbox]\n---\n\n# note {i}\n\n{body}\n")
+
+
+def _legacy_process_inbox(processor):
+    """従来の逐次処理（1ファイルずつ解析・判定・昇格）。昇格したタイトルを返す"""
+    promoted = []
+    for filename in os.listdir(processor.inbox_path):
+        if filename.endswith('.md'):
+            file_path = os.path.join(processor.inbox_path, filename)
+            post = frontmatter.load(file_path)
+            content = post.content
+            full_text = str(post.metadata) + "\n" + content
+            if len(re.findall(r'^#{1,6}\s+', content, re.MULTILINE)) > 3:
+                processor._suggest_note_split(content, post.metadata.get('title', filename[:-3]))
+            links = re.findall(r'\[\[([^\]]+)\]\]', full_text)
+            if len(content) < 200 or not links:
+                continue
+            full_text_lower = full_text.lower()
+            if (any(keyword.lower() in full_text_lower for keyword in CONCEPT_KEYWORDS)
+                    or (len(content) > 1000 and len(links) >= 2)):
+                promoted.append(post.metadata['title'])
+                processor._promote_to_permanent(file_path, post)
+    return promoted
+
+
+def run_inbox_benchmark(count=2000, workers=None):
+    """従来の逐次処理と、並列分類 + 一括昇格 + 差分処理の比較"""
+    with tempfile.TemporaryDirectory() as temp_dir, contextlib.redirect_stdout(io.StringIO()):
+        note_cache = NoteCache(os.path.join(temp_dir, "note_cache.pickle"))
+        snapshot_index = FileSnapshotIndex(os.path.join(temp_dir, "file_snapshots.db"))
+        id_allocator = ZettelIdAllocator(os.path.join(temp_dir, "zettel_ids.db"))
+        legacy = ZettelkastenProcessor(os.path.join(temp_dir, "legacy"), note_cache, snapshot_index, id_allocator)
+        _write_benchmark_inbox(legacy.inbox_path, count)
+        start = time.perf_counter()
+        legacy_titles = _legacy_process_inbox(legacy)
+        legacy_seconds = time.perf_counter() - start
+
+        processor = ZettelkastenProcessor(os.path.join(temp_dir, "vault"), note_cache, snapshot_index, id_allocator)
+        processor.config = dict(processor.config, inbox_workers=workers)
+        _write_benchmark_inbox(processor.inbox_path, count)
+        timings = []
+        for arrivals in (0, 0, count // 10):
+            if arrivals:
+                _write_benchmark_inbox(processor.inbox_path, arrivals, start=count)
+            start = time.perf_counter()
+            processor.process_inbox_notes()
+            timings.append(time.perf_counter() - start)
+            if len(timings) == 1:
+                titles = [note.metadata['title'] for note in processor.note_cache.folder(processor.permanent_path)]
+        snapshot_index.close()
+        id_allocator.close()
+
+    print(f"📊 受信箱処理ベンチマーク（{count}件、ワーカー {workers or os.cpu_count()}）")
+    print(f"   従来（逐次処理）: {legacy_seconds:.2f}秒 / 昇格{len(legacy_titles)}件")
+    print(f"   並列分類 + 一括昇格（初回）: {timings[0]:.2f}秒 / 昇格{len(titles)}件"
+          f"（従来との一致: {'✅' if sorted(titles) == sorted(legacy_titles) else '❌'}）")
+    print(f"   2回目（新着なし）: {timings[1]:.3f}秒")
+    print(f"   3回目（新着 {count // 10}件）: {timings[2]:.2f}秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="受信箱処理のベンチマーク")
+    parser.add_argument("--notes", type=int, default=2000, help="受信箱ノート数")
+    parser.add_argument("--workers", type=int, default=None, help="分類のプロセス数（既定: CPU数）")
+    args = parser.parse_args()
+    run_inbox_benchmark(args.notes, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+OpenAI互換 模擬APIサーバー（ベンチマーク用）
+/v1/chat/completions に固定の遅延で定型の応答を返し、記事生成の並列化などを実APIなしで計測します
+
+- 遅延: latency 秒 ± jitter（同時リクエストは並行して待機するので、実APIと同様に並列化の効果が出る）
+- failure_rate の割合で 500 エラー、hang_rate の割合で hang_seconds 秒応答しない（タイムアウトの確認用）
+- rate_limit 指定時は直近1秒の受信数がそれを超えたリクエストに 429（retry-after-ms 付き）を返す
+- 受信数・同時処理数の最大値を記録
+- クライアントは base_url（または環境変数 OPENAI_BASE_URL）にこのサーバーの URL を指定
+"""
+
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+from typing import Optional
+
+from aiohttp import web
+
+SECTION_TEXT = """## {title}
+
+この節では{title}について、実装例を交えて解説します。API や framework の使い方、
+データの前処理から model の評価までを順に説明します。
+
+```python
+def example():
+    return "implementation"
+```
+
+- ポイント1: 設計の意図
+- ポイント2: 実装の注意点
+"""
+
+
+class FakeOpenAIServer:
+    """OpenAI互換の模擬サーバー（async with で起動・停止）"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, failure_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 30.0, rate_limit: Optional[float] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rate_limit = rate_limit
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._accepted = deque()  # 直近1秒に受け付けた時刻
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]  # port=0 なら空きポートが割り当てられる
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.max_in_flight = 0
+
+    def _rate_limit_wait(self) -> float:
+        """レート超過なら次に受け付けられるまでの秒数（超過していなければ 0）"""
+        if self.rate_limit is None:
+            return 0.0
+        now = time.monotonic()
+        while self._accepted and now - self._accepted[0] >= 1.0:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.rate_limit:
+            return 1.0 - (now - self._accepted[0])
+        self._accepted.append(now)
+        return 0.0
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests += 1
+        wait = self._rate_limit_wait()
+        if wait > 0:
+            self.rate_limited += 1
+            return web.json_response(
+                {"error": {"message": "simulated rate limit", "type": "rate_limit_error"}},
+                status=429, headers={"retry-after-ms": str(int(wait * 1000) + 1)})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            draw = self.rng.random()
+            if draw < self.hang_rate:
+                await asyncio.sleep(self.hang_seconds)
+            await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+            if self.hang_rate <= draw < self.hang_rate + self.failure_rate:
+                return web.json_response({"error": {"message": "simulated failure", "type": "server_error"}},
+                                         status=500)
+            return web.json_response(self._completion(body))
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _completion(body: dict) -> dict:
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        title = next((line.split(":", 1)[1].strip() for line in prompt.splitlines()
+                      if line.strip().startswith("セクション:")), "生成結果")
+        content = SECTION_TEXT.format(title=title)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-fake-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+
+async def _serve(args):
+    async with FakeOpenAIServer(args.latency, args.jitter, args.failure_rate, args.hang_rate,
+                                rate_limit=args.rate_limit, host=args.host, port=args.port) as server:
+        print(f"🧪 模擬OpenAIサーバー起動: {server.base_url}（OPENAI_BASE_URL に指定してください）")
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI互換 模擬APIサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="応答の遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.1, help="遅延のばらつき（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="500 エラーを返す割合")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="応答しないリクエストの割合")
+    parser.add_argument("--rate-limit", type=float, default=None, help="1秒あたりの受付上限（超過は 429）")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("🛑 模擬OpenAIサーバー停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+概念抽出器
+concept_taxonomy.json の全概念・シグナル語を1つの選択正規表現にコンパイルし、1回の走査で抽出します
+
+- 接頭辞を共有する木構造の正規表現で長い語を優先して照合し、一致した語に含まれる短い概念は包含表（implies）で補う
+  （例: "prompt-template" の一致は "prompt" の出現としても数える）
+- 一般概念は区切り文字の有無・種類を問わない（"machine learning" / "machine_learning"）
+- 結果は概念ごとの出現数（と任意で出現位置）。恒久性スコアの深度・参考性シグナルも同じ走査で数える
+"""
+
+import re
+import json
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Set
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "concept_taxonomy.json"
+
+_SEPARATORS = re.compile(r"[-_\s]")
+
+
+_FLEXIBLE_SEPARATOR = object()  # 区切り文字の有無・種類を問わない位置
+_END = ""  # 木構造で語の終端を表すキー
+
+
+def _trie_to_regex(node) -> str:
+    """接頭辞木を正規表現に変換（長い一致を優先）"""
+    branches = []
+    for unit in sorted((key for key in node if key != _END), key=lambda key: str(key)):
+        piece = "[-_\\s]?" if unit is _FLEXIBLE_SEPARATOR else re.escape(unit)
+        branches.append(piece + _trie_to_regex(node[unit]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # 終端でもある節点は、より長い一致を試してから空一致を許す
+    return f"(?:{body})?" if _END in node else body
+
+
+def _key(text: str) -> str:
+    """照合結果から概念を引くための正規化キー"""
+    return _SEPARATORS.sub("", text.lower())
+
+
+@dataclass
+class ConceptHits:
+    """1テキスト分の抽出結果"""
+    counts: Counter = field(default_factory=Counter)
+    positions: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    signals: Counter = field(default_factory=Counter)
+
+    def __contains__(self, concept: str) -> bool:
+        return concept in self.counts
+
+
+class ConceptExtractor:
+    """タクソノミーからコンパイルした単一走査の概念抽出器"""
+
+    def __init__(self, taxonomy: Dict):
+        self.domains: Dict[str, List[str]] = {
+            domain: list(spec.get("concepts", [])) for domain, spec in taxonomy.get("domains", {}).items()}
+        self.domain_core: Dict[str, Set[str]] = {
+            domain: set(spec.get("core", [])) for domain, spec in taxonomy.get("domains", {}).items()}
+        self.general: List[str] = list(taxonomy.get("general", []))
+        self.signal_terms: Dict[str, str] = {
+            term: signal for signal, terms in taxonomy.get("signals", {}).items() for term in terms}
+
+        literal = {concept for concepts in self.domains.values() for concept in concepts}
+        self.all_concepts = sorted(literal | set(self.general))
+
+        # 正規化キー -> 概念（シグナル語は別表）
+        self._concept_by_key = {_key(concept): concept for concept in self.all_concepts}
+        self._signal_by_key = {_key(term): signal for term, signal in self.signal_terms.items()}
+
+        # 一般概念の "-" は区切り文字（任意）として扱う
+        terms = {concept: list(concept) for concept in literal}
+        for concept in self.general:
+            terms[concept] = [_FLEXIBLE_SEPARATOR if char == "-" else char for char in concept]
+        for term in self.signal_terms:
+            terms.setdefault(term, list(term))
+
+        # 接頭辞を共有する木構造の正規表現（小文字化した本文に適用）
+        trie = {}
+        for units in terms.values():
+            node = trie
+            for unit in units:
+                node = node.setdefault(unit.lower() if unit != _FLEXIBLE_SEPARATOR else unit, {})
+            node[_END] = True
+        self.pattern = re.compile(_trie_to_regex(trie))
+        self._fallback = re.compile(self.pattern.pattern, re.IGNORECASE)
+
+        # 包含表: 概念 -> [(含まれる概念, 相対位置)]
+        self.implies: Dict[str, List[tuple]] = {}
+        for outer in self.all_concepts:
+            inner_hits = []
+            for inner in self.all_concepts:
+                if inner == outer:
+                    continue
+                for match in re.finditer(re.escape(inner), outer):
+                    inner_hits.append((inner, match.start()))
+            if inner_hits:
+                self.implies[outer] = inner_hits
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY_PATH) -> "ConceptExtractor":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str, with_positions: bool = False) -> ConceptHits:
+        """1回の走査で概念・シグナル語の出現数（with_positions=True なら出現位置も）を取得"""
+        hits = ConceptHits()
+        lowered = text.lower()
+        # 小文字化で長さが変わる文字を含む場合だけ IGNORECASE で照合（位置を保つため）
+        if len(lowered) == len(text):
+            pattern, target = self.pattern, lowered
+        else:
+            pattern, target = self._fallback, text
+
+        if not with_positions:
+            # 出現数だけなら一致文字列を C 実装で集計し、異なり語ごとに解決
+            for matched, count in Counter(pattern.findall(target)).items():
+                self._record(hits, matched, count, None)
+            return hits
+
+        for match in pattern.finditer(target):
+            self._record(hits, match.group(), 1, match.start())
+        return hits
+
+    def _record(self, hits: ConceptHits, matched: str, count: int, start):
+        key = _key(matched)
+        concept = self._concept_by_key.get(key)
+        if concept is None:
+            signal = self._signal_by_key.get(key)
+            if signal is not None:
+                hits.signals[signal] += count
+            return
+        hits.counts[concept] += count
+        if start is not None:
+            hits.positions[concept].append(start)
+        for inner, offset in self.implies.get(concept, ()):
+            hits.counts[inner] += count
+            if start is not None:
+                hits.positions[inner].append(start + offset)
+
+    def concepts_for(self, hits: ConceptHits, ai_domain: str) -> List[str]:
+        """ドメイン固有概念 + 一般概念のうち出現したもの"""
+        concepts = [concept for concept in self.domains.get(ai_domain, []) if concept in hits]
+        concepts += [concept for concept in self.general if concept in hits and concept not in concepts]
+        return concepts
+
+    def infer_domain(self, hits: ConceptHits, default: str) -> str:
+        """出現したドメイン固有概念が最も多いドメイン（1つもなければ default）"""
+        best, best_count = default, 0
+        for domain, concepts in self.domains.items():
+            count = sum(1 for concept in concepts if concept in hits)
+            if count > best_count:
+                best, best_count = domain, count
+        return best
+
+
+@lru_cache(maxsize=None)
+def load_extractor(path: str = str(DEFAULT_TAXONOMY_PATH)) -> ConceptExtractor:
+    """タクソノミーごとに1回だけコンパイル"""
+    return ConceptExtractor.from_file(path)
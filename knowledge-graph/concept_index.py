@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+概念転置索引
+概念 → ノートID の集合をメモリに保持し、SQLite の note_concepts テーブルに永続化します
+
+- 概念を共有するノートの取得は O(一致件数)（全ノート走査なし）
+- 既存DBで note_concepts が空なら knowledge_notes.concepts から構築
+"""
+
+import json
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS note_concepts (
+        concept TEXT NOT NULL,
+        note_id TEXT NOT NULL,
+        PRIMARY KEY (concept, note_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_note_concepts_note ON note_concepts(note_id)'
+]
+
+
+class ConceptIndex:
+    """概念 → ノートID の転置索引（KnowledgeStore と同じDBを使用）"""
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.RLock()
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.note_concepts: Dict[str, Set[str]] = {}
+
+        with self.store.transaction():
+            for statement in SCHEMA:
+                self.store.conn.execute(statement)
+        self._load()
+
+    def _load(self):
+        """保存済みの索引を読み込む（未構築ならノートから構築）"""
+        rows = self.store.query('SELECT concept, note_id FROM note_concepts')
+        if not rows:
+            notes = self.store.query('SELECT id, concepts FROM knowledge_notes')
+            if notes:
+                self.add_many((note_id, json.loads(concepts or "[]")) for note_id, concepts in notes)
+            return
+        for concept, note_id in rows:
+            self.postings[concept].add(note_id)
+            self.note_concepts.setdefault(note_id, set()).add(concept)
+
+    def reload(self):
+        """DB の状態から読み直す（トランザクションのロールバック後にメモリ上の索引を合わせる）"""
+        with self.lock:
+            self.postings = defaultdict(set)
+            self.note_concepts = {}
+            self._load()
+
+    def add_many(self, items: Iterable[Tuple[str, Iterable[str]]]):
+        """(note_id, concepts) をまとめて登録（既存ノートは置き換え）"""
+        with self.lock, self.store.transaction() as conn:
+            for note_id, concepts in items:
+                concepts = set(concepts)
+                previous = self.note_concepts.get(note_id)
+                if previous is not None:
+                    for concept in previous - concepts:
+                        self.postings[concept].discard(note_id)
+                    conn.execute('DELETE FROM note_concepts WHERE note_id = ?', (note_id,))
+                self.note_concepts[note_id] = concepts
+                for concept in concepts:
+                    self.postings[concept].add(note_id)
+                conn.executemany('INSERT OR IGNORE INTO note_concepts VALUES (?, ?)',
+                                 ((concept, note_id) for concept in concepts))
+
+    def add(self, note_id: str, concepts: Iterable[str]):
+        """ノート1件を登録"""
+        self.add_many([(note_id, concepts)])
+
+    def remove(self, note_id: str):
+        """ノートを索引から削除"""
+        with self.lock, self.store.transaction() as conn:
+            for concept in self.note_concepts.pop(note_id, ()):
+                self.postings[concept].discard(note_id)
+            conn.execute('DELETE FROM note_concepts WHERE note_id = ?', (note_id,))
+
+    def notes_with(self, concept: str) -> Set[str]:
+        """概念を持つノートID"""
+        with self.lock:
+            return set(self.postings.get(concept, ()))
+
+    def overlap_counts(self, concepts: Iterable[str], exclude: Optional[str] = None) -> Counter:
+        """概念を共有するノートごとの共有概念数"""
+        counts = Counter()
+        with self.lock:
+            for concept in set(concepts):
+                counts.update(self.postings.get(concept, ()))
+        if exclude is not None:
+            counts.pop(exclude, None)
+        return counts
+
+    def matrix(self, note_ids: Sequence[str]) -> sparse.csr_matrix:
+        """ノート × 概念の 0/1 疎行列（行は note_ids の順。積で共有概念数が求まる）"""
+        columns: Dict[str, int] = {}
+        indptr, indices = [0], []
+        with self.lock:
+            for note_id in note_ids:
+                for concept in self.note_concepts.get(note_id, ()):
+                    indices.append(columns.setdefault(concept, len(columns)))
+                indptr.append(len(indices))
+        return sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                                 shape=(len(note_ids), len(columns)))
+
+    def concept_frequencies(self) -> List[Tuple[str, int]]:
+        """概念ごとのノート数（多い順）"""
+        with self.lock:
+            return sorted(((concept, len(ids)) for concept, ids in self.postings.items() if ids),
+                          key=lambda item: -item[1])
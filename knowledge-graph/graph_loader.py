@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+知識グラフローダー
+knowledge_notes と concept_connections から networkx グラフを1パスで構築します
+
+- ノート本文は読み込まない（ノード属性は ID とスコアのみ）
+- 任意で隣接配列（CSR形式）の npz スナップショットを保存し、次回起動時はそこから復元
+  （ノート・接続の件数と最終更新時刻が一致する場合のみ使用）
+- ドメイン単位の部分グラフを必要になった時点で読み込む
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+
+class GraphLoader:
+    """SQLite → networkx グラフ（スナップショット・ドメイン別遅延読み込み対応）"""
+
+    def __init__(self, store, snapshot_path: Optional[Path] = None):
+        self.store = store
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._domain_graphs: Dict[str, nx.DiGraph] = {}
+
+    def signature(self) -> Tuple:
+        """DBの状態を表す値（変更があればスナップショットを作り直す）"""
+        notes = self.store.query_one('SELECT COUNT(*), MAX(updated_at) FROM knowledge_notes')
+        connections = self.store.query_one('SELECT COUNT(*), MAX(created_at) FROM concept_connections')
+        return (SNAPSHOT_VERSION, notes[0], notes[1] or "", connections[0], connections[1] or "")
+
+    # 配列の構築
+
+    def _read_arrays(self) -> Dict[str, np.ndarray]:
+        """DBから1パスで読み込み、ノード配列と CSR 隣接配列を作る"""
+        node_rows = self.store.query(
+            'SELECT id, ai_domain, permanence_score, emergence_potential FROM knowledge_notes ORDER BY id')
+        ids = [row[0] for row in node_rows]
+        position = {note_id: i for i, note_id in enumerate(ids)}
+        domains = sorted({row[1] for row in node_rows})
+        domain_code = {domain: i for i, domain in enumerate(domains)}
+
+        edge_types: Dict[str, int] = {}
+        sources, targets, weights, types = [], [], [], []
+        for source, target, strength, connection_type in self.store.query(
+                'SELECT source_concept, target_concept, connection_strength, connection_type '
+                'FROM concept_connections'):
+            s, t = position.get(source), position.get(target)
+            if s is None or t is None:
+                continue
+            sources.append(s)
+            targets.append(t)
+            weights.append(strength or 0.0)
+            types.append(edge_types.setdefault(connection_type or "", len(edge_types)))
+
+        # 送信元ノート順に並べた CSR（indptr[i]:indptr[i+1] がノード i の出辺）
+        sources = np.asarray(sources, dtype=np.int32)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(ids)), out=indptr[1:])
+
+        return {
+            "signature": np.asarray([str(value) for value in self.signature()]),
+            "ids": np.asarray(ids, dtype=str),
+            "domains": np.asarray(domains, dtype=str),
+            "domain_codes": np.asarray([domain_code[row[1]] for row in node_rows], dtype=np.int16),
+            "permanence": np.asarray([row[2] or 0.0 for row in node_rows], dtype=np.float32),
+            "emergence": np.asarray([row[3] or 0.0 for row in node_rows], dtype=np.float32),
+            "indptr": indptr,
+            "indices": np.asarray(targets, dtype=np.int32)[order],
+            "weights": np.asarray(weights, dtype=np.float32)[order],
+            "edge_types": np.asarray(types, dtype=np.int16)[order],
+            "edge_type_names": np.asarray(sorted(edge_types, key=edge_types.get), dtype=str),
+        }
+
+    def _save_snapshot(self, arrays: Dict[str, np.ndarray]):
+        """一時ファイルに書いてから置き換え"""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".graph_", suffix=".npz",
+                                         dir=str(self.snapshot_path.parent))
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, self.snapshot_path)
+
+    def _load_snapshot(self) -> Optional[Dict[str, np.ndarray]]:
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return None
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            return None
+        current = [str(value) for value in self.signature()]
+        if list(arrays.get("signature", [])) != current:
+            return None
+        return arrays
+
+    def arrays(self, refresh: bool = False) -> Dict[str, np.ndarray]:
+        """ノード・隣接配列（スナップショットが最新ならそこから）"""
+        if self._arrays is not None and not refresh:
+            return self._arrays
+        arrays = None if refresh else self._load_snapshot()
+        if arrays is None:
+            arrays = self._read_arrays()
+            if self.snapshot_path:
+                self._save_snapshot(arrays)
+        self._arrays = arrays
+        self._domain_graphs.clear()
+        return arrays
+
+    def invalidate(self, domain: Optional[str] = None):
+        """DB更新後に読み込み済みの配列・部分グラフを破棄"""
+        self._arrays = None
+        if domain is None:
+            self._domain_graphs.clear()
+        else:
+            self._domain_graphs.pop(domain, None)
+
+    # グラフの構築
+
+    def _build_graph(self, arrays: Dict[str, np.ndarray], mask: Optional[np.ndarray] = None) -> nx.DiGraph:
+        ids = arrays["ids"].tolist()
+        selected = np.arange(len(ids)) if mask is None else np.nonzero(mask)[0]
+        graph = nx.DiGraph()
+        permanence, emergence = arrays["permanence"], arrays["emergence"]
+        graph.add_nodes_from(
+            (ids[i], {"permanence_score": float(permanence[i]), "emergence_potential": float(emergence[i])})
+            for i in selected)
+
+        indptr, indices = arrays["indptr"], arrays["indices"]
+        weights, types, type_names = arrays["weights"], arrays["edge_types"], arrays["edge_type_names"]
+        graph.add_edges_from(
+            (ids[i], ids[indices[j]], {"weight": float(weights[j]),
+                                       "connection_type": str(type_names[types[j]])})
+            for i in selected
+            for j in range(indptr[i], indptr[i + 1])
+            if mask is None or mask[indices[j]])
+        return graph
+
+    def load_graph(self, refresh: bool = False) -> nx.DiGraph:
+        """全ノート・全接続のグラフ"""
+        return self._build_graph(self.arrays(refresh))
+
+    def domain_graph(self, domain: str) -> nx.DiGraph:
+        """ドメイン内のノートと、その間の接続だけの部分グラフ（初回アクセス時に構築）"""
+        graph = self._domain_graphs.get(domain)
+        if graph is None:
+            arrays = self.arrays()
+            codes = np.nonzero(arrays["domains"] == domain)[0]
+            mask = (arrays["domain_codes"] == codes[0]) if len(codes) else np.zeros(len(arrays["ids"]), bool)
+            graph = self._build_graph(arrays, mask)
+            self._domain_graphs[domain] = graph
+        return graph
+
+    def domains(self) -> List[str]:
+        return self.arrays()["domains"].tolist()
+
+
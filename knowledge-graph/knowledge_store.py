@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+知識ベース ストレージ層
+ZettelkastenAISystem の SQLite アクセスを1本の常設接続にまとめます
+
+- WAL モード + synchronous=NORMAL（書き込み中も読み取り可能）
+- transaction() で複数の書き込みを1トランザクションにまとめる（入れ子は外側に合流）
+- SQL はモジュール定数として固定し、sqlite3 の文キャッシュで準備済み文を再利用
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# 準備済み文として再利用するSQL（文字列が同一ならキャッシュから再利用される）
+UPSERT_NOTE_SQL = '''
+    INSERT OR REPLACE INTO knowledge_notes
+    (id, title, content, ai_domain, experiment_id, concepts, connections,
+     created_at, updated_at, permanence_score, emergence_potential)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPSERT_CONNECTION_SQL = '''
+    INSERT OR REPLACE INTO concept_connections
+    (source_concept, target_concept, connection_strength, connection_type, created_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+UPSERT_INSIGHT_SQL = '''
+    INSERT OR REPLACE INTO emergence_insights
+    (id, insight_title, connected_concepts, ai_domains, insight_content, confidence_score, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS knowledge_notes (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        ai_domain TEXT NOT NULL,
+        experiment_id TEXT,
+        concepts TEXT,  -- JSON array
+        connections TEXT,  -- JSON array
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        permanence_score REAL DEFAULT 0.0,
+        emergence_potential REAL DEFAULT 0.0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS concept_connections (
+        source_concept TEXT,
+        target_concept TEXT,
+        connection_strength REAL,
+        connection_type TEXT,
+        created_at TEXT,
+        PRIMARY KEY (source_concept, target_concept)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS emergence_insights (
+        id TEXT PRIMARY KEY,
+        insight_title TEXT NOT NULL,
+        connected_concepts TEXT,  -- JSON array
+        ai_domains TEXT,  -- JSON array
+        insight_content TEXT NOT NULL,
+        confidence_score REAL,
+        created_at TEXT NOT NULL
+    )
+    ''',
+    # 接続先の逆引き・ドメイン別抽出・スコア閾値用
+    'CREATE INDEX IF NOT EXISTS idx_connections_target ON concept_connections(target_concept)',
+    'CREATE INDEX IF NOT EXISTS idx_notes_domain ON knowledge_notes(ai_domain)',
+    'CREATE INDEX IF NOT EXISTS idx_notes_emergence ON knowledge_notes(emergence_potential)',
+    # 接続の結合で本文を含む行を読まないためのカバリングインデックス
+    'CREATE INDEX IF NOT EXISTS idx_notes_graph ON knowledge_notes(id, ai_domain, emergence_potential)'
+]
+
+
+def note_row(note) -> Tuple:
+    """AIKnowledgeNote を knowledge_notes の行に変換"""
+    return (
+        note.id, note.title, note.content, note.ai_domain, note.experiment_id,
+        json.dumps(note.concepts), json.dumps(note.connections),
+        note.created_at, note.updated_at, note.permanence_score, note.emergence_potential
+    )
+
+
+class KnowledgeStore:
+    """常設接続・トランザクション一括化の SQLite ストレージ"""
+
+    def __init__(self, db_path, cached_statements: int = 128):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: トランザクションは transaction() で明示的に管理
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None,
+                                    check_same_thread=False, cached_statements=cached_statements)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.lock = threading.RLock()
+        self._depth = 0
+
+    def setup_schema(self):
+        """テーブル作成"""
+        with self.transaction():
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+
+    def close(self):
+        with self.lock:
+            # 統計情報を更新してクエリプランを最適化
+            self.conn.execute("PRAGMA optimize")
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """書き込みトランザクション（入れ子の場合は最も外側で COMMIT）"""
+        with self.lock:
+            outermost = self._depth == 0
+            if outermost:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outermost:
+                self.conn.execute("COMMIT")
+
+    # 書き込み
+
+    def save_note(self, note):
+        """ノート1件を保存"""
+        with self.transaction():
+            self.conn.execute(UPSERT_NOTE_SQL, note_row(note))
+
+    def save_notes(self, notes: Iterable):
+        """ノートをまとめて保存（1トランザクション）"""
+        with self.transaction():
+            self.conn.executemany(UPSERT_NOTE_SQL, (note_row(note) for note in notes))
+
+    def save_connections(self, rows: Iterable[Sequence]):
+        """(source, target, strength, type, created_at) をまとめて保存"""
+        with self.transaction():
+            self.conn.executemany(UPSERT_CONNECTION_SQL, rows)
+
+    def set_connections(self, items: Iterable[Tuple[str, List[str]]]):
+        """(note_id, 接続先IDのリスト) で knowledge_notes.connections をまとめて更新"""
+        with self.transaction():
+            self.conn.executemany('UPDATE knowledge_notes SET connections = ? WHERE id = ?',
+                                  ((json.dumps(connections), note_id) for note_id, connections in items))
+
+    def save_insight(self, insight: dict):
+        """創発的洞察を保存"""
+        self.save_insights([insight])
+
+    def save_insights(self, insights: Iterable[dict]):
+        """創発的洞察をまとめて保存（1トランザクション）"""
+        with self.transaction():
+            self.conn.executemany(UPSERT_INSIGHT_SQL, ((
+                insight['id'], insight['title'],
+                json.dumps(insight['connected_concepts']),
+                json.dumps(insight['ai_domains']),
+                insight['insight_content'],
+                insight['confidence_score'],
+                insight['created_at']
+            ) for insight in insights))
+
+    # 読み取り
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence = ()) -> Optional[Tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def scalar(self, sql: str, params: Sequence = ()):
+        row = self.query_one(sql, params)
+        return row[0] if row else None
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Obsidian Vault 一括取り込み
+既存の Vault（02_PERMANENT など）の Markdown ノートを ZettelkastenAISystem の SQLite に一括登録します
+
+- Vault をディレクトリ走査しながらバッチ単位で処理（全ファイルをメモリに載せない）
+- frontmatter の解析・概念抽出はプロセスプールで並列実行
+- 本文のハッシュで重複を除外（同じ内容の2ファイル目以降は登録しない）
+- 接続は最後に全件まとめてベクトル化して計算（ノートごとの全件走査なし）
+  （create_note と同じく、概念を共有するだけのノートへは 'concept' の接続を保存）
+- vault_import_files テーブルがチェックポイント。中断しても再実行で続きから処理
+  （mtime・サイズが同じファイルは読み込まない。バッチ・接続ブロックごとにコミット）
+- Vault から削除されたファイルのノートは、走査を最後まで終えた時点で削除
+  （同じ内容の重複ファイルが残っていれば、そのファイルがノートを引き継ぐ）
+"""
+
+import os
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import frontmatter
+import numpy as np
+
+try:
+    from .concept_extractor import ConceptHits, load_extractor
+except ImportError:
+    from concept_extractor import ConceptHits, load_extractor
+
+DEFAULT_DOMAIN = "general"  # frontmatter に ai_domain がなく、概念からも推定できない場合
+BATCH_SIZE = 500
+CONNECTION_BLOCK = 256  # 接続計算で一度に類似度を求めるノート数（block × 全ノートの密行列）
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS vault_import_files (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        content_hash TEXT,
+        note_id TEXT,
+        status TEXT NOT NULL,  -- imported / duplicate / error
+        connected INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_vault_import_note ON vault_import_files(note_id)'
+]
+
+UPSERT_FILE_SQL = '''
+    INSERT OR REPLACE INTO vault_import_files
+    (path, mtime_ns, size, content_hash, note_id, status, connected)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def iter_vault_files(vault_path) -> Iterator[str]:
+    """Vault 内の Markdown ファイルを順に返す（.obsidian などの隠しフォルダは除外）"""
+    stack = [str(vault_path)]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.endswith('.md') and entry.is_file():
+                yield entry.path
+        stack.extend(reversed(subdirectories))
+
+
+def parse_vault_file(path: str) -> Dict:
+    """1ファイルを解析（プロセスプールのワーカーで実行）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            post = frontmatter.load(f)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+    content = post.content.strip()
+    hits = load_extractor().scan(content)
+    metadata = post.metadata
+    created = metadata.get('created') or metadata.get('promoted_date')
+    return {
+        'path': path,
+        'content': content,
+        'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+        'title': str(metadata.get('title') or Path(path).stem),
+        'zettel_id': str(metadata['id']) if metadata.get('id') else None,
+        'ai_domain': metadata.get('ai_domain'),
+        'experiment_id': str(metadata['experiment_id']) if metadata.get('experiment_id') else None,
+        'created_at': str(created) if created else None,
+        'concept_counts': hits.counts,
+        'signals': hits.signals,
+    }
+
+
+def _batched(iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class VaultImporter:
+    """Vault → ZettelkastenAISystem の一括取り込み（再開可能）"""
+
+    def __init__(self, system, workers: Optional[int] = None, batch_size: int = BATCH_SIZE,
+                 similarity_threshold: float = 0.3, min_shared_concepts: int = 2,
+                 concept_weight: float = 0.7):
+        self.system = system
+        self.store = system.store
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.similarity_threshold = similarity_threshold
+        self.min_shared_concepts = min_shared_concepts
+        self.concept_weight = concept_weight
+        self.extractor = load_extractor()
+
+        with self.store.transaction():
+            for statement in SCHEMA:
+                self.store.conn.execute(statement)
+        self._load_checkpoint()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            'scanned': 0, 'unchanged': 0, 'imported': 0, 'updated': 0,
+            'duplicates': 0, 'errors': 0, 'deleted': 0, 'connected_notes': 0, 'connections': 0
+        }
+
+    def _load_checkpoint(self):
+        """取り込み済みファイルの状態（パス・ハッシュ・ノートIDの対応）を読み込む"""
+        self.files: Dict[str, tuple] = {}
+        self.hash_owner: Dict[str, str] = {}
+        self.id_owner: Dict[str, str] = {}
+        for row in self.store.query('SELECT path, mtime_ns, size, content_hash, note_id, status, connected '
+                                    'FROM vault_import_files'):
+            self.files[row[0]] = row[1:]
+            if row[5] == 'imported':
+                self.hash_owner[row[3]] = row[4]
+                self.id_owner[row[4]] = row[0]
+
+    # 取り込み
+
+    def run(self, vault_path) -> Dict:
+        """Vault 全体を取り込み、未接続のノートの接続を計算"""
+        vault_path = Path(vault_path).expanduser().resolve()
+        print(f"📥 Vault取り込み開始: {vault_path}（ワーカー{self.workers}）")
+
+        seen = set()
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else nullcontext()
+        with pool:
+            for batch in _batched(iter_vault_files(vault_path), self.batch_size):
+                seen.update(batch)
+                self._import_batch(batch, pool if self.workers > 1 else None)
+                print(f"   ... {self.stats['scanned']}件確認 / {self.stats['imported']}件登録")
+
+        self._remove_deleted(vault_path, seen)
+        self._vectorize_pending()
+        self._connect_pending()
+        self.system.graph_loader.invalidate()
+        self.system._knowledge_graph = None
+
+        print(f"✅ Vault取り込み完了: 登録{self.stats['imported']}件 / 更新{self.stats['updated']}件 / "
+              f"変更なし{self.stats['unchanged']}件 / 重複{self.stats['duplicates']}件 / 削除{self.stats['deleted']}件 / "
+              f"エラー{self.stats['errors']}件 / 接続{self.stats['connections']}本")
+        return dict(self.stats)
+
+    def _changed_paths(self, paths: List[str]) -> List[tuple]:
+        """前回から変更のあったファイル [(path, mtime_ns, size)]"""
+        changed = []
+        for path in paths:
+            self.stats['scanned'] += 1
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            previous = self.files.get(path)
+            if (previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size
+                    and previous[4] != 'error'):
+                self.stats['unchanged'] += 1
+                continue
+            changed.append((path, stat.st_mtime_ns, stat.st_size))
+        return changed
+
+    def _import_batch(self, paths: List[str], pool: Optional[ProcessPoolExecutor]):
+        """1バッチを解析し、ノート・概念索引・チェックポイントを1トランザクションで保存"""
+        changed = self._changed_paths(paths)
+        if not changed:
+            return
+        stat_of = {path: (mtime_ns, size) for path, mtime_ns, size in changed}
+        mapper = pool.map if pool is not None else map
+        kwargs = {'chunksize': max(1, len(changed) // (self.workers * 4))} if pool is not None else {}
+
+        notes, file_rows = [], []
+        for parsed in mapper(parse_vault_file, [path for path, _, _ in changed], **kwargs):
+            path = parsed['path']
+            mtime_ns, size = stat_of[path]
+            if 'error' in parsed:
+                print(f"⚠️ 解析エラー {path}: {parsed['error']}")
+                self.stats['errors'] += 1
+                file_rows.append((path, mtime_ns, size, None, None, 'error', 0))
+                continue
+
+            content_hash = parsed['content_hash']
+            previous = self.files.get(path)
+            previous_id = previous[3] if previous and previous[4] == 'imported' else None
+            owner = self.hash_owner.get(content_hash)
+            if owner is not None and owner != previous_id:
+                # 別ファイルで登録済みの内容
+                self.stats['duplicates'] += 1
+                file_rows.append((path, mtime_ns, size, content_hash, owner, 'duplicate', 1))
+                continue
+            if previous_id and previous[2] == content_hash:
+                # 内容は同じ（mtime だけ変更）
+                self.stats['unchanged'] += 1
+                file_rows.append((path, mtime_ns, size, content_hash, previous_id, 'imported', previous[5]))
+                continue
+
+            note_id = previous_id or self._assign_note_id(parsed['zettel_id'], content_hash)
+            if previous_id:
+                self.hash_owner.pop(previous[2], None)
+                self.stats['updated'] += 1
+            else:
+                self.stats['imported'] += 1
+            self.hash_owner[content_hash] = note_id
+            self.id_owner[note_id] = path
+
+            hits = ConceptHits(counts=Counter(parsed['concept_counts']), signals=Counter(parsed['signals']))
+            ai_domain = parsed['ai_domain']
+            # frontmatter の値はリスト・辞書のこともある（未知の値と同じく概念から推定）
+            if not isinstance(ai_domain, str) or ai_domain not in self.extractor.domains:
+                ai_domain = self.extractor.infer_domain(hits, DEFAULT_DOMAIN)
+            notes.append(self.system._build_note(
+                parsed['title'], parsed['content'], ai_domain, parsed['experiment_id'],
+                hits=hits, note_id=note_id, created_at=parsed['created_at']))
+            file_rows.append((path, mtime_ns, size, content_hash, note_id, 'imported', 0))
+
+        with self.store.transaction() as conn:
+            self.store.save_notes(notes)
+            self.system.concept_index.add_many((note.id, note.concepts) for note in notes)
+            conn.executemany(UPSERT_FILE_SQL, file_rows)
+        for row in file_rows:
+            self.files[row[0]] = row[1:]
+
+    def _assign_note_id(self, zettel_id: Optional[str], content_hash: str) -> str:
+        """frontmatter の id を優先（他ファイル・既存のノートが使用済みなら内容ハッシュから生成）
+
+        システムで作成したノート（エクスポートした AI... ノートなど）と同じ id を使うと
+        上書きしてしまうため、knowledge_notes にある id も使わない
+        """
+        if (zettel_id and zettel_id not in self.id_owner
+                and self.store.scalar('SELECT 1 FROM knowledge_notes WHERE id = ?', (zettel_id,)) is None):
+            return zettel_id
+        return f"VAULT{content_hash[:16]}"
+
+    def _remove_deleted(self, vault_path: Path, seen: set):
+        """Vault から削除されたファイルのチェックポイントとノートを削除
+
+        削除したファイルが持っていた内容の重複ファイルが残っていれば、そちらにノートを引き継ぐ
+        """
+        prefix = str(vault_path) + os.sep
+        deleted = [path for path in self.files if path.startswith(prefix) and path not in seen]
+        deleted_paths = set(deleted)
+        if not deleted:
+            return
+
+        # ノートID -> 引き継ぎ候補の重複ファイル（削除されていないもの）
+        heirs = {}
+        for other, row in self.files.items():
+            if row[4] == 'duplicate' and other not in deleted_paths:
+                heirs.setdefault(row[3], []).append(other)
+
+        removed_notes = []
+        with self.system._rollback_indexes(), self.store.transaction() as conn:
+            conn.executemany('DELETE FROM vault_import_files WHERE path = ?', ((path,) for path in deleted))
+            for path in deleted:
+                mtime_ns, size, content_hash, note_id, status, connected = self.files.pop(path)
+                if status != 'imported':
+                    continue
+                self.id_owner.pop(note_id, None)
+                candidates = heirs.get(note_id)
+                if candidates:
+                    heir = candidates.pop(0)
+                    row = self.files[heir]
+                    self.files[heir] = row[:4] + ('imported', connected)
+                    conn.execute("UPDATE vault_import_files SET status = 'imported', connected = ? WHERE path = ?",
+                                 (connected, heir))
+                    self.id_owner[note_id] = heir
+                    continue
+                self.hash_owner.pop(content_hash, None)
+                removed_notes.append(note_id)
+
+            # 削除したノートへ接続していた取り込みノートは接続を計算し直す
+            conn.executemany("UPDATE vault_import_files SET connected = 0 WHERE status = 'imported' AND note_id IN "
+                             "(SELECT source_concept FROM concept_connections WHERE target_concept = ?)",
+                             ((note_id,) for note_id in removed_notes))
+            conn.executemany('DELETE FROM knowledge_notes WHERE id = ?', ((note_id,) for note_id in removed_notes))
+            conn.executemany('DELETE FROM concept_connections WHERE source_concept = ? OR target_concept = ?',
+                             ((note_id, note_id) for note_id in removed_notes))
+            for note_id in removed_notes:
+                self.system.concept_index.remove(note_id)
+            self.system.vector_index.remove(removed_notes)
+        self.stats['deleted'] += len(removed_notes)
+
+    # 接続
+
+    def _pending_notes(self) -> List[tuple]:
+        """接続未計算の取り込みノート [(note_id, content)]"""
+        return self.store.query('''
+            SELECT n.id, n.content FROM vault_import_files f
+            JOIN knowledge_notes n ON n.id = f.note_id
+            WHERE f.status = 'imported' AND f.connected = 0
+            ORDER BY n.id
+        ''')
+
+    def _vectorize_pending(self):
+        """未接続ノートのベクトルをまとめて登録（必要なら全体で1回だけ再学習）"""
+        pending = self._pending_notes()
+        if pending:
+            self.system.vector_index.add_many([row[0] for row in pending], [row[1] for row in pending],
+                                              corpus_loader=self.system._load_corpus)
+
+    def _connect_pending(self):
+        """未接続ノート × 全ノートの類似度・共有概念数を行列積で求め、ブロックごとに保存"""
+        pending = [row[0] for row in self.store.query('''
+            SELECT note_id FROM vault_import_files
+            WHERE status = 'imported' AND connected = 0 ORDER BY note_id
+        ''')]
+        vector_index = self.system.vector_index
+        if not pending or not vector_index.is_fitted:
+            return
+
+        ids = vector_index.ids
+        id_array = np.asarray(ids)
+        matrix = vector_index.matrix()
+        concept_matrix = self.system.concept_index.matrix(ids)
+        positions = vector_index.positions
+        now = datetime.now().isoformat()
+
+        for block in _batched(pending, CONNECTION_BLOCK):
+            rows = [positions[note_id] for note_id in block if note_id in positions]
+            if not rows:
+                continue
+            scores = (matrix[rows] @ matrix.T).toarray()
+            shared = (concept_matrix[rows] @ concept_matrix.T).toarray()
+            candidates = (scores > self.similarity_threshold) | (shared >= self.min_shared_concepts)
+            candidates[np.arange(len(rows)), rows] = False
+            concept_only = (shared > 0) & ~candidates
+            concept_only[np.arange(len(rows)), rows] = False
+
+            connection_rows, note_connections = [], []
+            for r, position in enumerate(rows):
+                targets = np.nonzero(candidates[r])[0]
+                # _discover_connections と同じ並び（類似度の降順、同点はID順）
+                targets = targets[np.lexsort((id_array[targets], -scores[r, targets]))]
+                connections = [ids[t] for t in targets]
+                connection_rows.extend((ids[position], ids[t], float(scores[r, t]), 'semantic', now)
+                                       for t in targets)
+                connection_rows.extend((ids[position], ids[t], self.concept_weight, 'concept', now)
+                                       for t in np.nonzero(concept_only[r])[0])
+                note_connections.append((ids[position], connections))
+
+            with self.store.transaction() as conn:
+                conn.executemany('DELETE FROM concept_connections WHERE source_concept = ?',
+                                 ((note_id,) for note_id in block))
+                self.store.save_connections(connection_rows)
+                self.store.set_connections(note_connections)
+                conn.executemany("UPDATE vault_import_files SET connected = 1 "
+                                 "WHERE note_id = ? AND status = 'imported'",
+                                 ((note_id,) for note_id in block))
+            self.stats['connected_notes'] += len(block)
+            self.stats['connections'] += len(connection_rows)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+TF-IDFベクトル索引
+語彙とIDFを一度だけ学習し、ノートごとの疎ベクトルを SQLite に永続化して top-k コサイン検索します
+
+- ノート追加: transform 1回 + 疎行列×ベクトル1回（ペアごとの再学習なし）
+- 語彙はノート数が学習時の refit_ratio 倍になったら全体で再学習（償却 O(1)）
+- 検索は全件の疎行列積（総当たり）。近似索引を導入する場合は query() を差し替える
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+VECTORIZER_OPTIONS = {"max_features": 1000, "stop_words": "english"}
+COMPACT_THRESHOLD = 256  # 未結合の追加行がこの件数を超えたら行列に結合
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS vector_vocabulary (
+        term TEXT PRIMARY KEY,
+        column_index INTEGER NOT NULL,
+        idf REAL NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS vector_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS note_vectors (
+        note_id TEXT PRIMARY KEY,
+        indices BLOB NOT NULL,  -- int32
+        weights BLOB NOT NULL   -- float32（L2正規化済み）
+    )
+    '''
+]
+
+
+class VectorIndex:
+    """永続TF-IDFベクトル索引（KnowledgeStore と同じDBを使用）"""
+
+    def __init__(self, store, refit_ratio: float = 2.0):
+        self.store = store
+        self.refit_ratio = refit_ratio
+        self.lock = threading.RLock()
+
+        self.vocabulary: Dict[str, int] = {}
+        self.idf: Optional[np.ndarray] = None
+        self.fitted_docs = 0
+        self._counter: Optional[CountVectorizer] = None
+
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._pending: List[sparse.csr_matrix] = []
+
+        with self.store.transaction():
+            for statement in SCHEMA:
+                self.store.conn.execute(statement)
+        self._load()
+
+    # 永続化
+
+    def _load(self):
+        """保存済みの語彙とベクトルを読み込む"""
+        rows = self.store.query('SELECT term, column_index, idf FROM vector_vocabulary')
+        if not rows:
+            return
+        self.idf = np.zeros(len(rows), dtype=np.float32)
+        for term, column, idf in rows:
+            self.vocabulary[term] = column
+            self.idf[column] = idf
+        self.fitted_docs = int(self.store.scalar(
+            "SELECT value FROM vector_meta WHERE key = 'fitted_docs'") or 0)
+        self._counter = self._make_counter()
+
+        ids, indptr, indices, data = [], [0], [], []
+        for note_id, index_blob, weight_blob in self.store.query(
+                'SELECT note_id, indices, weights FROM note_vectors ORDER BY rowid'):
+            ids.append(note_id)
+            indices.append(np.frombuffer(index_blob, dtype=np.int32))
+            data.append(np.frombuffer(weight_blob, dtype=np.float32))
+            indptr.append(indptr[-1] + len(indices[-1]))
+        self._set_rows(ids, sparse.csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+             np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+             np.array(indptr)), shape=(len(ids), len(self.idf))))
+
+    def reload(self):
+        """DB の状態から読み直す（トランザクションのロールバック後にメモリ上の索引を合わせる）"""
+        with self.lock:
+            self.vocabulary = {}
+            self.idf = None
+            self.fitted_docs = 0
+            self._counter = None
+            self._set_rows([], sparse.csr_matrix((0, 0), dtype=np.float32))
+            self._load()
+
+    def _save_vocabulary(self):
+        with self.store.transaction() as conn:
+            conn.execute('DELETE FROM vector_vocabulary')
+            conn.executemany('INSERT INTO vector_vocabulary VALUES (?, ?, ?)',
+                             ((term, column, float(self.idf[column]))
+                              for term, column in self.vocabulary.items()))
+            conn.execute("INSERT OR REPLACE INTO vector_meta VALUES ('fitted_docs', ?)",
+                         (str(self.fitted_docs),))
+
+    def _save_vectors(self, note_ids: Sequence[str], rows: sparse.csr_matrix, replace_all=False):
+        with self.store.transaction() as conn:
+            if replace_all:
+                conn.execute('DELETE FROM note_vectors')
+            conn.executemany('INSERT OR REPLACE INTO note_vectors VALUES (?, ?, ?)', (
+                (note_id,
+                 rows.indices[rows.indptr[i]:rows.indptr[i + 1]].astype(np.int32).tobytes(),
+                 rows.data[rows.indptr[i]:rows.indptr[i + 1]].astype(np.float32).tobytes())
+                for i, note_id in enumerate(note_ids)))
+
+    # 学習・変換
+
+    def _make_counter(self) -> CountVectorizer:
+        return CountVectorizer(vocabulary=self.vocabulary, stop_words=VECTORIZER_OPTIONS["stop_words"])
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.idf is not None and len(self.vocabulary) > 0
+
+    def fit(self, note_ids: Sequence[str], texts: Sequence[str]):
+        """全ノートで語彙とIDFを学習し、全ベクトルを作り直す"""
+        with self.lock:
+            vectorizer = TfidfVectorizer(**VECTORIZER_OPTIONS)
+            try:
+                vectorizer.fit(texts)
+            except ValueError:
+                # 有効な語が1つもない（空・ストップワードのみ）
+                return
+            self.vocabulary = {term: int(column) for term, column in vectorizer.vocabulary_.items()}
+            self.idf = vectorizer.idf_.astype(np.float32)
+            self.fitted_docs = len(texts)
+            self._counter = self._make_counter()
+            self._save_vocabulary()
+
+            rows = self.transform(texts)
+            self._set_rows(list(note_ids), rows)
+            self._save_vectors(note_ids, rows, replace_all=True)
+
+    def transform(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """テキストをL2正規化済みTF-IDF疎ベクトルに変換"""
+        counts = self._counter.transform(texts).astype(np.float32)
+        weighted = counts.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ weighted, dtype=np.float32)
+
+    # 行の管理
+
+    def _set_rows(self, note_ids: List[str], rows: sparse.csr_matrix):
+        self.ids = note_ids
+        self.positions = {note_id: i for i, note_id in enumerate(note_ids)}
+        self._matrix = rows
+        self._pending = []
+
+    def _compact(self):
+        if self._pending:
+            self._matrix = sparse.vstack([self._matrix] + self._pending, format="csr")
+            self._pending = []
+
+    def _append(self, note_ids: Sequence[str], rows: sparse.csr_matrix):
+        incoming = set(note_ids)
+        if any(note_id in self.positions for note_id in incoming):
+            # 既存ノートの更新は行列を作り直して置き換え
+            self._compact()
+            keep = [i for i, note_id in enumerate(self.ids) if note_id not in incoming]
+            self._set_rows([self.ids[i] for i in keep], self._matrix[keep])
+        for note_id in note_ids:
+            self.positions[note_id] = len(self.ids)
+            self.ids.append(note_id)
+        self._pending.append(rows)
+        if len(self._pending) > COMPACT_THRESHOLD:
+            self._compact()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector(self, note_id: str) -> Optional[sparse.csr_matrix]:
+        """保存済みベクトル（1行）"""
+        with self.lock:
+            position = self.positions.get(note_id)
+            if position is None:
+                return None
+            self._compact()
+            return self._matrix[position]
+
+    def matrix(self) -> sparse.csr_matrix:
+        """全ノートの行列（self.ids と同じ順序）"""
+        with self.lock:
+            self._compact()
+            return self._matrix
+
+    # 追加・検索
+
+    def add_many(self, note_ids: Sequence[str], texts: Sequence[str],
+                 corpus_loader=None) -> sparse.csr_matrix:
+        """ノートを追加してベクトルを返す
+
+        corpus_loader: 未学習時・再学習時に全ノートの (ids, texts) を返す関数
+        """
+        with self.lock:
+            total = len(self.ids) + len(note_ids)
+            needs_fit = not self.is_fitted or total >= self.fitted_docs * self.refit_ratio
+            if needs_fit and corpus_loader is not None:
+                corpus_ids, corpus_texts = corpus_loader()
+                known = set(corpus_ids)
+                corpus_ids = list(corpus_ids) + [i for i in note_ids if i not in known]
+                corpus_texts = list(corpus_texts) + [t for i, t in zip(note_ids, texts) if i not in known]
+                self.fit(corpus_ids, corpus_texts)
+                if self.is_fitted:
+                    return self.transform(texts)
+            if not self.is_fitted:
+                self.fit(note_ids, texts)
+                return self.transform(texts) if self.is_fitted else None
+
+            rows = self.transform(texts)
+            self._append(note_ids, rows)
+            self._save_vectors(note_ids, rows)
+            return rows
+
+    def add(self, note_id: str, text: str, corpus_loader=None) -> Optional[sparse.csr_matrix]:
+        """ノート1件を追加（transform 1回）"""
+        return self.add_many([note_id], [text], corpus_loader)
+
+    def remove(self, note_ids: Iterable[str]):
+        """ノートのベクトルを削除（語彙・IDFはそのまま）"""
+        removing = set(note_ids)
+        with self.lock:
+            if any(note_id in self.positions for note_id in removing):
+                self._compact()
+                keep = [i for i, note_id in enumerate(self.ids) if note_id not in removing]
+                self._set_rows([self.ids[i] for i in keep], self._matrix[keep])
+            with self.store.transaction() as conn:
+                conn.executemany('DELETE FROM note_vectors WHERE note_id = ?',
+                                 ((note_id,) for note_id in removing))
+
+    def scores(self, vector: sparse.csr_matrix) -> np.ndarray:
+        """全ノートとのコサイン類似度（self.ids と同じ順序）"""
+        with self.lock:
+            self._compact()
+            if vector is None or self._matrix.shape[0] == 0:
+                return np.zeros(len(self.ids), dtype=np.float32)
+            return np.asarray((self._matrix @ vector.T).todense()).ravel()
+
+    def query(self, vector: sparse.csr_matrix, k: Optional[int] = 10, threshold: float = 0.0,
+              exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """top-k 類似ノート [(note_id, score)]（k=None なら閾値を超える全件）"""
+        with self.lock:
+            scores = self.scores(vector)
+            for note_id in exclude:
+                position = self.positions.get(note_id)
+                if position is not None:
+                    scores[position] = -1.0
+            candidates = np.nonzero(scores > threshold)[0]
+            if k is not None and len(candidates) > k:
+                top = np.argpartition(-scores[candidates], k - 1)[:k]
+                candidates = candidates[top]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self.ids[i], float(scores[i])) for i in order]
+
+    def similarity(self, note_id_a: str, note_id_b: str) -> float:
+        """保存済みノート同士のコサイン類似度"""
+        a, b = self.vector(note_id_a), self.vector(note_id_b)
+        if a is None or b is None:
+            return 0.0
+        return float(a.multiply(b).sum())
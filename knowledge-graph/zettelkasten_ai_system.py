@@ -11,19 +11,76 @@ azukiazusa1スタイルの知識管理 + 最新AI技術統合
 """
 
 import json
-import os
-import re
-import sqlite3
+import sys
+import argparse
+import contextlib
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import hashlib
 import networkx as nx
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+try:
+    from .concept_extractor import ConceptHits, load_extractor
+    from .concept_index import ConceptIndex
+    from .graph_loader import GraphLoader
+    from .knowledge_store import KnowledgeStore
+    from .vault_importer import BATCH_SIZE, VaultImporter
+    from .vector_index import VectorIndex
+except ImportError:
+    from concept_extractor import ConceptHits, load_extractor
+    from concept_index import ConceptIndex
+    from graph_loader import GraphLoader
+    from knowledge_store import KnowledgeStore
+    from vault_importer import BATCH_SIZE, VaultImporter
+    from vector_index import VectorIndex
+
+# ノートIDの採番は automation/ の ZettelkastenProcessor と共通
+sys.path.append(str(Path(__file__).resolve().parent.parent / "automation"))
+from zettel_ids import ZettelIdAllocator
+
+
+# 接続の発見条件（TF-IDFコサイン類似度・共有概念数）
+SIMILARITY_THRESHOLD = 0.3
+MIN_SHARED_CONCEPTS = 2
+# 概念を1つ以上共有するだけのノートへの辺（connection_type='concept'）の重み
+CONCEPT_WEIGHT = 0.7
+
+# 創発的洞察の抽出条件
+EMERGENCE_THRESHOLD = 0.5
+MIN_CROSS_DOMAINS = 2
+
+# 高創発ノートごとの「自ドメイン以外の接続先ドメインと接続数」を集計し、
+# 接続先ドメインが MIN_CROSS_DOMAINS 以上のノートだけを返す（概念共有だけの辺は数えない）
+# （n・t の参照は idx_notes_graph のカバリングインデックスで完結させ、本文を含む行は読まない）
+CROSS_DOMAIN_SQL = '''
+    WITH cross_domain AS (
+        SELECT n.id AS note_id, t.ai_domain AS target_domain, COUNT(*) AS connection_count
+        FROM knowledge_notes n INDEXED BY idx_notes_graph
+        JOIN concept_connections c ON c.source_concept = n.id
+        JOIN knowledge_notes t INDEXED BY idx_notes_graph ON t.id = c.target_concept
+        WHERE n.emergence_potential > ?
+          AND c.connection_type = 'semantic'
+          AND t.ai_domain != n.ai_domain
+        GROUP BY n.id, t.ai_domain
+    ),
+    ranked AS (
+        SELECT note_id, target_domain, connection_count,
+               COUNT(*) OVER (PARTITION BY note_id) AS domain_count
+        FROM cross_domain
+    )
+    SELECT n.id, n.concepts, n.ai_domain, n.emergence_potential, n.title,
+           r.target_domain, r.connection_count
+    FROM ranked r
+    JOIN knowledge_notes n ON n.id = r.note_id
+    WHERE r.domain_count >= ?
+    ORDER BY n.emergence_potential DESC, n.id, r.target_domain
+'''
+
 
 @dataclass
 class AIKnowledgeNote:
@@ -44,7 +101,7 @@ class AIKnowledgeNote:
 class ZettelkastenAISystem:
     """AI特化ツェッテルカステンシステム"""
     
-    def __init__(self, base_path: str = "knowledge-graph"):
+    def __init__(self, base_path: str = "knowledge-graph", graph_snapshot: bool = True):
         self.base_path = Path(base_path)
         self.db_path = self.base_path / "knowledge_graph.db"
         self.permanent_notes_path = self.base_path / "permanent-notes"
@@ -58,126 +115,138 @@ class ZettelkastenAISystem:
             path.mkdir(parents=True, exist_ok=True)
         
         self.setup_database()
-        self.knowledge_graph = nx.DiGraph()
+        # 同じ秒・別プロセスで作成しても重複しないノートID（知識ベースごとに採番状態を保持）
+        self.id_allocator = ZettelIdAllocator(self.base_path / "note_ids.db")
+        # concept_taxonomy.json から1回だけコンパイルした単一走査の概念抽出器
+        self.concept_extractor = load_extractor()
+        # 知識グラフは初回アクセス時に SQLite（またはスナップショット）から復元
+        snapshot_path = self.base_path / "graph_snapshot.npz" if graph_snapshot else None
+        self.graph_loader = GraphLoader(self.store, snapshot_path)
+        self._knowledge_graph: Optional[nx.DiGraph] = None
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        # 学習済み語彙とノートごとの疎ベクトル（類似度計算でペアごとに再学習しない）
+        self.vector_index = VectorIndex(self.store)
+        # 概念 → ノートID の転置索引（概念を共有するノートを全走査せずに取得）
+        self.concept_index = ConceptIndex(self.store)
         
     def setup_database(self):
-        """SQLiteデータベースセットアップ"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS knowledge_notes (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                ai_domain TEXT NOT NULL,
-                experiment_id TEXT,
-                concepts TEXT,  -- JSON array
-                connections TEXT,  -- JSON array
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                permanence_score REAL DEFAULT 0.0,
-                emergence_potential REAL DEFAULT 0.0
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS concept_connections (
-                source_concept TEXT,
-                target_concept TEXT,
-                connection_strength REAL,
-                connection_type TEXT,
-                created_at TEXT,
-                PRIMARY KEY (source_concept, target_concept)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emergence_insights (
-                id TEXT PRIMARY KEY,
-                insight_title TEXT NOT NULL,
-                connected_concepts TEXT,  -- JSON array
-                ai_domains TEXT,  -- JSON array
-                insight_content TEXT NOT NULL,
-                confidence_score REAL,
-                created_at TEXT NOT NULL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """SQLiteデータベースセットアップ（常設接続・WAL）"""
+        self.store = KnowledgeStore(self.db_path)
+        self.store.setup_schema()
     
     def create_note(self, title: str, content: str, ai_domain: str, 
                    experiment_id: Optional[str] = None) -> str:
         """新しいAI知識ノート作成"""
-        note_id = self._generate_note_id(title)
-        concepts = self._extract_ai_concepts(content, ai_domain)
+        note = self._build_note(title, content, ai_domain, experiment_id)
+        
+        # 接続を先に求め、ノートと接続を1トランザクションで1回だけ保存
+        with self._rollback_indexes():
+            with self.store.transaction():
+                connection_rows = self._discover_connections(note)
+                self._save_note_to_db(note)
+                self.concept_index.add(note.id, note.concepts)
+        self._save_note_to_file(note)
+        self._update_knowledge_graph(note, connection_rows)
+        
+        return note.id
+    
+    def create_notes_bulk(self, notes: Iterable[Dict], write_files: bool = True) -> List[str]:
+        """ノートを一括作成（全件を1トランザクションで保存）
+        
+        notes: title / content / ai_domain / experiment_id(任意) を持つ辞書
+        接続発見・グラフ更新は行わないため、投入後にまとめて実行してください
+        """
+        notes = list(notes)
+        # IDはまとめて1トランザクションで採番
+        note_ids = self._generate_note_ids([item['title'] for item in notes])
+        built = [self._build_note(item['title'], item['content'], item['ai_domain'],
+                                  item.get('experiment_id'), note_id=note_id)
+                 for item, note_id in zip(notes, note_ids)]
+        
+        with self._rollback_indexes():
+            with self.store.transaction():
+                self.store.save_notes(built)
+                self.concept_index.add_many((note.id, note.concepts) for note in built)
+        self.vector_index.add_many([note.id for note in built], [note.content for note in built],
+                                   corpus_loader=self._load_corpus)
+        if write_files:
+            for note in built:
+                self._save_note_to_file(note)
+        
+        return [note.id for note in built]
+    
+    @contextlib.contextmanager
+    def _rollback_indexes(self):
+        """トランザクションが失敗したら、メモリ上の索引（ベクトル・概念）を DB の状態に戻す
         
-        note = AIKnowledgeNote(
-            id=note_id,
+        索引はトランザクション内でメモリも更新するため、ロールバックされると
+        存在しないノートのエントリが残ってしまう
+        """
+        try:
+            yield
+        except BaseException:
+            self.vector_index.reload()
+            self.concept_index.reload()
+            raise
+    
+    def import_vault(self, vault_path, workers: Optional[int] = None,
+                     batch_size: int = BATCH_SIZE) -> Dict:
+        """既存の Obsidian Vault を一括取り込み（中断後の再実行は続きから）"""
+        importer = VaultImporter(self, workers=workers, batch_size=batch_size,
+                                 similarity_threshold=SIMILARITY_THRESHOLD,
+                                 min_shared_concepts=MIN_SHARED_CONCEPTS,
+                                 concept_weight=CONCEPT_WEIGHT)
+        return importer.run(vault_path)
+    
+    def _build_note(self, title: str, content: str, ai_domain: str,
+                    experiment_id: Optional[str] = None, hits: Optional[ConceptHits] = None,
+                    note_id: Optional[str] = None, created_at: Optional[str] = None) -> AIKnowledgeNote:
+        """概念抽出・スコア計算済みのノートを組み立て（本文の走査は1回）
+        
+        hits: 走査済みの抽出結果（Vault取り込みのワーカーで抽出済みの場合）
+        """
+        if hits is None:
+            hits = self.concept_extractor.scan(content)
+        concepts = self.concept_extractor.concepts_for(hits, ai_domain)
+        now = datetime.now().isoformat()
+        
+        return AIKnowledgeNote(
+            id=note_id or self._generate_note_id(title),
             title=title,
             content=content,
             ai_domain=ai_domain,
             experiment_id=experiment_id,
             concepts=concepts,
             connections=[],
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat(),
-            permanence_score=self._calculate_permanence_score(content, concepts),
+            created_at=created_at or now,
+            updated_at=now,
+            permanence_score=self._calculate_permanence_score(content, concepts, hits),
             emergence_potential=self._calculate_emergence_potential(concepts, ai_domain)
         )
-        
-        self._save_note_to_db(note)
-        self._save_note_to_file(note)
-        self._update_knowledge_graph(note)
-        self._discover_connections(note)
-        
-        return note_id
     
     def _generate_note_id(self, title: str) -> str:
-        """ノートID生成 (ツェッテルカステン形式)"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        title_hash = hashlib.md5(title.encode()).hexdigest()[:8]
-        return f"AI{timestamp}{title_hash}"
+        """ノートID生成 (ツェッテルカステン形式: AI<タイムスタンプ>[-連番]<タイトルのハッシュ>)"""
+        return self._generate_note_ids([title])[0]
+    
+    def _generate_note_ids(self, titles: List[str]) -> List[str]:
+        """複数ノートのIDを1回の採番でまとめて生成"""
+        return [f"{zettel_id}{hashlib.md5(title.encode()).hexdigest()[:8]}"
+                for zettel_id, title in zip(self.id_allocator.allocate('AI', len(titles)), titles)]
     
     def _extract_ai_concepts(self, content: str, ai_domain: str) -> List[str]:
-        """AI技術概念抽出"""
-        ai_concept_patterns = {
-            "llm": ["transformer", "attention", "gpt", "claude", "llama", "bert", 
-                   "fine-tuning", "prompt", "token", "embedding"],
-            "agent": ["multi-agent", "reasoning", "planning", "tool-use", "memory",
-                     "reflection", "coordination", "autonomy"],
-            "rag": ["retrieval", "vector-database", "semantic-search", "chunking",
-                   "embedding", "reranking", "context-window"],
-            "prompt-engineering": ["few-shot", "chain-of-thought", "self-consistency",
-                                 "tree-of-thought", "prompt-template", "instruction-tuning"]
-        }
-        
-        concepts = []
-        domain_patterns = ai_concept_patterns.get(ai_domain, [])
-        
-        for pattern in domain_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                concepts.append(pattern)
-        
-        # 一般的なAI概念も抽出
-        general_ai_concepts = ["artificial-intelligence", "machine-learning", "deep-learning",
-                              "neural-network", "optimization", "evaluation", "benchmark"]
-        
-        for concept in general_ai_concepts:
-            if re.search(concept.replace("-", "[-_\\s]?"), content, re.IGNORECASE):
-                concepts.append(concept)
-        
-        return list(set(concepts))
+        """AI技術概念抽出（タクソノミーのドメイン概念 + 一般概念）"""
+        return self.concept_extractor.concepts_for(self.concept_extractor.scan(content), ai_domain)
     
-    def _calculate_permanence_score(self, content: str, concepts: List[str]) -> float:
-        """恒久性スコア計算"""
+    def _calculate_permanence_score(self, content: str, concepts: List[str],
+                                    hits: Optional[ConceptHits] = None) -> float:
+        """恒久性スコア計算（深度・参考性は概念抽出と同じ走査結果を使用）"""
+        if hits is None:
+            hits = self.concept_extractor.scan(content)
         factors = {
             "length": min(len(content) / 1000, 1.0),  # 内容の充実度
             "concepts": min(len(concepts) / 5, 1.0),  # 概念の豊富さ
-            "depth": len(re.findall(r'(例|実装|詳細|具体|詳しく)', content)) / 10,  # 深度
-            "references": len(re.findall(r'(論文|研究|実験|結果)', content)) / 5  # 参考性
+            "depth": hits.signals["depth"] / 10,  # 深度
+            "references": hits.signals["references"] / 5  # 参考性
         }
         
         return sum(factors.values()) / len(factors)
@@ -186,47 +255,24 @@ class ZettelkastenAISystem:
         """創発可能性スコア計算"""
         # 複数のAI領域に跨る概念ほど創発性が高い
         cross_domain_concepts = 0
-        all_domains = ["llm", "agent", "rag", "prompt-engineering"]
+        domain_core = self.concept_extractor.domain_core
         
-        for domain in all_domains:
-            if domain != ai_domain:
-                domain_concepts = self._get_domain_concepts(domain)
-                if any(concept in domain_concepts for concept in concepts):
-                    cross_domain_concepts += 1
+        for domain, core_concepts in domain_core.items():
+            if domain != ai_domain and not core_concepts.isdisjoint(concepts):
+                cross_domain_concepts += 1
         
         novelty_score = len(set(concepts)) / 10  # 新規概念数
-        cross_domain_score = cross_domain_concepts / len(all_domains)
+        cross_domain_score = cross_domain_concepts / max(len(domain_core), 1)
         
         return (novelty_score + cross_domain_score) / 2
     
     def _get_domain_concepts(self, domain: str) -> List[str]:
         """ドメイン固有概念取得"""
-        domain_concepts = {
-            "llm": ["transformer", "attention", "gpt", "claude"],
-            "agent": ["multi-agent", "reasoning", "planning", "tool-use"],
-            "rag": ["retrieval", "vector-database", "semantic-search"],
-            "prompt-engineering": ["few-shot", "chain-of-thought"]
-        }
-        return domain_concepts.get(domain, [])
+        return sorted(self.concept_extractor.domain_core.get(domain, ()))
     
     def _save_note_to_db(self, note: AIKnowledgeNote):
         """ノートをデータベースに保存"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO knowledge_notes 
-            (id, title, content, ai_domain, experiment_id, concepts, connections,
-             created_at, updated_at, permanence_score, emergence_potential)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            note.id, note.title, note.content, note.ai_domain, note.experiment_id,
-            json.dumps(note.concepts), json.dumps(note.connections),
-            note.created_at, note.updated_at, note.permanence_score, note.emergence_potential
-        ))
-        
-        conn.commit()
-        conn.close()
+        self.store.save_note(note)
     
     def _save_note_to_file(self, note: AIKnowledgeNote):
         """ノートをMarkdownファイルに保存"""
@@ -260,55 +306,89 @@ updated_at: {note.updated_at}
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
     
-    def _update_knowledge_graph(self, note: AIKnowledgeNote):
-        """知識グラフ更新"""
-        self.knowledge_graph.add_node(note.id, **asdict(note))
-        
-        # 概念ベースの接続
-        for concept in note.concepts:
-            concept_nodes = [n for n, d in self.knowledge_graph.nodes(data=True)
-                           if concept in d.get('concepts', [])]
-            
-            for other_node in concept_nodes:
-                if other_node != note.id:
-                    self.knowledge_graph.add_edge(note.id, other_node, 
-                                                 connection_type='concept',
-                                                 weight=0.7)
-    
-    def _discover_connections(self, note: AIKnowledgeNote):
-        """自動的な関連性発見"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id, title, content, concepts FROM knowledge_notes WHERE id != ?', 
-                      (note.id,))
-        existing_notes = cursor.fetchall()
-        
-        connections = []
-        for existing_id, existing_title, existing_content, existing_concepts in existing_notes:
-            similarity = self._calculate_semantic_similarity(note.content, existing_content)
-            concept_overlap = len(set(note.concepts) & set(json.loads(existing_concepts)))
-            
-            if similarity > 0.3 or concept_overlap >= 2:
-                connections.append(existing_id)
-                
-                # 双方向接続をデータベースに記録
-                cursor.execute('''
-                    INSERT OR REPLACE INTO concept_connections
-                    (source_concept, target_concept, connection_strength, connection_type, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (note.id, existing_id, similarity, 'semantic', datetime.now().isoformat()))
-        
-        # ノートの接続を更新
+    @property
+    def knowledge_graph(self) -> nx.DiGraph:
+        """全ノートの知識グラフ（初回アクセス時に読み込み）"""
+        if self._knowledge_graph is None:
+            self._knowledge_graph = self.graph_loader.load_graph()
+        return self._knowledge_graph
+    
+    def domain_graph(self, ai_domain: str) -> nx.DiGraph:
+        """ドメイン内のノートだけの部分グラフ（全体を読み込まずに取得）"""
+        return self.graph_loader.domain_graph(ai_domain)
+    
+    def _update_knowledge_graph(self, note: AIKnowledgeNote, connection_rows: List[Tuple]):
+        """知識グラフ更新（ノードはIDとスコアのみ保持）
+        
+        辺は DB に保存した接続（concept_connections）と同じものだけを追加し、
+        再起動後に GraphLoader が復元するグラフと一致させる
+        """
+        self.graph_loader.invalidate(note.ai_domain)
+        if self._knowledge_graph is None:
+            # 未読み込みなら次回アクセス時に DB から復元される
+            return
+        
+        self.knowledge_graph.add_node(note.id,
+                                      permanence_score=note.permanence_score,
+                                      emergence_potential=note.emergence_potential)
+        for source, target, strength, connection_type, _ in connection_rows:
+            if target in self.knowledge_graph:
+                # GraphLoader と同じく重みは float32 で保持した値
+                self.knowledge_graph.add_edge(source, target, connection_type=connection_type,
+                                              weight=float(np.float32(strength)))
+    
+    def _discover_connections(self, note: AIKnowledgeNote) -> List[Tuple]:
+        """自動的な関連性発見（接続を記録し note.connections を設定。ノート自体は保存しない）
+        
+        戻り値: 保存した接続の行 (source, target, strength, type, created_at)
+        類似度・共有概念数の条件を満たすノートは 'semantic'、概念を共有するだけのノートは
+        'concept'（重み CONCEPT_WEIGHT）の接続。共有ノートは転置索引から求める（O(一致件数)）
+        """
+        # ベクトル索引: transform 1回 + 疎行列×ベクトル1回で全ノートとの類似度
+        vector = self.vector_index.add(note.id, note.content, corpus_loader=self._load_corpus)
+        scores = self.vector_index.scores(vector)
+        ids = self.vector_index.ids
+        positions = self.vector_index.positions
+        
+        # 類似度が閾値を超えるノート + 概念を2つ以上共有するノート（転置索引）
+        candidates = {ids[i] for i in np.nonzero(scores > SIMILARITY_THRESHOLD)[0]}
+        overlaps = self.concept_index.overlap_counts(note.concepts, exclude=note.id)
+        candidates.update(note_id for note_id, count in overlaps.items() if count >= MIN_SHARED_CONCEPTS)
+        candidates.discard(note.id)
+        
+        def similarity_of(note_id):
+            position = positions.get(note_id)
+            return float(scores[position]) if position is not None else 0.0
+        
+        connections = sorted(candidates, key=lambda note_id: (-similarity_of(note_id), note_id))
+        now = datetime.now().isoformat()
+        rows = [(note.id, note_id, similarity_of(note_id), 'semantic', now) for note_id in connections]
+        rows.extend((note.id, note_id, CONCEPT_WEIGHT, 'concept', now)
+                    for note_id in sorted(overlaps) if note_id not in candidates)
+        
+        # 接続をデータベースに記録
+        self.store.save_connections(rows)
         note.connections = connections
-        self._save_note_to_db(note)
-        
-        conn.commit()
-        conn.close()
+        return rows
+    
+    def _load_corpus(self) -> Tuple[List[str], List[str]]:
+        """ベクトル索引の学習用に全ノートの (ids, contents) を取得"""
+        rows = self.store.query('SELECT id, content FROM knowledge_notes')
+        return [row[0] for row in rows], [row[1] for row in rows]
+    
+    def find_similar_notes(self, note_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """保存済みノートに類似するノート top-k [(note_id, score)]"""
+        vector = self.vector_index.vector(note_id)
+        if vector is None:
+            return []
+        return self.vector_index.query(vector, k=k, exclude=[note_id])
     
     def _calculate_semantic_similarity(self, content1: str, content2: str) -> float:
-        """セマンティック類似度計算"""
+        """セマンティック類似度計算（学習済み語彙を使用。未学習時は2文書で学習）"""
         try:
+            if self.vector_index.is_fitted:
+                vectors = self.vector_index.transform([content1, content2])
+                return float(vectors[0].multiply(vectors[1]).sum())
             tfidf_matrix = self.vectorizer.fit_transform([content1, content2])
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
             return similarity
@@ -316,52 +396,38 @@ updated_at: {note.updated_at}
             return 0.0
     
     def discover_emergent_insights(self) -> List[Dict]:
-        """創発的洞察発見"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, concepts, ai_domain, emergence_potential, title, content
-            FROM knowledge_notes 
-            WHERE emergence_potential > 0.5
-            ORDER BY emergence_potential DESC
-        ''')
-        
-        high_potential_notes = cursor.fetchall()
-        insights = []
-        
-        for note_id, concepts_json, ai_domain, emergence_potential, title, content in high_potential_notes:
-            concepts = json.loads(concepts_json)
-            
-            # 異なるドメインとの接続を探す
-            cursor.execute('''
-                SELECT DISTINCT ai_domain, COUNT(*) as count
-                FROM knowledge_notes 
-                WHERE id IN (
-                    SELECT target_concept FROM concept_connections WHERE source_concept = ?
-                )
-                AND ai_domain != ?
-                GROUP BY ai_domain
-            ''', (note_id, ai_domain))
-            
-            cross_domain_connections = cursor.fetchall()
-            
-            if len(cross_domain_connections) >= 2:
-                insight_id = f"INSIGHT_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                insight = {
-                    'id': insight_id,
-                    'title': f"Cross-domain insight: {title}",
-                    'connected_concepts': concepts,
-                    'ai_domains': [ai_domain] + [domain for domain, count in cross_domain_connections],
-                    'insight_content': self._generate_insight_content(note_id, concepts, cross_domain_connections),
-                    'confidence_score': emergence_potential,
-                    'created_at': datetime.now().isoformat()
+        """創発的洞察発見（異なるドメイン2つ以上と接続する高創発ノートを1クエリで抽出）"""
+        rows = self.store.query(CROSS_DOMAIN_SQL, (EMERGENCE_THRESHOLD, MIN_CROSS_DOMAINS))
+        
+        # 同一実行内で衝突しないID（実行時刻 + ノートID）
+        run_stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        created_at = datetime.now().isoformat()
+        
+        grouped: Dict[str, Dict] = {}
+        for note_id, concepts_json, ai_domain, emergence_potential, title, target_domain, count in rows:
+            entry = grouped.get(note_id)
+            if entry is None:
+                entry = grouped[note_id] = {
+                    'concepts': json.loads(concepts_json or "[]"), 'ai_domain': ai_domain,
+                    'emergence_potential': emergence_potential, 'title': title, 'cross': []
                 }
-                
-                insights.append(insight)
-                self._save_emergence_insight(insight)
+            entry['cross'].append((target_domain, count))
         
-        conn.close()
+        insights = []
+        for note_id, entry in grouped.items():
+            cross_domain_connections = entry['cross']
+            insights.append({
+                'id': f"INSIGHT_{run_stamp}_{note_id}",
+                'title': f"Cross-domain insight: {entry['title']}",
+                'connected_concepts': entry['concepts'],
+                'ai_domains': [entry['ai_domain']] + [domain for domain, count in cross_domain_connections],
+                'insight_content': self._generate_insight_content(
+                    note_id, entry['concepts'], cross_domain_connections),
+                'confidence_score': entry['emergence_potential'],
+                'created_at': created_at
+            })
+        
+        self._save_emergence_insights(insights)
         return insights
     
     def _generate_insight_content(self, note_id: str, concepts: List[str], 
@@ -397,67 +463,59 @@ updated_at: {note.updated_at}
     
     def _save_emergence_insight(self, insight: Dict):
         """創発的洞察保存"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO emergence_insights
-            (id, insight_title, connected_concepts, ai_domains, insight_content, confidence_score, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            insight['id'], insight['title'], 
-            json.dumps(insight['connected_concepts']),
-            json.dumps(insight['ai_domains']),
-            insight['insight_content'],
-            insight['confidence_score'],
-            insight['created_at']
-        ))
+        self._save_emergence_insights([insight])
+    
+    def _save_emergence_insights(self, insights: List[Dict]):
+        """創発的洞察をまとめて保存（DBは1トランザクション、ファイルはその後に一括書き込み）"""
+        self.store.save_insights(insights)
         
         # ファイルにも保存
-        file_path = self.emergence_path / f"{insight['id']}.md"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(insight['insight_content'])
-        
-        conn.commit()
-        conn.close()
+        for insight in insights:
+            file_path = self.emergence_path / f"{insight['id']}.md"
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(insight['insight_content'])
     
     def get_knowledge_stats(self) -> Dict:
         """知識ベース統計"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         stats = {}
         
         # ノート数
-        cursor.execute('SELECT COUNT(*) FROM knowledge_notes')
-        stats['total_notes'] = cursor.fetchone()[0]
+        stats['total_notes'] = self.store.scalar('SELECT COUNT(*) FROM knowledge_notes')
         
         # ドメイン別分布
-        cursor.execute('SELECT ai_domain, COUNT(*) FROM knowledge_notes GROUP BY ai_domain')
-        stats['domain_distribution'] = dict(cursor.fetchall())
+        stats['domain_distribution'] = dict(self.store.query(
+            'SELECT ai_domain, COUNT(*) FROM knowledge_notes GROUP BY ai_domain'))
         
         # 高恒久性ノート
-        cursor.execute('SELECT COUNT(*) FROM knowledge_notes WHERE permanence_score > 0.7')
-        stats['high_permanence_notes'] = cursor.fetchone()[0]
+        stats['high_permanence_notes'] = self.store.scalar(
+            'SELECT COUNT(*) FROM knowledge_notes WHERE permanence_score > 0.7')
         
         # 創発可能性ノート
-        cursor.execute('SELECT COUNT(*) FROM knowledge_notes WHERE emergence_potential > 0.5')
-        stats['high_emergence_notes'] = cursor.fetchone()[0]
+        stats['high_emergence_notes'] = self.store.scalar(
+            'SELECT COUNT(*) FROM knowledge_notes WHERE emergence_potential > 0.5')
         
         # 接続数
-        cursor.execute('SELECT COUNT(*) FROM concept_connections')
-        stats['total_connections'] = cursor.fetchone()[0]
+        stats['total_connections'] = self.store.scalar('SELECT COUNT(*) FROM concept_connections')
         
         # 洞察数
-        cursor.execute('SELECT COUNT(*) FROM emergence_insights')
-        stats['total_insights'] = cursor.fetchone()[0]
+        stats['total_insights'] = self.store.scalar('SELECT COUNT(*) FROM emergence_insights')
         
-        conn.close()
         return stats
 
 
 def main():
     """メイン実行"""
+    parser = argparse.ArgumentParser(description="AI特化ツェッテルカステンシステム")
+    parser.add_argument("--import-vault", metavar="PATH", help="既存の Obsidian Vault を一括取り込み")
+    parser.add_argument("--workers", type=int, default=None, help="取り込みのワーカープロセス数")
+    args = parser.parse_args()
+    
+    if args.import_vault:
+        zk_system = ZettelkastenAISystem()
+        zk_system.import_vault(args.import_vault, workers=args.workers)
+        zk_system.store.close()
+        return
+    
     zk_system = ZettelkastenAISystem()
     
     # サンプルAI知識ノート作成
@@ -0,0 +1,11 @@
+"""
+テスト共通設定
+automation/・knowledge-graph/ はパッケージとして import できないのでディレクトリをパスに追加
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR / "automation"))
+sys.path.append(str(ROOT_DIR / "knowledge-graph"))
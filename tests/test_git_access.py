@@ -0,0 +1,104 @@
+"""git_access.porcelain_status が git status --porcelain と同じ結果になるか"""
+
+import os
+import subprocess
+
+import pytest
+
+import git_access
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+               GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com")
+
+
+def run_git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, env=GIT_ENV, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    run_git(tmp_path, "init", "-q")
+    write(tmp_path / ".gitignore", "*.log\nbuild/\n")
+    write(tmp_path / "keep.md", "keep\n")
+    write(tmp_path / "modify.md", "before\n")
+    write(tmp_path / "remove.md", "remove\n")
+    write(tmp_path / "docs" / "move.md", "same content\n")
+    write(tmp_path / "script.sh", "echo hi\n")
+    os.symlink("docs", tmp_path / "docs_link")
+    os.symlink("keep.md", tmp_path / "file_link")
+    run_git(tmp_path, "add", "-A")
+    run_git(tmp_path, "commit", "-q", "-m", "initial")
+    yield tmp_path
+    git_access.close_all()
+
+
+def assert_matches_git(repo):
+    expected = run_git(repo, "status", "--porcelain", "-uall")
+    assert git_access.format_porcelain(git_access.porcelain_status(str(repo))) == expected
+
+
+def test_clean_tree(repo):
+    assert git_access.porcelain_status(str(repo)) == []
+    assert_matches_git(repo)
+
+
+def test_worktree_changes(repo):
+    write(repo / "modify.md", "after\n")
+    (repo / "remove.md").unlink()
+    (repo / "script.sh").chmod(0o755)
+    write(repo / "new" / "untracked.md", "new\n")
+    write(repo / "debug.log", "ignored\n")
+    write(repo / "build" / "out.md", "ignored\n")
+    assert_matches_git(repo)
+
+
+def test_staged_changes_and_rename(repo):
+    write(repo / "modify.md", "staged\n")
+    run_git(repo, "add", "modify.md")
+    write(repo / "modify.md", "staged and edited\n")
+    run_git(repo, "mv", "docs/move.md", "moved.md")
+    write(repo / "added.md", "added\n")
+    run_git(repo, "add", "added.md")
+    run_git(repo, "rm", "-q", "remove.md")
+    assert_matches_git(repo)
+
+
+def test_symlinks(repo):
+    # ディレクトリへのリンクは中身を辿らない。壊れたリンク・種別変更も git と同じ扱い
+    os.remove(repo / "file_link")
+    os.symlink("missing.md", repo / "file_link")
+    os.symlink("nowhere", repo / "dangling")
+    os.remove(repo / "keep.md")
+    os.symlink("modify.md", repo / "keep.md")
+    assert_matches_git(repo)
+
+
+def test_results_reused_between_calls(repo):
+    write(repo / "modify.md", "after\n")
+    assert_matches_git(repo)
+    write(repo / "modify.md", "before\n")
+    write(repo / "new.md", "new\n")
+    assert_matches_git(repo)
+
+
+def test_pathspec(repo):
+    write(repo / "docs" / "move.md", "changed\n")
+    write(repo / "modify.md", "after\n")
+    assert git_access.porcelain_status(str(repo), "docs") == [(" M", "docs/move.md")]
+
+
+def test_commits_since(repo):
+    first = git_access.head_commit(str(repo))
+    for name in ("a.md", "b.md"):
+        write(repo / name, name)
+        run_git(repo, "add", name)
+        run_git(repo, "commit", "-q", "-m", f"add {name}")
+    messages = [commit.summary for commit in git_access.commits_since(str(repo), first)]
+    assert messages == ["add a.md", "add b.md"]
+    assert git_access.commits_since(str(repo), git_access.head_commit(str(repo))) == []
@@ -0,0 +1,143 @@
+"""LLMCache の有効期限・上限による削除・キャッシュモード"""
+
+import asyncio
+import time
+
+import pytest
+
+from llm_cache import LLMCache, request_key
+
+
+def request(prompt):
+    return {"provider": "openai", "model": "gpt-4", "messages": [{"role": "user", "content": prompt}]}
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = LLMCache(tmp_path / "llm_cache.db", **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def set_created_at(cache, req, seconds_ago):
+    with cache.conn:
+        cache.conn.execute('UPDATE llm_responses SET created_at = ? WHERE key = ?',
+                           (time.time() - seconds_ago, request_key(req)))
+
+
+def test_request_key_ignores_key_order():
+    assert request_key({"a": 1, "b": [1, 2]}) == request_key({"b": [1, 2], "a": 1})
+    assert request_key({"a": 1}) != request_key({"a": 2})
+
+
+def test_read_through_hits_after_first_call(make_cache):
+    cache = make_cache()
+    calls = []
+
+    def call():
+        calls.append(1)
+        return "answer"
+
+    assert cache.get_or_call(request("q"), call) == "answer"
+    assert cache.get_or_call(request("q"), call) == "answer"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_persist_across_instances(make_cache):
+    make_cache().put(request("q"), "answer")
+    assert make_cache().get(request("q")) == "answer"
+
+
+def test_expired_entry_is_a_miss(make_cache):
+    cache = make_cache(ttl_days=1)
+    cache.put(request("old"), "stale")
+    cache.put(request("new"), "fresh")
+    set_created_at(cache, request("old"), 2 * 86400)
+    assert cache.get(request("old")) is None
+    assert cache.get(request("new")) == "fresh"
+    assert cache.stats()["entries"] == 1
+
+
+def test_prune_removes_expired_entries(make_cache):
+    cache = make_cache(ttl_days=1)
+    for prompt in ("a", "b", "c"):
+        cache.put(request(prompt), prompt)
+    set_created_at(cache, request("a"), 2 * 86400)
+    set_created_at(cache, request("b"), 2 * 86400)
+    assert cache.prune() == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_max_entries_evicts_least_recently_used(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.put(request("a"), "a")
+    time.sleep(0.01)
+    cache.put(request("b"), "b")
+    time.sleep(0.01)
+    assert cache.get(request("a")) == "a"  # b より最近使われた
+    time.sleep(0.01)
+    cache.put(request("c"), "c")
+    assert cache.get(request("b")) is None
+    assert cache.get(request("a")) == "a" and cache.get(request("c")) == "c"
+    assert cache.evictions == 1
+
+
+def test_max_size_evicts_oldest(make_cache):
+    cache = make_cache(max_size_mb=1.5 / 1024)  # 1.5KB
+    cache.put(request("a"), "x" * 1000)
+    time.sleep(0.01)
+    cache.put(request("b"), "y" * 1000)
+    assert cache.get(request("a")) is None
+    assert cache.stats()["size_bytes"] == 1000
+
+
+def test_write_through_always_calls_and_refreshes(make_cache):
+    cache = make_cache(mode="write_through")
+    assert cache.get_or_call(request("q"), lambda: "first") == "first"
+    assert cache.get_or_call(request("q"), lambda: "second") == "second"
+    assert cache.get(request("q")) == "second"
+
+
+@pytest.mark.parametrize("kwargs", [{"mode": "off"}, {"bypass": True}])
+def test_disabled_cache_does_not_store(make_cache, kwargs):
+    cache = make_cache(**kwargs)
+    assert not cache.enabled
+    assert cache.get_or_call(request("q"), lambda: "answer") == "answer"
+    assert cache.stats()["entries"] == 0
+
+
+def test_empty_response_is_not_cached(make_cache):
+    cache = make_cache()
+    assert cache.get_or_call(request("q"), lambda: "") == ""
+    assert cache.get_or_call(request("q"), lambda: "answer") == "answer"
+
+
+def test_discard_forces_new_call(make_cache):
+    cache = make_cache()
+    cache.put(request("q"), "unusable")
+    cache.discard(request("q"))
+    assert cache.get_or_call(request("q"), lambda: "answer") == "answer"
+
+
+def test_async_get_or_call(make_cache):
+    cache = make_cache()
+
+    async def call():
+        return "answer"
+
+    assert asyncio.run(cache.aget_or_call(request("q"), call)) == "answer"
+    assert asyncio.run(cache.aget_or_call(request("q"), call)) == "answer"
+    assert cache.hits == 1
+
+
+def test_invalid_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        LLMCache(tmp_path / "llm_cache.db", mode="always")
@@ -0,0 +1,161 @@
+"""ObsidianSync の同期計画（_plan_mapping）と実行（_apply_plan）"""
+
+import os
+import time
+
+import pytest
+
+from copy_engine import ParallelCopier
+from file_snapshot_index import FileSnapshotIndex
+from ignore_rules import IgnoreMatcher
+from obsidian_sync import CONFLICT_MARKER, ObsidianSync
+
+
+def write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def sync(tmp_path):
+    # 実際の Vault・logs/ に触れないよう、索引とパスを一時ディレクトリに差し替え
+    sync = ObsidianSync.__new__(ObsidianSync)
+    sync.project_root = tmp_path / "project"
+    sync.obsidian_vault = tmp_path / "vault"
+    sync.project_vault = sync.project_root / "obsidian_vault"
+    sync.sync_config = {"project_to_vault": {"articles": "04_OUTPUT/zenn_drafts"},
+                        "vault_to_project": {"04_OUTPUT/zenn_drafts": "articles"}}
+    sync.snapshot_index = FileSnapshotIndex(tmp_path / "file_snapshots.db", scope="obsidian_sync")
+    sync.conflict_matcher = IgnoreMatcher(patterns=[f"*{CONFLICT_MARKER}*"], extensions=[],
+                                          respect_gitignore=False)
+    sync.dry_run = False
+    sync.tombstone_days = 30
+    sync.copier = ParallelCopier(workers=2, progress_interval=60)
+    sync.reset_stats()
+    sync.obsidian_vault.mkdir(parents=True)
+    sync.project_root.mkdir(parents=True)
+    yield sync
+    sync.snapshot_index.close()
+
+
+def source(sync):
+    return sync.project_root / "articles"
+
+
+def target(sync):
+    return sync.obsidian_vault / "04_OUTPUT" / "zenn_drafts"
+
+
+def run(sync):
+    sync.reset_stats()
+    sync.sync_to_obsidian()
+    return sync.sync_stats
+
+
+def listing(folder):
+    return sorted(str(path.relative_to(folder)) for path in folder.rglob("*.md"))
+
+
+def test_initial_copy_ignores_other_files(sync):
+    write(source(sync) / "a.md", "a")
+    write(source(sync) / "sub" / "b.md", "b")
+    write(source(sync) / "notes.txt", "not synced")
+    stats = run(sync)
+    assert stats["copied_files"] == 2
+    assert listing(target(sync)) == ["a.md", "sub/b.md"]
+    assert (target(sync) / "sub" / "b.md").read_text(encoding="utf-8") == "b"
+
+
+def test_unchanged_sources_are_not_recopied(sync):
+    write(source(sync) / "a.md", "a")
+    run(sync)
+    stats = run(sync)
+    assert stats["copied_files"] == 0 and stats["skipped_files"] == 0
+
+
+def test_identical_target_is_skipped(sync):
+    write(source(sync) / "a.md", "same")
+    write(target(sync) / "a.md", "same")
+    stats = run(sync)
+    assert stats["copied_files"] == 0 and stats["skipped_files"] == 1
+
+
+def test_update_delete_and_rename(sync):
+    write(source(sync) / "edit.md", "v1")
+    write(source(sync) / "gone.md", "gone")
+    write(source(sync) / "old.md", "moved content")
+    run(sync)
+
+    write(source(sync) / "edit.md", "v2", mtime=time.time() + 5)
+    (source(sync) / "gone.md").unlink()
+    os.rename(source(sync) / "old.md", source(sync) / "new.md")
+    stats = run(sync)
+
+    assert stats["copied_files"] == 1
+    assert stats["deleted_files"] == 1
+    assert stats["renamed_files"] == 1
+    assert listing(target(sync)) == ["edit.md", "new.md"]
+    assert (target(sync) / "edit.md").read_text(encoding="utf-8") == "v2"
+
+
+def test_plan_is_not_applied_on_dry_run(sync, capsys):
+    write(source(sync) / "a.md", "a")
+    sync.dry_run = True
+    run(sync)
+    assert not target(sync).exists()
+    assert "+ a.md" in capsys.readouterr().out
+
+
+def test_conflict_keeps_target_edit(sync):
+    write(source(sync) / "a.md", "original")
+    run(sync)
+    write(source(sync) / "a.md", "source edit", mtime=time.time() + 5)
+    write(target(sync) / "a.md", "target edit", mtime=time.time() + 5)
+    stats = run(sync)
+
+    assert stats["conflicts"] == ["04_OUTPUT/zenn_drafts/a.md"]
+    assert (target(sync) / "a.md").read_text(encoding="utf-8") == "target edit"
+    copies = [path for path in target(sync).iterdir() if CONFLICT_MARKER in path.name]
+    assert len(copies) == 1 and copies[0].read_text(encoding="utf-8") == "source edit"
+    # 競合コピーは同期対象外なので次回の同期で再び競合にならない
+    assert run(sync)["conflicts"] == []
+
+
+def test_target_edit_wins_over_source_delete(sync):
+    write(source(sync) / "a.md", "original")
+    run(sync)
+    (source(sync) / "a.md").unlink()
+    write(target(sync) / "a.md", "target edit", mtime=time.time() + 5)
+    stats = run(sync)
+    assert stats["deleted_files"] == 0 and stats["kept_files"] == 1
+    assert (target(sync) / "a.md").exists()
+
+
+def test_stale_copy_of_deleted_file_is_not_resurrected(sync):
+    write(source(sync) / "a.md", "original", mtime=time.time() - 3600)
+    run(sync)
+    (source(sync) / "a.md").unlink()
+    run(sync)
+    assert not (target(sync) / "a.md").exists()
+
+    # 削除を反映した Vault 側に、墓標より古い mtime のまま同じ内容が戻ってきた（古いバックアップの復元など）
+    write(target(sync) / "a.md", "original", mtime=time.time() - 3600)
+    sync.reset_stats()
+    sync.sync_from_obsidian()
+    assert sync.sync_stats["stale_kept"] == [str(target(sync) / "a.md")]
+    assert not (source(sync) / "a.md").exists()
+
+
+def test_restored_file_newer_than_tombstone_is_synced(sync):
+    write(source(sync) / "a.md", "original")
+    run(sync)
+    (source(sync) / "a.md").unlink()
+    run(sync)
+
+    write(target(sync) / "a.md", "original", mtime=time.time() + 5)
+    sync.reset_stats()
+    sync.sync_from_obsidian()
+    assert sync.sync_stats["stale_kept"] == []
+    assert (source(sync) / "a.md").read_text(encoding="utf-8") == "original"
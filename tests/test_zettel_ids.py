@@ -0,0 +1,82 @@
+"""ZettelIdAllocator の採番（一意性・順序・連番の繰り上がり・時計の巻き戻り・プロセス間）"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from zettel_ids import MAX_SEQUENCE, ZettelIdAllocator
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def allocator(tmp_path):
+    allocator = ZettelIdAllocator(tmp_path / "zettel_ids.db")
+    yield allocator
+    allocator.close()
+
+
+def _allocate(db_path, count):
+    allocator = ZettelIdAllocator(db_path)
+    try:
+        return [allocator.next_id() for _ in range(count)]
+    finally:
+        allocator.close()
+
+
+def test_same_second_gets_sequence(allocator):
+    assert allocator.allocate(count=3, now=NOW) == [
+        "Z20250101120000", "Z20250101120000-01", "Z20250101120000-02"]
+    assert allocator.allocate(now=NOW) == ["Z20250101120000-03"]
+
+
+def test_new_second_restarts_sequence(allocator):
+    allocator.allocate(count=2, now=NOW)
+    assert allocator.allocate(now=NOW + timedelta(seconds=1)) == ["Z20250101120001"]
+
+
+def test_overflow_borrows_next_second(allocator):
+    ids = allocator.allocate(count=MAX_SEQUENCE + 2, now=NOW)
+    assert ids[MAX_SEQUENCE] == f"Z20250101120000-{MAX_SEQUENCE:02d}"
+    assert ids[-1] == "Z20250101120001"
+    # 先取りした秒に実時間が追いついても重複しない
+    assert allocator.allocate(now=NOW + timedelta(seconds=1)) == ["Z20250101120001-01"]
+
+
+def test_clock_going_backwards_stays_monotonic(allocator):
+    first = allocator.allocate(now=NOW)[0]
+    second = allocator.allocate(now=NOW - timedelta(hours=1))[0]
+    assert second > first
+
+
+def test_prefixes_are_independent(allocator):
+    assert allocator.allocate("Z", now=NOW) == ["Z20250101120000"]
+    assert allocator.allocate("AI_", now=NOW) == ["AI_20250101120000"]
+
+
+def test_ids_sort_in_allocation_order(allocator):
+    ids = []
+    for offset in (0, 0, 1, 1, 0, 2):
+        ids += allocator.allocate(count=60, now=NOW + timedelta(seconds=offset))
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_state_persists_across_instances(tmp_path):
+    db_path = tmp_path / "zettel_ids.db"
+    first = ZettelIdAllocator(db_path)
+    first.allocate(now=NOW)
+    first.close()
+    second = ZettelIdAllocator(db_path)
+    assert second.allocate(now=NOW) == ["Z20250101120000-01"]
+    second.close()
+
+
+def test_unique_across_processes(tmp_path):
+    db_path = str(tmp_path / "zettel_ids.db")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_allocate, [db_path] * 4, [150] * 4))
+    ids = [zettel_id for result in results for zettel_id in result]
+    assert len(set(ids)) == len(ids) == 600
+    assert all(result == sorted(result) for result in results)